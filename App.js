@@ -1,9 +1,9 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { StatusBar } from 'expo-status-bar';
 import { StyleSheet, View, Alert, Vibration } from 'react-native';
 import BarcodeScanner from './components/BarcodeScanner';
 import StatusSelectionModal from './components/StatusSelectionModal';
-import { saveBarcode, lookupBarcode } from './services/database';
+import { saveBarcode, lookupBarcode, startLookupSync } from './services/database';
 
 export default function App() {
   const [scannedBarcodes, setScannedBarcodes] = useState([]);
@@ -11,6 +11,9 @@ export default function App() {
   const [selectedBarcode, setSelectedBarcode] = useState(null);
   const [assetInfo, setAssetInfo] = useState(null);
 
+  // Keep the offline lookup pack current while the app is open
+  useEffect(() => startLookupSync(), []);
+
   const handleBarcodeScanned = async (barcodeData) => {
     Vibration.vibrate(100);
     setScannedBarcodes(prev => [...prev, barcodeData]);
@@ -0,0 +1,228 @@
+"""Precomputed asset-ID index for the inventory sheet.
+
+The index maps every normalized asset ID to its row, name, description and
+marked flag (a marked-check or status value, as in progress_counter.py)
+so server.js can answer lookups with one hash lookup instead of
+parsing the whole workbook on every request. With matching rules in the
+config (see barcode_match.py), "variants" also maps every match key to the
+ID of its row, so a tolerant lookup costs one more hash lookup. It is
+written next to config.json as config.index.json.
+
+Rebuild it from the command line when the workbook changes:
+
+    python asset_index.py            # rebuild only if the workbook changed
+    python asset_index.py --force    # always rebuild
+    python asset_index.py --profile "North Campus"   # index of a profile in profiles.json
+"""
+import sys
+import os
+import json
+import hashlib
+import argparse
+
+import barcode_match
+import instrumentation
+
+INDEX_VERSION = 2  # 2: the marked flag also counts the status column
+INDEX_FILE_NAME = "config.index.json"
+CONFIG_FILE_NAME = "config.json"
+
+
+def default_index_path(config_path):
+    """Index file that belongs to a config file"""
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), INDEX_FILE_NAME)
+
+
+def normalize_asset_id(value):
+    """Normalize a cell value the way server.js compares IDs (String(value).trim())"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # JavaScript prints 12345.0 as "12345"
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def cell_text(value):
+    """Trimmed text of a cell, empty for blank cells"""
+    return str(value).strip() if value else ""
+
+
+def is_marked(marked_check, status):
+    """A row is marked when its marked-check or its status cell has a value (every backend uses this rule)"""
+    return ((marked_check is not None and str(marked_check).strip() != "")
+            or (status is not None and str(status).strip() != ""))
+
+
+def file_signature(file_path, with_hash=True):
+    """Size, mtime and optionally SHA-256 of the workbook the index was built from"""
+    st = os.stat(file_path)
+    signature = {
+        "size": st.st_size,
+        "mtimeMs": st.st_mtime_ns // 1_000_000,
+    }
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        signature["sha256"] = digest.hexdigest()
+    return signature
+
+
+@instrumentation.traced("asset_index.build_asset_index")
+def build_asset_index(file_path, sheet_name, columns, matching=None):
+    """Read the inventory sheet once and build the index dict
+
+    columns is the "columns" section of config.json (zero-based indices)
+    and matching its matching rules (None for exact matching). The mapped
+    columns come from the column snapshot, which is rebuilt here if the
+    workbook changed. When an ID or match key appears in several rows the
+    first row wins, matching the top-to-bottom search in server.js.
+    """
+    import column_snapshot  # Deferred so importing this module stays cheap
+
+    rules = barcode_match.normalize_rules(matching)
+    tolerant = barcode_match.rules_active(rules)
+
+    signature = file_signature(file_path)
+    id_cols = [c for c in columns.get("assetIdSearch", []) if c is not None]
+    extra = [columns.get("assetName"), columns.get("assetDescription"), columns.get("markedCheck"),
+             columns.get("status")]
+    read = id_cols + [c for c in extra if c is not None]
+    slots = {}  # "name"/"desc"/"marked"/"status" -> position in read
+    position = len(id_cols)
+    for key, col in zip(("name", "desc", "marked", "status"), extra):
+        if col is not None:
+            slots[key] = position
+            position += 1
+
+    def value(row, key):
+        slot = slots.get(key)
+        return row[slot] if slot is not None else None
+
+    entries = {}
+    variants = {}  # Match key -> ID of the first row with that key
+    for row_number, row in column_snapshot.iter_columns(file_path, sheet_name, read):
+        for slot in range(len(id_cols)):
+            asset_id = normalize_asset_id(row[slot])
+            if asset_id is None or asset_id in entries:
+                continue
+            if tolerant:
+                key = barcode_match.match_key(asset_id, rules)
+                if key is not None:
+                    variants.setdefault(key, asset_id)
+            entries[asset_id] = [
+                row_number,
+                cell_text(value(row, "name")),
+                cell_text(value(row, "desc")),
+                is_marked(value(row, "marked"), value(row, "status")),
+            ]
+
+    return {
+        "version": INDEX_VERSION,
+        "source": dict(signature, filePath=file_path, sheet=sheet_name),
+        "columns": columns,
+        "matching": rules,
+        "entries": entries,
+        "variants": variants,
+    }
+
+
+def write_asset_index(index, index_path):
+    """Write the index atomically (temp file + rename)"""
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+
+def load_asset_index(index_path):
+    """Read an index file, or None if it is missing or unreadable"""
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def index_matches_config(index, config):
+    """True when the index was built for the workbook, sheet, columns and matching rules in config"""
+    excel = config["excel"]
+    source = index.get("source", {})
+    return (source.get("filePath") == excel["filePath"]
+            and source.get("sheet") == excel["sheets"]["inventory"]
+            and index.get("columns") == excel["columns"]
+            and index.get("matching", barcode_match.DEFAULT_MATCHING) == barcode_match.matching_rules(config))
+
+
+def lookup_entry(index, asset_id):
+    """Index entry of a normalized asset ID: exact match first, then its match key"""
+    entries = index["entries"]
+    entry = entries.get(asset_id)
+    if entry is None and index.get("variants"):
+        exact = index["variants"].get(barcode_match.match_key(asset_id, index["matching"]))
+        entry = entries.get(exact) if exact is not None else None
+    return entry
+
+
+def refresh_asset_index(config, index_path, force=False):
+    """Rebuild the index when the workbook changed, returning (index, rebuilt)
+
+    A changed size or mtime triggers a SHA-256 comparison first, so touching
+    the file without changing its content only refreshes the stored stat.
+    """
+    excel = config["excel"]
+    file_path = excel["filePath"]
+    index = None if force else load_asset_index(index_path)
+
+    if index is not None and index_matches_config(index, config):
+        source = index["source"]
+        current = file_signature(file_path, with_hash=False)
+        if current["size"] == source.get("size") and current["mtimeMs"] == source.get("mtimeMs"):
+            return index, False
+        current = file_signature(file_path)
+        if current["sha256"] == source.get("sha256"):
+            source.update(current)
+            write_asset_index(index, index_path)
+            return index, False
+
+    index = build_asset_index(file_path, excel["sheets"]["inventory"], excel["columns"], excel.get("matching"))
+    write_asset_index(index, index_path)
+    return index, True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the asset-ID index used by server.js")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILE_NAME),
+                        help="path to config.json")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the workbook did not change")
+    parser.add_argument("--profile", metavar="NAME", help="index a profile from profiles.json instead of config.json")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.profile:
+            import profiles
+            profiles_path = profiles.default_profiles_path(args.config)
+            config = profiles.get_profile(profiles.load_profiles(profiles_path), args.profile)
+            index_path = profiles.profile_index_path(profiles_path, args.profile)
+        else:
+            with open(args.config, "r") as f:
+                config = json.load(f)
+            index_path = default_index_path(args.config)
+        index, rebuilt = refresh_asset_index(config, index_path, force=args.force)
+    except Exception as e:
+        print(f"❌ Error building asset index: {e}", file=sys.stderr)
+        return 1
+
+    state = "rebuilt" if rebuilt else "up to date"
+    print(f"✅ Asset index {state}: {len(index['entries'])} IDs from '{index['source']['sheet']}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
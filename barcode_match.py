@@ -0,0 +1,136 @@
+"""Tolerant asset-ID matching rules (the "matching" section of config.json).
+
+Scanned barcodes and cell values are compared by a match key derived from
+the trimmed text, with these rules applied in order:
+
+    caseFold           compare case-insensitively
+    stripPrefixes      drop the longest listed prefix (e.g. a scanner's "S")
+    stripSuffixes      drop the longest listed suffix
+    digitsOnly         keep only 0-9
+    stripLeadingZeros  "000123" and "123" match (Excel drops zeros from numbers)
+
+The asset index stores each row's match keys in "variants", so server.js
+still answers a tolerant lookup with hash lookups (an exact ID first, then
+its match key); matchKey() in services/matching.js, used by server.js and
+the app, mirrors match_key() here and must stay in step.
+"""
+import re
+
+import instrumentation
+
+DEFAULT_MATCHING = {
+    "caseFold": False,
+    "stripPrefixes": [],
+    "stripSuffixes": [],
+    "digitsOnly": False,
+    "stripLeadingZeros": False,
+}
+
+_NON_DIGITS = re.compile(r"[^0-9]+")
+
+
+def matching_rules(config):
+    """Matching rules of a config.json dict, with defaults for anything missing"""
+    return normalize_rules(config.get("excel", {}).get("matching"))
+
+
+def normalize_rules(rules):
+    """Complete rules with defaults, in DEFAULT_MATCHING key order"""
+    rules = dict(DEFAULT_MATCHING, **(rules or {}))
+    for key in ("stripPrefixes", "stripSuffixes"):
+        rules[key] = [str(affix).strip() for affix in rules[key] if str(affix).strip()]
+    return rules
+
+
+def rules_active(rules):
+    """True when any rule can make two different IDs match"""
+    return any(rules[key] for key in DEFAULT_MATCHING)
+
+
+def _strip_affix(text, affixes, case_fold, prefix):
+    best = ""
+    for affix in affixes:
+        if case_fold:
+            affix = affix.lower()
+        if len(affix) > len(best) and len(affix) < len(text) and (
+                text.startswith(affix) if prefix else text.endswith(affix)):
+            best = affix
+    if not best:
+        return text
+    return text[len(best):] if prefix else text[:-len(best)]
+
+
+def match_key(asset_id, rules):
+    """Match key of a normalized asset ID (see asset_index.normalize_asset_id), or None"""
+    if asset_id is None:
+        return None
+    text = asset_id
+    if rules["caseFold"]:
+        text = text.lower()
+    if rules["stripPrefixes"]:
+        text = _strip_affix(text, rules["stripPrefixes"], rules["caseFold"], prefix=True)
+    if rules["stripSuffixes"]:
+        text = _strip_affix(text, rules["stripSuffixes"], rules["caseFold"], prefix=False)
+    if rules["digitsOnly"]:
+        text = _NON_DIGITS.sub("", text)
+    if rules["stripLeadingZeros"]:
+        text = text.lstrip("0") or ("0" if text else "")
+    return text or None
+
+
+@instrumentation.traced("barcode_match.collision_report")
+def collision_report(rows, rules):
+    """Count rows whose IDs collide with another row's
+
+    rows yields (row_number, ids) with ids already normalized (None for
+    blanks). A row collides when one of its keys also belongs to a
+    different row. Returns {"rows", "ids", "keys", "collidingRows",
+    "exactCollidingRows", "examples"}, where the exact count is the same
+    check without rules (plain duplicate IDs) and examples lists up to ten
+    [key, first row, other row] triples introduced by the rules.
+    """
+    exact_first, key_first = {}, {}
+    colliding, exact_colliding = set(), set()
+    examples = []
+    row_count = id_count = 0
+    for row_number, ids in rows:
+        seen = False
+        for asset_id in ids:
+            if asset_id is None:
+                continue
+            seen = True
+            id_count += 1
+            first = exact_first.setdefault(asset_id, row_number)
+            exact_duplicate = first != row_number
+            if exact_duplicate:
+                exact_colliding.update((first, row_number))
+            key = match_key(asset_id, rules)
+            if key is None:
+                continue
+            first = key_first.setdefault(key, row_number)
+            if first != row_number:
+                colliding.update((first, row_number))
+                if not exact_duplicate and len(examples) < 10:
+                    examples.append([key, first, row_number])
+        row_count += seen
+    return {
+        "rows": row_count,
+        "ids": id_count,
+        "keys": len(key_first),
+        "collidingRows": len(colliding),
+        "exactCollidingRows": len(exact_colliding),
+        "examples": examples,
+    }
+
+
+def preview_collisions(file_path, sheet_name, id_columns, rules):
+    """collision_report() for the asset ID columns of a sheet"""
+    import column_snapshot  # Deferred so importing this module stays cheap
+    from asset_index import normalize_asset_id
+
+    id_columns = [c for c in id_columns if c is not None]
+    rows = (
+        (row_number, [normalize_asset_id(value) for value in values])
+        for row_number, values in column_snapshot.iter_columns(file_path, sheet_name, id_columns)
+    )
+    return collision_report(rows, rules)
@@ -0,0 +1 @@
+"""Benchmarks for the configuration tools. Run each module with python -m benchmarks.<name>."""
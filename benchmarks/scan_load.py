@@ -0,0 +1,203 @@
+"""Load test for the scan backends: scans/sec and latency percentiles.
+
+    python -m benchmarks.scan_load --workbook inventory.xlsx [--scans 2000] [--concurrency 4]
+    python -m benchmarks.scan_load --workbook inventory.xlsx --url http://localhost:3000
+
+Without --url, scan_service.py is started in-process on a copy of the
+workbook (the original is never written) with the column layout from
+--config or the defaults. With --url, scans go to an already running
+backend (server.js or scan_service.py), which WILL write them to its
+workbook; --workbook then only supplies the asset IDs to scan.
+
+Each worker thread keeps one HTTP connection and posts scans back to back.
+A share of the scans (--miss-rate) uses unknown IDs, which exercises the
+Other sheet path. Latency is measured per request on the client, so the
+in-process numbers include the client threads competing for the GIL.
+"""
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import config_core
+import xlsx_stream
+from asset_index import normalize_asset_id
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = max(0, min(len(sorted_samples) - 1, int(round(fraction * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[rank]
+
+
+def read_asset_ids(config):
+    excel = config["excel"]
+    id_cols = [c for c in excel["columns"]["assetIdSearch"] if c is not None]
+    ids = []
+    for _, values in xlsx_stream.iter_columns(excel["filePath"], excel["sheets"]["inventory"], id_cols):
+        ids.extend(asset_id for asset_id in map(normalize_asset_id, values) if asset_id is not None)
+    return ids
+
+
+def scan_worker(base_url, barcodes, latencies, errors):
+    """Post each barcode over one keep-alive connection, recording latencies in ms"""
+    url = urlsplit(base_url)
+    prefix = url.path.rstrip("/")
+    if not prefix.endswith("/api"):
+        prefix += "/api"
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    for barcode in barcodes:
+        body = json.dumps({"data": barcode, "status": "F", "location": "Load Test", "room": "1"})
+        start = time.perf_counter()
+        try:
+            connection.request("POST", f"{prefix}/barcode", body, headers)
+            response = connection.getresponse()
+            result = json.loads(response.read())
+            if response.status != 200 or not result.get("success"):
+                errors.append(result.get("error", f"HTTP {response.status}"))
+        except Exception as e:
+            errors.append(str(e))
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+
+
+def run_load(base_url, asset_ids, scans, concurrency, miss_rate, seed=0):
+    """Send scans from concurrency threads and summarize throughput and latency"""
+    rng = random.Random(seed)
+    barcodes = [
+        f"LOADTEST-{i}" if rng.random() < miss_rate else rng.choice(asset_ids)
+        for i in range(scans)
+    ]
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=scan_worker, args=(base_url, barcodes[i::concurrency], latencies, errors))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "scans": scans,
+        "concurrency": concurrency,
+        "missRate": miss_rate,
+        "wallSeconds": round(wall, 3),
+        "scansPerSec": round(scans / wall, 1) if wall else None,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "errors": len(errors),
+        "firstErrors": errors[:5],
+    }
+
+
+def load_config_for(args):
+    if args.config:
+        config = config_core.load_config(args.config)
+    else:
+        config = config_core.build_config(
+            args.workbook, config_core.DEFAULT_SHEETS["inventory"], config_core.DEFAULT_SHEETS["other"],
+            config_core.DEFAULT_ASSET_ID_COLUMNS, config_core.DEFAULT_COLUMNS,
+            config_core.DEFAULT_START_ROW, config_core.DEFAULT_END_ROW, ""
+        )
+    config["excel"]["filePath"] = args.workbook
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure scans/sec and latency of a scan backend")
+    parser.add_argument("--workbook", required=True, help="inventory workbook supplying the asset IDs")
+    parser.add_argument("--config", help="config.json with the column layout (default: the built-in defaults)")
+    parser.add_argument("--url", help="base URL of a running backend instead of an in-process scan_service")
+    parser.add_argument("--scans", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4, help="number of simulated scanners")
+    parser.add_argument("--miss-rate", type=float, default=0.1, help="share of scans with unknown IDs")
+    parser.add_argument("--batch-size", type=int, default=50, help="scan_service batch size (in-process only)")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="scan_service flush interval (in-process only)")
+    parser.add_argument("--no-journal", action="store_true", help="run scan_service without its scan journal (in-process only)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    config = load_config_for(args)
+    asset_ids = read_asset_ids(config)
+    if not asset_ids:
+        print("❌ No asset IDs found in the workbook", file=sys.stderr)
+        return 1
+
+    if args.url:
+        report = dict(run_load(args.url, asset_ids, args.scans, args.concurrency, args.miss_rate),
+                      backend=args.url)
+    else:
+        import scan_service
+        import scan_journal
+
+        work_dir = tempfile.mkdtemp(prefix="scan_load_")
+        try:
+            copy_path = os.path.join(work_dir, os.path.basename(args.workbook))
+            shutil.copy(args.workbook, copy_path)
+            config["excel"]["filePath"] = copy_path
+
+            journal = None
+            if not args.no_journal:
+                journal = scan_journal.ScanJournal(os.path.join(work_dir, scan_journal.JOURNAL_FILE_NAME))
+            load_start = time.perf_counter()
+            inventory = scan_service.Inventory(config, args.batch_size, args.flush_interval, journal)
+            load_seconds = time.perf_counter() - load_start
+            server = scan_service.create_server(inventory, "127.0.0.1", 0)
+            inventory.start()
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                report = run_load(f"http://127.0.0.1:{server.server_address[1]}", asset_ids,
+                                  args.scans, args.concurrency, args.miss_rate)
+            finally:
+                server.shutdown()
+                server.server_close()
+                close_start = time.perf_counter()
+                inventory.close()
+                if journal is not None:
+                    journal.close()
+            report.update(
+                backend="scan_service (in-process)",
+                batchSize=args.batch_size,
+                flushIntervalSeconds=args.flush_interval,
+                journal=journal is not None,
+                loadSeconds=round(load_seconds, 3),
+                finalFlushSeconds=round(time.perf_counter() - close_start, 3),
+                flushes=inventory.flushes,
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["python"] = sys.version.split()[0]
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Startup benchmark: core import time and time-to-first-window.
+
+    python -m benchmarks.startup [--repeat 5] [--output startup.json]
+
+Each measurement runs in a fresh interpreter. The core import time comes
+from ``python -X importtime`` (cumulative microseconds for config_core and
+friends). Time-to-first-window is measured from process spawn until the
+configuration window has been shown and the event loop has run once; it
+uses Qt's offscreen platform so it also works without a display.
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose cumulative import time is reported
+IMPORT_MODULES = ["config_core", "asset_index", "config_window"]
+
+FIRST_WINDOW_SCRIPT = """
+import sys, time
+sys.path.insert(0, {repo_dir!r})
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+from config_gui import ConfigWindow
+
+app = QApplication(sys.argv)
+window = ConfigWindow()
+window.show()
+
+def report():
+    print(time.time(), flush=True)
+    app.quit()
+
+QTimer.singleShot(0, report)
+app.exec()
+"""
+
+
+def measure_import_us(module):
+    """Cumulative import time of one module in microseconds, from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def measure_first_window_ms():
+    """Milliseconds from process spawn to the first shown configuration window"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_WINDOW_SCRIPT.format(repo_dir=REPO_DIR)],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    shown = float(result.stdout.strip().splitlines()[-1])
+    return (shown - start) * 1000
+
+
+def summarize(samples):
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def run(repeat, include_window=True):
+    report = {"python": sys.version.split()[0], "repeat": repeat, "importUs": {}}
+    for module in IMPORT_MODULES:
+        report["importUs"][module] = summarize([measure_import_us(module) for _ in range(repeat)])
+    if include_window:
+        report["firstWindowMs"] = summarize([round(measure_first_window_ms(), 1) for _ in range(repeat)])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure configuration tool startup time")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--no-window", action="store_true", help="skip time-to-first-window (no PyQt6 needed)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args.repeat, include_window=not args.no_window)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Synthetic inventory workbooks in the layout the configuration window maps.
+
+    python -m benchmarks.synthetic inventory.xlsx [--rows 100000] [--duplicate-rate 0.01]
+
+The workbook follows the defaults in config_core: a title block, a header
+row just above DEFAULT_START_ROW, asset IDs in the assetIdSearch columns
+(C: numeric asset tag, D: serial number, E: old tag on some rows), name,
+description, status, location, room and marked-check columns, plus an empty
+Other sheet. A share of the rows (--marked-rate) is already scanned, and a
+share (--duplicate-rate) repeats the asset tag of an earlier row, which is
+what real exports with re-tagged equipment look like.
+"""
+import sys
+import os
+import json
+import random
+import argparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import config_core
+
+HEADER_ROW = config_core.DEFAULT_START_ROW - 1
+FIRST_TAG = 100000
+
+# Header text per config.json column key (the asset ID columns come first)
+HEADERS = {
+    "assetName": "Asset Name",
+    "assetDescription": "Description",
+    "status": "Status",
+    "location": "Location",
+    "room": "Room",
+    "markedCheck": "Marked",
+}
+ID_HEADERS = ["Asset Tag", "Serial Number", "Old Tag"]
+
+NAMES = ["Dell OptiPlex 7090", "HP EliteBook 840", "Lenovo ThinkPad T14", "Epson Projector",
+         "Cisco IP Phone 8841", "Apple iMac 24", "Brother Laser Printer", "Dell 27in Monitor"]
+BUILDINGS = ["North Hall", "South Hall", "Library", "Science Center", "Gym"]
+
+
+def synthetic_config(file_path, rows):
+    """config.json dict for a synthetic workbook, counting every data row"""
+    return config_core.build_config(
+        file_path, config_core.DEFAULT_SHEETS["inventory"], config_core.DEFAULT_SHEETS["other"],
+        config_core.DEFAULT_ASSET_ID_COLUMNS, config_core.DEFAULT_COLUMNS,
+        config_core.DEFAULT_START_ROW, config_core.DEFAULT_START_ROW + rows - 1, ""
+    )
+
+
+def generate_rows(rows, duplicate_rate=0.0, marked_rate=0.3, seed=0):
+    """Yield (asset IDs, values by config.json key) for each data row"""
+    rng = random.Random(seed)
+    for n in range(rows):
+        tag = FIRST_TAG + n
+        if n and rng.random() < duplicate_rate:
+            tag = FIRST_TAG + rng.randrange(n)
+        serial = f"SN{rng.getrandbits(40):010X}"
+        old_tag = f"OLD-{tag - FIRST_TAG:06d}" if n % 7 == 0 else None
+        marked = rng.random() < marked_rate
+        yield [tag, serial, old_tag], {
+            "assetName": NAMES[n % len(NAMES)],
+            "assetDescription": f"{NAMES[n % len(NAMES)]} #{n}",
+            "status": "F" if marked else None,
+            "location": rng.choice(BUILDINGS) if marked else None,
+            "room": str(100 + rng.randrange(300)) if marked else None,
+            "markedCheck": "X" if marked else None,
+        }
+
+
+def write_workbook(file_path, rows, duplicate_rate=0.0, marked_rate=0.3, seed=0):
+    """Write a synthetic inventory workbook and return its config.json dict"""
+    import openpyxl  # Deferred so importing this module stays cheap
+
+    id_cols = [config_core.letter_to_index(c) for c in config_core.DEFAULT_ASSET_ID_COLUMNS]
+    value_cols = {key: config_core.letter_to_index(c) for key, c in config_core.DEFAULT_COLUMNS.items()}
+    width = max(id_cols + list(value_cols.values())) + 1
+
+    header = [None] * width
+    for col, text in zip(id_cols, ID_HEADERS):
+        header[col] = text
+    for key, col in value_cols.items():
+        header[col] = HEADERS[key]
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(config_core.DEFAULT_SHEETS["inventory"])
+    sheet.append(["Synthetic inventory"])
+    sheet.append([f"{rows} rows, duplicate rate {duplicate_rate}, seed {seed}"])
+    for _ in range(HEADER_ROW - 3):
+        sheet.append([])
+    sheet.append(header)
+
+    for ids, values in generate_rows(rows, duplicate_rate, marked_rate, seed):
+        row = [None] * width
+        for col, value in zip(id_cols, ids):
+            row[col] = value
+        for key, col in value_cols.items():
+            row[col] = values[key]
+        sheet.append(row)
+
+    workbook.create_sheet(config_core.DEFAULT_SHEETS["other"])
+    workbook.save(file_path)
+    return synthetic_config(file_path, rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic inventory workbook")
+    parser.add_argument("output", help="path of the .xlsx file to write")
+    parser.add_argument("--rows", type=int, default=100000, help="number of data rows")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="share of rows repeating an earlier asset tag")
+    parser.add_argument("--marked-rate", type=float, default=0.3, help="share of rows already scanned")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", help="also write a matching config.json here")
+    args = parser.parse_args(argv)
+
+    config = write_workbook(os.path.abspath(args.output), args.rows, args.duplicate_rate, args.marked_rate, args.seed)
+    if args.config:
+        with open(args.config, "w") as f:
+            json.dump(config, f, indent=2)
+    print(f"✅ Wrote {args.rows} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
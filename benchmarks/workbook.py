@@ -0,0 +1,351 @@
+"""Workbook benchmark: the configuration window and scan paths on synthetic inventories.
+
+    python -m benchmarks.workbook [--rows 1000,10000,100000] [--duplicate-rates 0,0.05]
+                                  [--phases load,test,config,lookup,mark] [--output workbook.json]
+
+For every row count and duplicate rate a workbook is generated with
+benchmarks.synthetic, then each phase runs in a fresh interpreter so its
+peak RSS is its own:
+
+    load     ConfigWindow.load_excel_file until the workbook is applied, then
+             until the background column snapshot is written
+    test     ConfigWindow.test_configuration (first preview page) and the last page
+    config   ConfigWindow.save_configuration including the background asset
+             index and progress rebuild, then load_existing_config
+    lookup   asset index build and load, then lookups as server.js answers them
+    mark     scan_service.Inventory load, scans applied in memory, one flush
+
+The window uses Qt's offscreen platform, so no display is needed, and its
+message boxes and the preview dialog are replaced by non-modal stand-ins.
+Nothing is written outside --work-dir (a temporary directory by default).
+1M-row workbooks work but the mark phase then needs several GB of memory,
+as openpyxl holds the whole sheet; leave it out with --phases.
+"""
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from benchmarks import synthetic
+
+PHASES = ["load", "test", "config", "lookup", "mark"]
+
+# Longest a phase may wait on the Qt event loop, in seconds
+WAIT_TIMEOUT = 1800
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def sample_barcodes(rows, count, miss_rate=0.1, seed=0):
+    """Asset tags of the synthetic workbook, with a share of unknown IDs"""
+    rng = random.Random(seed)
+    return [
+        f"MISS-{i}" if rng.random() < miss_rate else str(synthetic.FIRST_TAG + rng.randrange(rows))
+        for i in range(count)
+    ]
+
+
+class MessageBoxStandIn:
+    """Records the configuration window's message boxes instead of blocking on them"""
+    messages = []
+
+    @classmethod
+    def _record(cls, kind, title, text):
+        cls.messages.append((kind, title, text))
+
+    @classmethod
+    def information(cls, parent, title, text, *args):
+        cls._record("information", title, text)
+
+    @classmethod
+    def warning(cls, parent, title, text, *args):
+        cls._record("warning", title, text)
+
+    @classmethod
+    def critical(cls, parent, title, text, *args):
+        cls._record("critical", title, text)
+
+
+def open_window(work_dir):
+    """Offscreen ConfigWindow whose config.json lives in work_dir"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    import config_core
+    import config_gui
+
+    config_path = os.path.join(work_dir, config_core.CONFIG_FILE_NAME)
+    config_core.default_config_path = lambda: config_path
+    config_gui.QMessageBox = MessageBoxStandIn
+
+    class PreviewStandIn(config_gui.SheetPreviewDialog):
+        """Pages to the end, as a user would, instead of waiting for input"""
+        shown = []
+
+        def exec(self):
+            PreviewStandIn.shown.append(self)
+            self.pages = self.model.page_count()
+            start = time.perf_counter()
+            self.show_page(self.pages - 1)
+            self.last_page_ms = elapsed_ms(start)
+            return 0
+
+    config_gui.SheetPreviewDialog = PreviewStandIn
+    app = QApplication.instance() or QApplication([])
+    return app, config_gui.ConfigWindow(), PreviewStandIn.shown
+
+
+def wait_for(app, done):
+    """Run the Qt event loop until done() is true"""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not done():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for the configuration window")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def wait_idle(app, window):
+    """Let background workers finish, so none outlives the window"""
+    wait_for(app, lambda: window.active_loader is None and window.thread_pool.activeThreadCount() == 0)
+    app.processEvents()  # Deliver the workers' last signals
+    wait_for(app, lambda: window.thread_pool.activeThreadCount() == 0)
+
+
+def check_messages():
+    errors = [text for kind, _, text in MessageBoxStandIn.messages if kind != "information"]
+    if errors:
+        raise RuntimeError(errors[0])
+
+
+def load_workbook(app, window, config):
+    """Load the workbook into the window and fill the form from config"""
+    window.apply_config(config)
+    window.file_path_timer.stop()  # Load now rather than after the typing debounce
+    window.load_excel_file(config["excel"]["filePath"])
+    wait_for(app, lambda: window.active_loader is None)
+    if window.workbook is None:
+        raise RuntimeError(window.validation_label.text())
+    window.select_preferred_sheets()
+    wait_idle(app, window)
+
+
+def phase_load(config, work_dir, args):
+    app, window, _ = open_window(work_dir)
+    start = time.perf_counter()
+    window.load_excel_file(config["excel"]["filePath"])
+    wait_for(app, lambda: window.active_loader is None)
+    wall = elapsed_ms(start)
+    if window.workbook is None:
+        raise RuntimeError(window.validation_label.text())
+    wait_idle(app, window)
+    return {"wallMs": wall, "snapshotMs": elapsed_ms(start), "sheets": len(window.sheet_names),
+            "columns": window.max_columns}
+
+
+def phase_test(config, work_dir, args):
+    app, window, shown = open_window(work_dir)
+    load_workbook(app, window, config)
+
+    start = time.perf_counter()
+    window.test_configuration()
+    wall = elapsed_ms(start)
+    check_messages()
+    if not shown:
+        raise RuntimeError("test_configuration did not open the preview")
+    dialog = shown[-1]
+    wait_idle(app, window)
+    return {"wallMs": round(wall - dialog.last_page_ms, 2), "lastPageMs": dialog.last_page_ms, "pages": dialog.pages}
+
+
+def phase_config(config, work_dir, args):
+    app, window, _ = open_window(work_dir)
+    load_workbook(app, window, config)
+
+    start = time.perf_counter()
+    window.save_configuration()
+    wait_for(app, lambda: window.thread_pool.activeThreadCount() == 0)
+    app.processEvents()  # Deliver the workers' finished signals
+    save_wall = elapsed_ms(start)
+    check_messages()
+
+    start = time.perf_counter()
+    window.load_existing_config()
+    load_wall = elapsed_ms(start)
+    wait_idle(app, window)
+    return {"saveMs": save_wall, "loadMs": load_wall, "status": window.validation_label.text()}
+
+
+def phase_lookup(config, work_dir, args):
+    import asset_index
+
+    index_path = os.path.join(work_dir, "lookup." + asset_index.INDEX_FILE_NAME)
+    start = time.perf_counter()
+    asset_index.refresh_asset_index(config, index_path, force=True)
+    build_wall = elapsed_ms(start)
+
+    start = time.perf_counter()
+    index = asset_index.load_asset_index(index_path)
+    load_wall = elapsed_ms(start)
+
+    barcodes = sample_barcodes(args.rows, args.lookups)
+    found = 0
+    start = time.perf_counter()
+    for barcode in barcodes:
+        if asset_index.lookup_entry(index, asset_index.normalize_asset_id(barcode)) is not None:
+            found += 1
+    wall = time.perf_counter() - start
+    return {"indexBuildMs": build_wall, "indexLoadMs": load_wall, "ids": len(index["entries"]),
+            "lookups": len(barcodes), "found": found,
+            "lookupUs": round(wall * 1e6 / len(barcodes), 3) if barcodes else None}
+
+
+def phase_mark(config, work_dir, args):
+    import scan_service
+
+    config = json.loads(json.dumps(config))
+    copy_path = os.path.join(work_dir, "mark.xlsx")
+    shutil.copy(config["excel"]["filePath"], copy_path)
+    config["excel"]["filePath"] = copy_path
+
+    start = time.perf_counter()
+    inventory = scan_service.Inventory(config, batch_size=args.scans + 1, flush_interval=3600)
+    load_wall = elapsed_ms(start)
+
+    barcodes = sample_barcodes(args.rows, args.scans, seed=1)
+    start = time.perf_counter()
+    for barcode in barcodes:
+        inventory.apply_scan(barcode, "F", "Benchmark", "1")
+    scan_wall = time.perf_counter() - start
+
+    start = time.perf_counter()
+    inventory.flush()
+    flush_wall = elapsed_ms(start)
+    inventory.close()
+    return {"loadMs": load_wall, "scans": len(barcodes),
+            "scanUs": round(scan_wall * 1e6 / len(barcodes), 3) if barcodes else None,
+            "flushMs": flush_wall}
+
+
+PHASE_FUNCTIONS = {
+    "load": phase_load,
+    "test": phase_test,
+    "config": phase_config,
+    "lookup": phase_lookup,
+    "mark": phase_mark,
+}
+
+
+def run_phase_here(args):
+    """Child side: run one phase and print its JSON result"""
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    try:
+        result = PHASE_FUNCTIONS[args.phase](config, args.work_dir, args)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    result["peakRssBytes"] = peak_rss_bytes()
+    print(json.dumps(result), flush=True)
+    # Skip interpreter teardown; Qt objects and open workbooks can make it slow
+    os._exit(0)
+
+
+def run_phase(phase, config_path, work_dir, rows, lookups, scans):
+    """Run one phase in a fresh interpreter and return its result"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    phase_dir = os.path.join(work_dir, phase)
+    os.makedirs(phase_dir, exist_ok=True)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.workbook", "--phase", phase, "--config", config_path,
+         "--work-dir", phase_dir, "--rows", str(rows), "--lookups", str(lookups), "--scans", str(scans)],
+        cwd=REPO_DIR, env=env, capture_output=True, text=True
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        return {"error": (result.stderr.strip().splitlines() or [f"exit code {result.returncode}"])[-1]}
+    return json.loads(lines[-1])
+
+
+def run(row_counts, duplicate_rates, phases, work_dir, lookups, scans):
+    report = {"python": sys.version.split()[0], "platform": sys.platform, "runs": []}
+    for rows in row_counts:
+        for duplicate_rate in duplicate_rates:
+            run_dir = os.path.join(work_dir, f"rows{rows}-dup{duplicate_rate}")
+            os.makedirs(run_dir, exist_ok=True)
+            workbook_path = os.path.join(run_dir, "inventory.xlsx")
+            start = time.perf_counter()
+            config = synthetic.write_workbook(workbook_path, rows, duplicate_rate)
+            generate_wall = elapsed_ms(start)
+            config_path = os.path.join(run_dir, "benchmark.config.json")
+            with open(config_path, "w") as f:
+                json.dump(config, f, indent=2)
+
+            entry = {"rows": rows, "duplicateRate": duplicate_rate, "generateMs": generate_wall,
+                     "fileBytes": os.path.getsize(workbook_path), "phases": {}}
+            for phase in phases:
+                entry["phases"][phase] = run_phase(phase, config_path, run_dir, rows, lookups, scans)
+            report["runs"].append(entry)
+    return report
+
+
+def parse_list(text, kind):
+    return [kind(part) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the configuration window and scan paths")
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated row counts")
+    parser.add_argument("--duplicate-rates", default="0,0.05", help="comma-separated duplicate asset tag rates")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"comma-separated phases ({', '.join(PHASES)})")
+    parser.add_argument("--lookups", type=int, default=10000, help="lookups in the lookup phase")
+    parser.add_argument("--scans", type=int, default=500, help="scans in the mark phase")
+    parser.add_argument("--work-dir", help="keep generated workbooks here (default: a temporary directory)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--phase", choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.phase:
+        args.rows = int(args.rows)
+        run_phase_here(args)
+
+    phases = parse_list(args.phases, str)
+    unknown = [phase for phase in phases if phase not in PHASES]
+    if unknown:
+        parser.error(f"unknown phases: {', '.join(unknown)}")
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="workbook_bench_")
+    try:
+        report = run(parse_list(args.rows, int), parse_list(args.duplicate_rates, float), phases,
+                     work_dir, args.lookups, args.scans)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    failed = any("error" in result for run in report["runs"] for result in run["phases"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Propose column mappings from the first rows of an inventory sheet.
+
+Only the first rows are read (iter_rows(values_only=True)). Each column is
+scored per field from its header text and from the shape of the values
+under it, then fields are assigned greedily so no column is used twice.
+Results are cached per workbook version and sheet (see file_cache.py).
+"""
+import re
+
+from file_cache import JsonFileCache, version_key
+
+# Rows read from the top of the sheet
+SAMPLE_ROWS = 60
+
+# Minimum score for a column to be proposed
+MIN_SCORE = 1.5
+
+# Header keywords per field, strongest first
+HEADER_KEYWORDS = {
+    "assetIdSearch": ["asset id", "asset tag", "asset #", "asset no", "tag", "barcode", "serial",
+                      "property", "decal", "inventory", "asset", "id"],
+    "assetName": ["asset name", "name", "model", "item", "title"],
+    "assetDescription": ["description", "descr", "desc", "details"],
+    "status": ["status", "condition", "found", "scan"],
+    "location": ["building", "bldg", "location", "site", "campus"],
+    "room": ["room", "rm", "office"],
+    "markedCheck": ["marked", "checked", "verified", "inventoried", "scanned", "check", "done"],
+}
+
+MARK_VALUES = {"x", "y", "yes", "true", "1", "✓", "✔", "done", "ok"}
+
+_cache = JsonFileCache("column_detect")
+
+
+def _header_score(text, keywords):
+    """Score header text against keywords; earlier keywords and whole-word hits score higher"""
+    if not isinstance(text, str):
+        return 0.0
+    text = text.strip().lower()
+    if not text:
+        return 0.0
+    for rank, keyword in enumerate(keywords):
+        if text == keyword:
+            return 3.0
+        if re.search(r"\b" + re.escape(keyword) + r"\b", text):
+            return 2.5 - 1.0 * rank / len(keywords)
+    return 0.0
+
+
+def find_header_row(rows):
+    """Index of the row that looks most like a header, or None"""
+    best_row, best_hits = None, 1
+    for i, row in enumerate(rows):
+        # Data like "Room 101" mentions keywords too; header cells rarely contain digits
+        hits = sum(
+            1 for value in row
+            if isinstance(value, str) and not any(c.isdigit() for c in value)
+            and any(_header_score(value, keywords) > 0 for keywords in HEADER_KEYWORDS.values())
+        )
+        if hits > best_hits:
+            best_row, best_hits = i, hits
+    return best_row
+
+
+def _value_profile(values):
+    """Shape of a column's data values"""
+    texts = [str(v).strip() for v in values if v is not None and str(v).strip() != ""]
+    total = len(values) or 1
+    if not texts:
+        return {"fill": 0.0, "unique": 0.0, "mean_len": 0.0, "spaces": 0.0, "digits": 0.0,
+                "marks": 0.0, "short": 0.0}
+    n = len(texts)
+    return {
+        "fill": n / total,
+        "unique": len(set(texts)) / n,
+        "mean_len": sum(len(t) for t in texts) / n,
+        "spaces": sum(1 for t in texts if " " in t) / n,
+        "digits": sum(1 for t in texts if any(c.isdigit() for c in t)) / n,
+        "marks": sum(1 for t in texts if t.lower() in MARK_VALUES) / n,
+        "short": sum(1 for t in texts if len(t) <= 3) / n,
+    }
+
+
+def _value_score(field, p):
+    """Score how well a column's values fit a field (0 to about 1.5)"""
+    if p["fill"] == 0:
+        return 0.0
+    if field == "assetIdSearch":
+        return p["unique"] * p["digits"] * (1.0 - p["spaces"]) * (0.5 + p["fill"])
+    if field == "assetName":
+        return p["spaces"] * min(p["mean_len"], 40) / 40 * p["fill"] + 0.2 * p["unique"]
+    if field == "assetDescription":
+        return p["spaces"] * min(p["mean_len"], 80) / 80 * p["fill"] * 1.5
+    if field == "status":
+        return p["short"] * (1.0 - p["unique"]) * (1.0 - p["marks"] * 0.5)
+    if field == "location":
+        return (1.0 - p["unique"]) * (1.0 - p["short"]) * p["fill"]
+    if field == "room":
+        return p["digits"] * (1.0 - p["spaces"]) * (1.0 - p["unique"] * 0.5) * (0.5 if p["mean_len"] > 8 else 1.0)
+    if field == "markedCheck":
+        return p["marks"] * 1.5
+    return 0.0
+
+
+def detect_columns(rows):
+    """Propose a column mapping from sampled rows (tuples of cell values)
+
+    Returns {"headerRow": 1-based row or None, "columns": {field: index},
+    "scores": {field: score}}, where assetIdSearch maps to a list of up to
+    three indices. Fields without a confident column are left out.
+    """
+    rows = [tuple(row) for row in rows]
+    width = max((len(row) for row in rows), default=0)
+    header_index = find_header_row(rows)
+    headers = rows[header_index] if header_index is not None else ()
+    data_rows = rows[header_index + 1:] if header_index is not None else rows
+
+    scores = {field: [] for field in HEADER_KEYWORDS}
+    for col in range(width):
+        header = headers[col] if col < len(headers) else None
+        profile = _value_profile([row[col] if col < len(row) else None for row in data_rows])
+        for field, keywords in HEADER_KEYWORDS.items():
+            score = _header_score(header, keywords) + _value_score(field, profile)
+            scores[field].append((score, col))
+
+    # Most distinctive fields pick first so generic ones ("name") don't steal their columns
+    columns, field_scores, used = {}, {}, set()
+    for field in ["markedCheck", "assetDescription", "room", "location", "status", "assetName"]:
+        for score, col in sorted(scores[field], reverse=True):
+            if score < MIN_SCORE:
+                break
+            if col not in used:
+                columns[field] = col
+                field_scores[field] = round(score, 2)
+                used.add(col)
+                break
+
+    asset_ids = []
+    for score, col in sorted(scores["assetIdSearch"], reverse=True):
+        if score < MIN_SCORE or len(asset_ids) == 3:
+            break
+        if col not in used:
+            asset_ids.append(col)
+            used.add(col)
+    if asset_ids:
+        columns["assetIdSearch"] = sorted(asset_ids)
+
+    return {
+        "headerRow": header_index + 1 if header_index is not None else None,
+        "columns": columns,
+        "scores": field_scores,
+    }
+
+
+def detect_workbook_columns(workbook, file_path, sheet_name, sample_rows=SAMPLE_ROWS):
+    """Detect columns for a sheet of an open workbook, cached per file version
+
+    Returns (result, cached).
+    """
+    key = version_key(file_path, sheet_name, sample_rows)
+    result = _cache.get(key)
+    if result is not None:
+        return result, True
+
+    ws = workbook[sheet_name]
+    rows = list(ws.iter_rows(max_row=sample_rows, values_only=True))
+    result = detect_columns(rows)
+    _cache.put(key, result)
+    return result, False
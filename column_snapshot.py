@@ -0,0 +1,437 @@
+"""Memory-mapped columnar snapshots of the mapped columns of a sheet.
+
+Every full pass over the inventory (asset index, marked count, data-quality
+scan, scan_service start, the preview's later pages) used to unzip and
+parse the sheet XML again. A snapshot stores just the mapped columns of one
+sheet in a flat binary file under .cache/snapshots/, keyed by the workbook
+path and sheet and stamped with the workbook's size and mtime. It is opened
+with mmap, so loading it copies nothing; values are decoded on access.
+
+iter_columns() is a drop-in replacement for xlsx_stream.iter_columns: it
+serves a fresh snapshot that has the requested columns, and otherwise
+streams the sheet once while writing a new snapshot (the requested columns
+plus those of the previous snapshot, so consumers that read different
+columns do not rebuild each other's). A workbook saved since the snapshot
+was written is detected by its size and mtime and rebuilt on next use.
+
+File layout (little-endian):
+
+    b"BCSNAP01", header length (uint32), JSON header, sections
+
+The header holds the source version, sheet, columns, row count and the
+(offset, length) of every section, counted from the first 8-byte boundary
+after the header; each section starts on an 8-byte boundary:
+
+    rows             uint32 sheet row number per entry
+    c<col>.kinds     uint8 value kind per entry (KIND_*)
+    c<col>.nums      int64 or float64 per entry (by kind)
+    c<col>.offsets   uint32 byte offsets into c<col>.text, one more than rows
+    c<col>.text      UTF-8 text of string values, back to back
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from array import array
+
+import instrumentation
+import workbook_lock
+import xlsx_stream
+from file_cache import cache_dir, file_version
+
+MAGIC = b"BCSNAP01"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR_NAME = "snapshots"
+
+KIND_NONE = 0
+KIND_STR = 1
+KIND_INT = 2
+KIND_FLOAT = 3
+KIND_FALSE = 4
+KIND_TRUE = 5
+KIND_BIG_INT = 6  # Integer outside int64, kept as its decimal text
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+# Serializes rebuilds, so worker threads asking at once build a snapshot only once
+_build_lock = threading.Lock()
+
+
+def snapshot_path(file_path, sheet_name):
+    """Snapshot file for one sheet of a workbook"""
+    key = f"{os.path.abspath(file_path)}|{sheet_name}".encode("utf-8")
+    directory = os.path.join(cache_dir(), SNAPSHOT_DIR_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, hashlib.sha1(key).hexdigest()[:20] + ".colsnap")
+
+
+def config_columns(config):
+    """Every mapped column of a config.json dict, as sorted zero-based indices"""
+    columns = config["excel"]["columns"]
+    used = [c for c in columns.get("assetIdSearch", []) if c is not None]
+    used += [value for key, value in columns.items() if key != "assetIdSearch" and value is not None]
+    return sorted(set(used))
+
+
+def _source(file_path, version=None):
+    path, size, mtime_ns = version or file_version(file_path)
+    return {"filePath": path, "size": size, "mtimeNs": mtime_ns}
+
+
+class _ColumnBuilder:
+    """Accumulates one column's values in the snapshot's section layout"""
+    def __init__(self):
+        self.kinds = array("B")
+        self.nums = array("q")
+        self.floats = {}  # entry -> float, packed into nums when written
+        self.offsets = array("I", [0])
+        self.text = bytearray()
+
+    def append(self, value):
+        kind = KIND_NONE
+        number = 0
+        if isinstance(value, bool):
+            kind = KIND_TRUE if value else KIND_FALSE
+        elif isinstance(value, int):
+            if _INT64_MIN <= value <= _INT64_MAX:
+                kind, number = KIND_INT, value
+            else:
+                kind = KIND_BIG_INT
+                self.text += str(value).encode("ascii")
+        elif isinstance(value, float):
+            kind = KIND_FLOAT
+            self.floats[len(self.kinds)] = value
+        elif value is not None:
+            kind = KIND_STR
+            self.text += str(value).encode("utf-8")
+        self.kinds.append(kind)
+        self.nums.append(number)
+        self.offsets.append(len(self.text))
+
+    def sections(self):
+        nums = self.nums.tobytes()
+        if self.floats:
+            nums = bytearray(nums)
+            for entry, value in self.floats.items():
+                struct.pack_into("<d", nums, entry * 8, value)
+        return [
+            ("kinds", self.kinds.tobytes()),
+            ("nums", bytes(nums)),
+            ("offsets", self.offsets.tobytes()),
+            ("text", bytes(self.text)),
+        ]
+
+
+def _stream(file_path, sheet_name, columns):
+    """xlsx_stream.iter_columns over a copy of the workbook, so a concurrent save cannot tear the read"""
+    with workbook_lock.reading(file_path) as (copy_path, _):
+        yield from xlsx_stream.iter_columns(copy_path, sheet_name, columns)
+
+
+@instrumentation.traced("column_snapshot.write_snapshot")
+def write_snapshot(file_path, sheet_name, columns, path=None):
+    """Stream the columns of a sheet into a new snapshot file and return its path"""
+    path = path or snapshot_path(file_path, sheet_name)
+    columns = sorted(set(columns))
+    rows = array("I")
+    builders = [_ColumnBuilder() for _ in columns]
+    with workbook_lock.reading(file_path) as (copy_path, version):
+        source = _source(file_path, version)  # The version that was copied, whatever happened since
+        for row_number, values in xlsx_stream.iter_columns(copy_path, sheet_name, columns):
+            rows.append(row_number)
+            for builder, value in zip(builders, values):
+                builder.append(value)
+
+    sections = [("rows", rows.tobytes())]
+    for col, builder in zip(columns, builders):
+        sections += [(f"c{col}.{name}", data) for name, data in builder.sections()]
+
+    header = {"version": SNAPSHOT_VERSION, "source": source, "sheet": sheet_name,
+              "columns": columns, "rows": len(rows), "sections": {}}
+    offset = 0
+    for name, data in sections:
+        header["sections"][name] = [offset, len(data)]
+        offset += (len(data) + 7) & ~7
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(len(MAGIC) + 4 + len(header_bytes)) % 8)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for name, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process still has the old snapshot mapped (Windows)
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_header(path):
+    """The JSON header of a snapshot file, or None if it is missing or not a snapshot"""
+    try:
+        with open(path, "rb") as f:
+            start = f.read(len(MAGIC) + 4)
+            if len(start) < len(MAGIC) + 4 or start[:len(MAGIC)] != MAGIC:
+                return None
+            (length,) = struct.unpack("<I", start[len(MAGIC):])
+            header = json.loads(f.read(length))
+    except (OSError, ValueError):
+        return None
+    return header if header.get("version") == SNAPSHOT_VERSION else None
+
+
+def _data_start(header_length):
+    return (len(MAGIC) + 4 + header_length + 7) & ~7
+
+
+class SnapshotColumn:
+    """Read-only sequence of one column's values, decoded from the mapped file"""
+    def __init__(self, kinds, ints, floats, offsets, text):
+        self.kinds = kinds
+        self.ints = ints
+        self.floats = floats
+        self.offsets = offsets
+        self.text = text
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        kind = self.kinds[i]
+        if kind == KIND_NONE:
+            return None
+        if kind == KIND_STR:
+            return str(self.text[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+        if kind == KIND_INT:
+            return self.ints[i]
+        if kind == KIND_FLOAT:
+            return self.floats[i]
+        if kind == KIND_BIG_INT:
+            return int(str(self.text[self.offsets[i]:self.offsets[i + 1]], "ascii"))
+        return kind == KIND_TRUE
+
+    def values(self, start=0, stop=None):
+        """Decoded values of entries start..stop"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        kinds, offsets = self.kinds, self.offsets
+        text = bytes(self.text[offsets[start]:offsets[stop]]) if stop > start else b""
+        base = offsets[start] if stop > start else 0
+        values = []
+        append = values.append
+        for i in range(start, stop):
+            kind = kinds[i]
+            if kind == KIND_STR:
+                append(text[offsets[i] - base:offsets[i + 1] - base].decode("utf-8"))
+            elif kind == KIND_NONE:
+                append(None)
+            elif kind == KIND_INT:
+                append(self.ints[i])
+            else:
+                append(self[i])
+        return values
+
+
+class ColumnSnapshot:
+    """An open snapshot file; close() it (or use it as a context manager) when done"""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._map)
+        self._views = []  # Every view into the map, released by close()
+        (length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        self.header = json.loads(bytes(self._view[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+        self._data_start = _data_start(length)
+        self.source = self.header["source"]
+        self.sheet = self.header["sheet"]
+        self.columns = self.header["columns"]
+        self.row_numbers = self._section("rows", "I")
+        self._columns = {}
+
+    def _section(self, name, fmt):
+        offset, length = self.header["sections"][name]
+        offset += self._data_start
+        view = self._view[offset:offset + length]
+        self._views.append(view)
+        if fmt != "B":
+            view = view.cast(fmt)
+            self._views.append(view)
+        return view
+
+    def __len__(self):
+        return self.header["rows"]
+
+    @property
+    def closed(self):
+        return self._map is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def column(self, col):
+        """Values of one zero-based column"""
+        column = self._columns.get(col)
+        if column is None:
+            column = self._columns[col] = SnapshotColumn(
+                self._section(f"c{col}.kinds", "B"), self._section(f"c{col}.nums", "q"),
+                self._section(f"c{col}.nums", "d"),
+                self._section(f"c{col}.offsets", "I"), self._section(f"c{col}.text", "B"))
+        return column
+
+    def is_current(self, file_path):
+        """True when the workbook still has the size and mtime the snapshot was built from"""
+        try:
+            return _source(file_path) == self.source
+        except OSError:
+            return False
+
+    def covers(self, columns):
+        return set(columns) <= set(self.columns)
+
+    def iter_columns(self, columns, start=0, stop=None):
+        """Yield (row_number, values) like xlsx_stream.iter_columns for entries start..stop"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        decoded = [self.column(col).values(start, stop) for col in columns]
+        rows = self.row_numbers[start:stop].tolist()
+        if not decoded:
+            for row_number in rows:
+                yield row_number, ()
+            return
+        yield from zip(rows, zip(*decoded))
+
+    def entry_range(self, first_row, last_row):
+        """(start, stop) entries whose row numbers fall in first_row..last_row"""
+        rows = self.row_numbers
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rows[mid] < first_row:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = hi = lo
+        hi = len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rows[mid] <= last_row:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def close(self):
+        if self._map is None:
+            return
+        self._columns.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # A caller still holds a view; the map closes when it is collected
+        self._file.close()
+        self._map = None
+
+
+def load_snapshot(file_path, sheet_name, columns=()):
+    """Open the snapshot of a sheet if it is current and has the columns, else None"""
+    path = snapshot_path(file_path, sheet_name)
+    header = read_header(path)
+    if header is None or header["sheet"] != sheet_name or not set(columns) <= set(header["columns"]):
+        return None
+    try:
+        if header["source"] != _source(file_path):
+            return None
+        snapshot = ColumnSnapshot(path)
+    except (OSError, ValueError):
+        return None
+    if not snapshot.is_current(file_path):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def refresh_snapshot(file_path, sheet_name, columns):
+    """Open a current snapshot with the columns, rebuilding it if needed; returns (snapshot, rebuilt)"""
+    snapshot = load_snapshot(file_path, sheet_name, columns)
+    if snapshot is not None:
+        return snapshot, False
+    with _build_lock:
+        snapshot = load_snapshot(file_path, sheet_name, columns)
+        if snapshot is not None:
+            return snapshot, False
+        path = snapshot_path(file_path, sheet_name)
+        previous = read_header(path)
+        wanted = set(columns)
+        if previous is not None and previous["sheet"] == sheet_name:
+            wanted |= set(previous["columns"])
+        write_snapshot(file_path, sheet_name, wanted, path)
+        return ColumnSnapshot(path), True
+
+
+def iter_columns(file_path, sheet_name, columns, build=True):
+    """xlsx_stream.iter_columns served from a snapshot
+
+    A missing or stale snapshot is rebuilt first, or with build=False the
+    sheet is streamed directly instead (for callers that report progress
+    while streaming).
+    """
+    if sys.byteorder != "little":
+        # Snapshots are little-endian and mapped as native arrays
+        yield from _stream(file_path, sheet_name, columns)
+        return
+    try:
+        if build:
+            snapshot, _ = refresh_snapshot(file_path, sheet_name, columns)
+        else:
+            snapshot = load_snapshot(file_path, sheet_name, columns)
+            if snapshot is None:
+                yield from _stream(file_path, sheet_name, columns)
+                return
+    except OSError:
+        # No cache directory or the snapshot is held open elsewhere; read the sheet directly
+        yield from _stream(file_path, sheet_name, columns)
+        return
+    with snapshot:
+        yield from snapshot.iter_columns(columns)
+
+
+def iter_copy(file_path, sheet_name, columns, copy_path, version):
+    """iter_columns for a copy from workbook_lock.reading(), as (copy_path, version)
+
+    Served from the snapshot only when it was built from the copied version,
+    otherwise streamed from the copy, so the rows always match the copy.
+    """
+    snapshot = None
+    if sys.byteorder == "little":
+        try:
+            snapshot, _ = refresh_snapshot(file_path, sheet_name, columns)
+        except OSError:
+            pass
+    if snapshot is not None and snapshot.source != _source(file_path, version):
+        snapshot.close()
+        snapshot = None
+    if snapshot is None:
+        yield from xlsx_stream.iter_columns(copy_path, sheet_name, columns)
+        return
+    with snapshot:
+        yield from snapshot.iter_columns(columns)
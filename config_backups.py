@@ -0,0 +1,255 @@
+"""Deduplicated backups of config.json with a retention policy.
+
+Every save_config() backs up the config.json it replaces into a store
+next to it instead of a new config.json.backup.<timestamp> file:
+
+    config.backups/index.json        backups, oldest first, and the retention policy
+    config.backups/<hash>.json       one file per distinct configuration
+
+Backups are keyed by config_hash() (the settings, not the "meta" stamp),
+so saving the same settings again and again stores them once. The index
+lists every backup with its time and revision, and the policy thins it
+after each backup: the newest keepLast backups, plus the newest backup of
+each of the last keepDaily days and keepWeekly weeks. Content no backup
+refers to any more is deleted. Old config.json.backup.* files are moved
+into the store on the first backup.
+
+    python config_backups.py                        # list backups
+    python config_backups.py --restore 3f2a9c       # restore by hash prefix
+    python config_backups.py --keep-last 20 --keep-daily 14 --keep-weekly 8
+"""
+import sys
+import os
+import glob
+import json
+import argparse
+from datetime import datetime
+
+import config_core
+
+STORE_VERSION = 1
+STORE_DIR_NAME = "config.backups"
+HASH_LENGTH = 16
+LEGACY_TIME_FORMAT = "%Y-%m-%d-%H%M%S"
+
+DEFAULT_RETENTION = {"keepLast": 10, "keepDaily": 7, "keepWeekly": 4}
+
+
+def default_store_dir(config_path):
+    """Backup store that belongs to a config file"""
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), STORE_DIR_NAME)
+
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, "index.json")
+
+
+def _object_path(store_dir, digest):
+    return os.path.join(store_dir, f"{digest}.json")
+
+
+def load_store(store_dir):
+    """Read the backup index, or an empty one if there is none yet"""
+    try:
+        with open(_index_path(store_dir), "r") as f:
+            store = json.load(f)
+    except FileNotFoundError:
+        return {"version": STORE_VERSION, "retention": dict(DEFAULT_RETENTION), "backups": []}
+    if store.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported backup index version: {store.get('version')}")
+    store["retention"] = dict(DEFAULT_RETENTION, **store.get("retention", {}))
+    return store
+
+
+def save_store(store, store_dir):
+    """Write the backup index atomically (temp file + rename)"""
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = _index_path(store_dir) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(store, f, indent=2)
+    os.replace(tmp_path, _index_path(store_dir))
+
+
+def _settings(config):
+    return {key: value for key, value in config.items() if key != "meta"}
+
+
+def _add(store, store_dir, config, saved):
+    digest = config_core.config_hash(config)[:HASH_LENGTH]
+    object_path = _object_path(store_dir, digest)
+    if not os.path.exists(object_path):
+        os.makedirs(store_dir, exist_ok=True)
+        tmp_path = object_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(config, f, indent=2)
+        os.replace(tmp_path, object_path)
+    if store["backups"] and store["backups"][-1]["hash"] == digest:
+        return object_path  # Saved again without changes; the newest backup already holds it
+    store["backups"].append({
+        "hash": digest,
+        "saved": saved,
+        "revision": config_core.config_revision(config),
+    })
+    return object_path
+
+
+def _import_legacy(store, store_dir, config_path):
+    """Move config.json.backup.<timestamp> files into the store"""
+    pattern = glob.escape(os.path.abspath(config_path)) + ".backup.*"
+    for path in sorted(glob.glob(pattern)):
+        stamp = path.rsplit(".backup.", 1)[1]
+        try:
+            saved = datetime.strptime(stamp, LEGACY_TIME_FORMAT).isoformat(timespec="seconds")
+            config = config_core.load_config(path)
+        except ValueError:
+            continue  # Not one of ours, or not JSON; leave it alone
+        _add(store, store_dir, config, saved)
+        os.remove(path)
+    store["backups"].sort(key=lambda backup: backup["saved"])
+
+
+def retained(backups, retention):
+    """Backups the policy keeps, oldest first
+
+    backups is oldest first. A backup is kept if it is one of the newest
+    keepLast, or the newest of its day or ISO week among the last keepDaily
+    days or keepWeekly weeks that have backups.
+    """
+    keep = set()
+    newest_first = list(reversed(range(len(backups))))
+    keep.update(newest_first[:retention["keepLast"]])
+    for count, period in ((retention["keepDaily"], lambda saved: saved.date()),
+                          (retention["keepWeekly"], lambda saved: saved.isocalendar()[:2])):
+        seen = []
+        for i in newest_first:
+            bucket = period(datetime.fromisoformat(backups[i]["saved"]))
+            if bucket not in seen:
+                if len(seen) == count:
+                    break
+                seen.append(bucket)
+                keep.add(i)
+    return [backup for i, backup in enumerate(backups) if i in keep]
+
+
+def prune(store, store_dir):
+    """Apply the retention policy and delete content no backup refers to; returns the number removed"""
+    before = len(store["backups"])
+    store["backups"] = retained(store["backups"], store["retention"])
+    referenced = {backup["hash"] for backup in store["backups"]}
+    for path in glob.glob(os.path.join(glob.escape(store_dir), "*.json")):
+        name = os.path.basename(path)
+        if name != "index.json" and name[:-len(".json")] not in referenced:
+            os.remove(path)
+    return before - len(store["backups"])
+
+
+def backup_config(config_path):
+    """Back up the current config.json into the store, returning the stored file
+
+    Returns None when there is nothing to back up. Unreadable files are
+    skipped rather than blocking the save that replaces them.
+    """
+    if not os.path.exists(config_path):
+        return None
+    try:
+        config = config_core.load_config(config_path)
+    except ValueError:
+        return None
+    store_dir = default_store_dir(config_path)
+    store = load_store(store_dir)
+    _import_legacy(store, store_dir, config_path)
+    object_path = _add(store, store_dir, config, datetime.now().isoformat(timespec="seconds"))
+    prune(store, store_dir)
+    save_store(store, store_dir)
+    return object_path
+
+
+def list_backups(config_path):
+    """Backups newest first, each {"hash", "saved", "revision"}"""
+    return list(reversed(load_store(default_store_dir(config_path))["backups"]))
+
+
+def find_backup(config_path, prefix):
+    """The newest backup whose hash starts with prefix"""
+    matches = [backup for backup in list_backups(config_path) if backup["hash"].startswith(prefix)]
+    if not matches or len({backup["hash"] for backup in matches}) > 1:
+        raise ValueError(f"No single backup matches '{prefix}'")
+    return matches[0]
+
+
+def load_backup(config_path, digest):
+    """The configuration stored under a hash"""
+    return config_core.load_config(_object_path(default_store_dir(config_path), digest))
+
+
+def diff_backup(config_path, digest, config=None):
+    """What restoring a backup would change, as (key, current value, backup value)
+
+    config is the configuration to compare with, config.json when None.
+    """
+    import profiles
+    if config is None:
+        config = config_core.load_config(config_path)
+    return profiles.diff_configs(_settings(config), _settings(load_backup(config_path, digest)))
+
+
+def restore_backup(config_path, digest):
+    """Save a backup as config.json (backing up the current one first); returns the saved config"""
+    config_core.save_config(_settings(load_backup(config_path, digest)), config_path)
+    return config_core.load_config(config_path)
+
+
+def set_retention(config_path, **retention):
+    """Change the retention policy (keepLast, keepDaily, keepWeekly) and prune; returns the number removed"""
+    store_dir = default_store_dir(config_path)
+    store = load_store(store_dir)
+    for key, value in retention.items():
+        if key not in DEFAULT_RETENTION or value < 0:
+            raise ValueError(f"Invalid retention setting: {key}={value}")
+        store["retention"][key] = value
+    removed = prune(store, store_dir)
+    save_store(store, store_dir)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List, restore and thin the config.json backups")
+    parser.add_argument("--config", default=config_core.default_config_path(), help="path to config.json")
+    parser.add_argument("--restore", metavar="HASH", help="restore the backup whose hash starts with HASH")
+    parser.add_argument("--diff", metavar="HASH", help="show what restoring HASH would change")
+    for flag, key in (("--keep-last", "keepLast"), ("--keep-daily", "keepDaily"), ("--keep-weekly", "keepWeekly")):
+        parser.add_argument(flag, dest=key, type=int, metavar="N", help=f"retention: {key} (default {DEFAULT_RETENTION[key]})")
+    args = parser.parse_args(argv)
+
+    try:
+        retention = {key: getattr(args, key) for key in DEFAULT_RETENTION if getattr(args, key) is not None}
+        if retention:
+            removed = set_retention(args.config, **retention)
+            print(f"✅ Retention updated, {removed} backup(s) removed")
+        if args.diff:
+            backup = find_backup(args.config, args.diff)
+            differences = diff_backup(args.config, backup["hash"])
+            for key, current, restored in differences:
+                print(f"{key}: {current!r} -> {restored!r}")
+            print(f"{len(differences)} setting(s) would change")
+            return 0
+        if args.restore:
+            backup = find_backup(args.config, args.restore)
+            config = restore_backup(args.config, backup["hash"])
+            print(f"✅ Restored backup {backup['hash']} from {backup['saved']} "
+                  f"as revision {config_core.config_revision(config)}")
+            return 0
+        backups = list_backups(args.config)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 1
+
+    if not retention:
+        for backup in backups:
+            print(f"{backup['hash']}  {backup['saved']}  revision {backup['revision']}")
+        print(f"{len(backups)} backup(s) of {len({backup['hash'] for backup in backups})} distinct configuration(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""Configuration model shared by the configuration window and headless mode.
+
+Pure Python: column letter math, validation, loading and saving config.json
+and its backups. Nothing here imports PyQt6 or openpyxl, so importing it
+stays cheap (see benchmarks/startup.py).
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+
+CONFIG_FILE_NAME = "config.json"
+
+# Version of the config.json layout, stored in its "meta" section
+CONFIG_FORMAT = 1
+
+# Number of columns in an Excel sheet (A-XFD)
+MAX_COLUMN_INDEX = 16384
+
+# Single-column mappings: (display name, config.json key)
+REQUIRED_COLUMNS = [
+    ("Asset Name", "assetName"),
+    ("Asset Description", "assetDescription"),
+    ("Status", "status"),
+    ("Location", "location"),
+    ("Room", "room"),
+    ("Marked Check", "markedCheck"),
+]
+
+# Defaults matching the original hardcoded server.js layout
+DEFAULT_ASSET_ID_COLUMNS = ["C", "D", "E"]
+DEFAULT_COLUMNS = {
+    "assetName": "F",
+    "assetDescription": "G",
+    "status": "P",
+    "location": "Q",
+    "room": "R",
+    "markedCheck": "S",
+}
+DEFAULT_SHEETS = {"inventory": "Sheet1", "other": "Other"}
+DEFAULT_START_ROW = 6
+DEFAULT_END_ROW = 357
+
+
+def default_config_path():
+    """config.json next to the scripts"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILE_NAME)
+
+
+def _base26_letter(index):
+    letter = ""
+    n = index + 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letter = chr(65 + rem) + letter
+    return letter
+
+
+@lru_cache(maxsize=1)
+def column_letters():
+    """Letters of every Excel column, A through XFD, indexed by zero-based column"""
+    return tuple(_base26_letter(index) for index in range(MAX_COLUMN_INDEX))
+
+
+def letter_to_index(col_letter):
+    """Convert column letter (A, Z, AA, XFD, ...) to zero-based index"""
+    if not col_letter or col_letter == "None":
+        return None
+    col_letter = col_letter.strip().upper()
+    if not col_letter or not col_letter.isascii() or not col_letter.isalpha():
+        return None
+    index = 0
+    for ch in col_letter:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def index_to_letter(index):
+    """Convert zero-based index to column letter"""
+    if index is None:
+        return "None"
+    if index < MAX_COLUMN_INDEX:
+        return column_letters()[index]
+    return _base26_letter(index)
+
+
+class ConfigValidator:
+    """Incremental validation of a column mapping
+
+    Remembers each field's last input and result and only re-parses fields
+    whose input changed. The file-existence check is cached until the path
+    changes or invalidate_file() is called.
+    """
+    def __init__(self):
+        self._file = (None, False)  # (path, exists)
+        self._columns = {}  # field -> (letter, index or None when invalid)
+
+    def invalidate_file(self):
+        """Forget the cached file-existence result"""
+        self._file = (None, False)
+
+    def file_exists(self, file_path):
+        if self._file[0] != file_path:
+            self._file = (file_path, os.path.exists(file_path))
+        return self._file[1]
+
+    def column_index(self, field, col_letter):
+        """Zero-based index for a field's letter, or None if the letter is invalid"""
+        cached = self._columns.get(field)
+        if cached is None or cached[0] != col_letter:
+            idx = letter_to_index(col_letter)
+            cached = (col_letter, idx if idx is not None and idx < MAX_COLUMN_INDEX else None)
+            self._columns[field] = cached
+        return cached[1]
+
+    def validate(self, file_path, asset_id_letters, column_letters, start_row, end_row, ngrok_url):
+        """Same contract as validate_config"""
+        errors = []
+        warnings = []
+
+        # Check if file exists
+        if not self.file_exists(file_path):
+            errors.append("Excel file does not exist")
+
+        # Get selected columns
+        asset_id_cols = []
+        for i, col in enumerate(asset_id_letters):
+            if col != "None":
+                idx = self.column_index(f"assetIdSearch{i}", col)
+                if idx is not None:
+                    asset_id_cols.append((col, idx))
+                else:
+                    errors.append(f"Invalid Asset ID column: {col}")
+
+        # Check required columns
+        required_cols = {}
+        for name, key in REQUIRED_COLUMNS:
+            col = column_letters.get(key, "")
+            idx = self.column_index(key, col)
+            if idx is None:
+                errors.append(f"Invalid {name} column: {col}")
+            else:
+                required_cols[name] = (col, idx)
+
+        # Check for overlaps between Asset ID and other columns
+        asset_id_indices = [idx for _, idx in asset_id_cols]
+        for name, (col, idx) in required_cols.items():
+            if idx in asset_id_indices:
+                warnings.append(f"Warning: {name} column {col} overlaps with Asset ID columns")
+
+        # Summary
+        summary = []
+        asset_id_str = ", ".join([col for col, _ in asset_id_cols]) if asset_id_cols else "None"
+        asset_id_idx_str = ", ".join([str(idx) for _, idx in asset_id_cols]) if asset_id_cols else "None"
+        summary.append(f"Asset ID Columns: {asset_id_str} (indices: {asset_id_idx_str})")
+
+        for name, (col, idx) in required_cols.items():
+            summary.append(f"{name}: {col} (index: {idx})")
+
+        summary.append(f"Row Range: {start_row}-{end_row} (Total: {max(0, end_row - start_row + 1)} items)")
+        summary.append(f"ngrok URL: {ngrok_url}")
+
+        return errors, warnings, summary
+
+
+def validate_config(file_path, asset_id_letters, column_letters, start_row, end_row, ngrok_url):
+    """Validate a column mapping and describe it
+
+    asset_id_letters is up to three letters ("None" for unused) and
+    column_letters maps each REQUIRED_COLUMNS key to a letter.
+    Returns (errors, warnings, summary_lines).
+    """
+    return ConfigValidator().validate(file_path, asset_id_letters, column_letters, start_row, end_row, ngrok_url)
+
+
+def build_config(file_path, inventory_sheet, other_sheet, asset_id_letters, column_letters,
+                 start_row, end_row, ngrok_url, matching=None):
+    """Build the config.json dict from column letters
+
+    matching is the asset-ID matching rules section (see barcode_match.py);
+    it is left out when None, which means exact matching.
+    """
+    config = {
+        "excel": {
+            "filePath": file_path,
+            "sheets": {
+                "inventory": inventory_sheet,
+                "other": other_sheet
+            },
+            "columns": dict(
+                {"assetIdSearch": [letter_to_index(col) for col in asset_id_letters]},
+                **{key: letter_to_index(column_letters[key]) for _, key in REQUIRED_COLUMNS}
+            ),
+            "counting": {
+                "startRow": start_row,
+                "endRow": end_row,
+                "totalCount": end_row - start_row + 1
+            }
+        },
+        "server": {
+            "ngrokUrl": ngrok_url
+        }
+    }
+    if matching is not None:
+        config["excel"]["matching"] = matching
+    return config
+
+
+def load_config(config_path):
+    """Read config.json"""
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def config_hash(config):
+    """SHA-256 of a config's content, ignoring its "meta" section
+
+    Keys are sorted and separators fixed so server.js (configHash) gets the
+    same digest for the same settings however the file was formatted.
+    """
+    content = {key: value for key, value in config.items() if key != "meta"}
+    text = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def config_revision(config):
+    """Revision number from a config's "meta" section (0 before the first versioned save)"""
+    return config.get("meta", {}).get("revision", 0)
+
+
+def config_edited_by_hand(config):
+    """True when the content no longer matches the hash written with it"""
+    meta = config.get("meta")
+    return meta is not None and meta.get("contentHash") != config_hash(config)
+
+
+def config_to_letters(config):
+    """Settings from a config.json dict with column indices turned back into letters
+
+    Only keys present in the config are returned, so callers can keep their
+    own defaults for anything missing.
+    """
+    settings = {}
+    excel = config.get("excel", {})
+    if "filePath" in excel:
+        settings["filePath"] = excel["filePath"]
+    if "sheets" in excel:
+        settings["sheets"] = dict(excel["sheets"])
+
+    if "columns" in excel:
+        cols = excel["columns"]
+        settings["assetIdSearch"] = [
+            index_to_letter(idx) if idx is not None else None
+            for idx in cols.get("assetIdSearch", [])[:3]
+        ]
+        settings["columns"] = {
+            key: index_to_letter(cols[key])
+            for _, key in REQUIRED_COLUMNS if cols.get(key) is not None
+        }
+
+    if "matching" in excel:
+        settings["matching"] = dict(excel["matching"])
+
+    counting = excel.get("counting", {})
+    for key in ("startRow", "endRow"):
+        if key in counting:
+            settings[key] = counting[key]
+
+    server = config.get("server", {})
+    if "ngrokUrl" in server:
+        settings["ngrokUrl"] = server["ngrokUrl"]
+    return settings
+
+
+def stamp_config(config, previous=None):
+    """Copy of config with a "meta" section: format, next revision and content hash"""
+    stamped = {key: value for key, value in config.items() if key != "meta"}
+    stamped["meta"] = {
+        "format": CONFIG_FORMAT,
+        "revision": config_revision(previous or {}) + 1,
+        "contentHash": config_hash(stamped),
+        "saved": datetime.now().isoformat(timespec="seconds"),
+    }
+    return stamped
+
+
+def save_config(config, config_path):
+    """Back up the existing config.json and write the new one
+
+    The new file gets the next revision number and a content hash, and
+    replaces the old one atomically (temp file + rename), so the watchers
+    in server.js, scan_service.py and the configuration window never read
+    a half-written file. The old file goes into the backup store (see
+    config_backups.py). Returns the backup path, or None if there was
+    nothing to back up.
+    """
+    import config_backups  # Deferred: it imports this module
+
+    backup_path = config_backups.backup_config(config_path)
+    previous = None
+    if os.path.exists(config_path):
+        try:
+            previous = load_config(config_path)
+        except ValueError:
+            previous = None  # Unreadable; numbering starts over
+
+    tmp_path = config_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(stamp_config(config, previous), f, indent=2)
+    os.replace(tmp_path, config_path)
+    return backup_path
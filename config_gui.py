@@ -0,0 +1,2458 @@
+"""PyQt6 configuration window. Launch it with: python config_window.py"""
+import os
+import threading
+from PyQt6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QGroupBox, QLabel, QLineEdit, QPushButton, QComboBox, QSpinBox,
+    QTextEdit, QFileDialog, QMessageBox, QInputDialog,
+    QRadioButton, QButtonGroup, QProgressBar, QDialog, QTableView, QHeaderView, QCheckBox
+)
+from PyQt6.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, QAbstractTableModel, QAbstractListModel,
+    QModelIndex, QFileSystemWatcher
+)
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
+import asset_index
+import barcode_match
+import column_detect
+import column_snapshot
+import config_backups
+import config_core
+import data_quality
+import instrumentation
+import lookup_pack
+import profiles
+import progress_counter
+import progress_report
+import reconcile
+import scan_journal
+import sheet_inspect
+import workbook_lock
+from config_core import letter_to_index, index_to_letter
+from file_cache import WorkbookCache, file_version
+
+
+# Delay between the last keystroke in the file path field and the workbook load
+FILE_PATH_DEBOUNCE_MS = 400
+
+# Workbooks kept open, so switching back to a recent file does not re-open it
+WORKBOOK_CACHE_SIZE = 3
+
+# Delay between the last change to the matching rules or ID columns and the collision preview
+MATCH_PREVIEW_DEBOUNCE_MS = 300
+
+# Delay between a change to config.json on disk and applying it (saves fire several events)
+CONFIG_RELOAD_DEBOUNCE_MS = 200
+
+# How often the marked count is re-read from config.progress.json
+PROGRESS_POLL_MS = 2000
+
+# Rows held in memory by the sample preview at any one time
+PREVIEW_PAGE_SIZE = 50
+
+# Diagnostics dialog refresh and Prometheus text file export intervals
+DIAGNOSTICS_REFRESH_MS = 1000
+TRACE_EXPORT_MS = 10000
+
+
+def open_workbook(file_path):
+    """Open a workbook read-only with cached values, as every window code path reads it"""
+    import openpyxl  # Deferred until a workbook is actually opened
+    with instrumentation.timed("openpyxl.load_workbook"):
+        # A copy of the current version, so a save by server.js cannot change the file under the open workbook
+        return openpyxl.load_workbook(workbook_lock.stable_snapshot(file_path), read_only=True, data_only=True)
+
+
+class WorkbookLoadSignals(QObject):
+    """Signals for WorkbookLoader (QRunnable is not a QObject)"""
+    progress = pyqtSignal(int, str)
+    loaded = pyqtSignal(int, object, list)
+    failed = pyqtSignal(int, str)
+
+
+class WorkbookLoader(QRunnable):
+    """Open an Excel workbook on a QThreadPool worker instead of the GUI thread
+
+    Workbooks come from (and stay owned by) the window's WorkbookCache.
+    """
+    def __init__(self, generation, file_path, cache):
+        super().__init__()
+        self.generation = generation
+        self.file_path = file_path
+        self.cache = cache
+        self.signals = WorkbookLoadSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; a workbook opened after this point is left in the cache"""
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        try:
+            self.signals.progress.emit(self.generation, "Opening workbook...")
+            workbook = self.cache.get(self.file_path)
+            if self.is_cancelled():
+                return
+
+            self.signals.loaded.emit(self.generation, workbook, workbook.sheetnames)
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.failed.emit(self.generation, str(e))
+
+
+class AssetIndexSignals(QObject):
+    """Signals for AssetIndexBuilder"""
+    finished = pyqtSignal(int, bool)
+    failed = pyqtSignal(str)
+
+
+class AssetIndexBuilder(QRunnable):
+    """Build config.index.json and the device lookup pack for a saved configuration on a QThreadPool worker
+
+    The same index is also written to each path in copies (profile indexes),
+    each with its own lookup pack.
+    """
+    def __init__(self, config, index_path, copies=()):
+        super().__init__()
+        self.config = config
+        self.index_path = index_path
+        self.copies = list(copies)
+        self.signals = AssetIndexSignals()
+
+    def run(self):
+        try:
+            index, rebuilt = asset_index.refresh_asset_index(self.config, self.index_path)
+            for path in self.copies:
+                asset_index.write_asset_index(index, path)
+            for path in [self.index_path] + self.copies:
+                lookup_pack.refresh_lookup_pack(index, lookup_pack.pack_path_for_index(path))
+            self.signals.finished.emit(len(index["entries"]), rebuilt)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class SnapshotSignals(QObject):
+    """Signals for SnapshotBuilder"""
+    finished = pyqtSignal(int, bool)
+    failed = pyqtSignal(str)
+
+
+class SnapshotBuilder(QRunnable):
+    """Bring the column snapshot of the mapped columns up to date on a QThreadPool worker"""
+    def __init__(self, file_path, sheet_name, columns):
+        super().__init__()
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.columns = list(columns)
+        self.signals = SnapshotSignals()
+
+    def run(self):
+        try:
+            snapshot, rebuilt = column_snapshot.refresh_snapshot(self.file_path, self.sheet_name, self.columns)
+            with snapshot:
+                self.signals.finished.emit(len(snapshot), rebuilt)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class SheetInspectSignals(QObject):
+    """Signals for SheetInspector"""
+    finished = pyqtSignal(str, list, bool)
+    failed = pyqtSignal(str)
+
+
+class SheetInspector(QRunnable):
+    """Collect used range, header row and inventory score of every sheet on a QThreadPool worker"""
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = SheetInspectSignals()
+
+    def run(self):
+        try:
+            results, cached = sheet_inspect.inspect_workbook(self.file_path)
+            self.signals.finished.emit(self.file_path, results, cached)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class CollisionPreviewSignals(QObject):
+    """Signals for CollisionPreviewer"""
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+
+class CollisionPreviewer(QRunnable):
+    """Count rows whose asset IDs collide under matching rules on a QThreadPool worker"""
+    def __init__(self, file_path, sheet_name, id_columns, rules):
+        super().__init__()
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.id_columns = list(id_columns)
+        self.rules = rules
+        self.signals = CollisionPreviewSignals()
+
+    def run(self):
+        try:
+            report = barcode_match.preview_collisions(self.file_path, self.sheet_name, self.id_columns, self.rules)
+            self.signals.finished.emit(report)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class ProgressSignals(QObject):
+    """Signals for ProgressRefresher"""
+    finished = pyqtSignal(int, int)
+    failed = pyqtSignal(str)
+
+
+class ProgressRefresher(QRunnable):
+    """Bring config.progress.json (and profile copies) up to date on a QThreadPool worker"""
+    def __init__(self, config, progress_paths):
+        super().__init__()
+        self.config = config
+        self.progress_paths = list(progress_paths)
+        self.signals = ProgressSignals()
+
+    def run(self):
+        if not self.progress_paths:
+            self.signals.failed.emit("No progress file to update")
+            return
+        try:
+            for path in self.progress_paths:
+                progress, _ = progress_counter.refresh_progress(self.config, path)
+            self.signals.finished.emit(progress["markedCount"], progress["counting"]["totalCount"])
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class DataQualitySignals(QObject):
+    """Signals for DataQualityScanner"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+
+class DataQualityScanner(QRunnable):
+    """Run data_quality.scan_workbook on a QThreadPool worker"""
+    def __init__(self, file_path, sheet_name, columns, start_row, end_row):
+        super().__init__()
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.columns = columns
+        self.start_row = start_row
+        self.end_row = end_row
+        self.signals = DataQualitySignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            report = data_quality.scan_workbook(
+                self.file_path, self.sheet_name, self.columns, self.start_row, self.end_row,
+                progress=self.signals.progress.emit, is_cancelled=self._cancelled.is_set
+            )
+            self.signals.finished.emit(report)
+        except data_quality.ScanCancelled:
+            pass
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class ProgressReportSignals(QObject):
+    """Signals for ProgressReporter"""
+    finished = pyqtSignal(dict, bool)
+    failed = pyqtSignal(str)
+
+
+class ProgressReporter(QRunnable):
+    """Build (or fetch the cached) per-building progress report on a QThreadPool worker"""
+    def __init__(self, config):
+        super().__init__()
+        self.config = config
+        self.signals = ProgressReportSignals()
+
+    def run(self):
+        try:
+            report, cached = progress_report.progress_report(self.config)
+            self.signals.finished.emit(report, cached)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class ReconcileSignals(QObject):
+    """Signals for OtherReconciler"""
+    finished = pyqtSignal(dict, str)
+    failed = pyqtSignal(str)
+
+
+class OtherReconciler(QRunnable):
+    """Classify the Other sheet against the inventory and export it on a QThreadPool worker"""
+    def __init__(self, config, out_path):
+        super().__init__()
+        self.config = config
+        self.out_path = out_path
+        self.signals = ReconcileSignals()
+
+    def run(self):
+        try:
+            counts = reconcile.export_reconciliation(self.config, self.out_path)
+            self.signals.finished.emit(counts, self.out_path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class ColumnListModel(QAbstractListModel):
+    """Column list shared by every column dropdown: "None", then A, B, C, ...
+
+    Row r > 0 is zero-based column r - 1, so selecting a column is plain
+    index math. Letters come from config_core's precomputed table and the
+    display text adds the sheet's header, e.g. "C - Asset ID". EditRole
+    always returns the bare letter.
+    """
+    def __init__(self, count=26, parent=None):
+        super().__init__(parent)
+        self.count = count
+        self.headers = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        row = index.row()
+        if row == 0:
+            return "None"
+        letter = index_to_letter(row - 1)
+        if role == Qt.ItemDataRole.DisplayRole and row - 1 < len(self.headers) and self.headers[row - 1]:
+            return f"{letter} - {self.headers[row - 1]}"
+        return letter
+
+    def set_columns(self, count, headers=()):
+        """Resize to count columns and replace the header text
+
+        Rows are inserted or removed at the end, so dropdowns keep their
+        selection as long as it stays within count.
+        """
+        count = max(1, min(count, config_core.MAX_COLUMN_INDEX))
+        if count > self.count:
+            self.beginInsertRows(QModelIndex(), self.count + 1, count)
+            self.count = count
+            self.endInsertRows()
+        elif count < self.count:
+            self.beginRemoveRows(QModelIndex(), count + 1, self.count)
+            self.count = count
+            self.endRemoveRows()
+        headers = list(headers)
+        if headers != self.headers:
+            self.headers = headers
+            self.dataChanged.emit(self.index(1), self.index(self.count))
+
+
+class SheetPreviewModel(QAbstractTableModel):
+    """Paged, read-only view of the mapped columns over a row range of a worksheet
+
+    Only the current page is kept in memory. Each page is read in a single
+    iter_rows pass bounded to the mapped columns, or sliced straight out of
+    a column snapshot when one is given, which keeps later pages as quick
+    as the first.
+    """
+    def __init__(self, worksheet, columns, labels, start_row, end_row, page_size=PREVIEW_PAGE_SIZE, parent=None,
+                 snapshot=None):
+        super().__init__(parent)
+        self.worksheet = worksheet
+        self.snapshot = snapshot
+        self.columns = columns  # 1-based column numbers, in display order
+        self.labels = labels
+        self.start_row = start_row
+        self.end_row = max(start_row, end_row)
+        self.page_size = page_size
+        self.page = 0
+        self.rows = []
+        self.load_page(0)
+
+    def page_count(self):
+        total = self.end_row - self.start_row + 1
+        return max(1, (total + self.page_size - 1) // self.page_size)
+
+    def page_first_row(self):
+        return self.start_row + self.page * self.page_size
+
+    @instrumentation.traced()
+    def load_page(self, page):
+        """Read one page of rows from the worksheet, replacing the previous page"""
+        page = max(0, min(page, self.page_count() - 1))
+        first_row = self.start_row + page * self.page_size
+        last_row = min(self.end_row, first_row + self.page_size - 1)
+        min_col = min(self.columns)
+        max_col = max(self.columns)
+        offsets = [col - min_col for col in self.columns]
+
+        rows = []
+        if self.snapshot is not None and not self.snapshot.closed:
+            start, stop = self.snapshot.entry_range(first_row, last_row)
+            found = dict(self.snapshot.iter_columns([col - 1 for col in self.columns], start, stop))
+            blank = (None,) * len(offsets)
+            rows = [found.get(row, blank) for row in range(first_row, last_row + 1)]
+        else:
+            for values in self.worksheet.iter_rows(min_row=first_row, max_row=last_row,
+                                                   min_col=min_col, max_col=max_col, values_only=True):
+                rows.append(tuple(values[i] if i < len(values) else None for i in offsets))
+        # Rows past the end of the sheet come back missing; show them as blank
+        expected = last_row - first_row + 1
+        rows.extend([(None,) * len(offsets)] * (expected - len(rows)))
+
+        self.beginResetModel()
+        self.page = page
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        return str(value) if value is not None else ""
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.labels[section]
+        return str(self.page_first_row() + section)
+
+
+class SheetPreviewDialog(QDialog):
+    """Dialog that pages through a SheetPreviewModel"""
+    def __init__(self, model, message, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.setWindowTitle("Configuration Test - Sample Data")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(message))
+
+        table = QTableView()
+        table.setModel(model)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        layout.addWidget(table)
+
+        nav_layout = QHBoxLayout()
+        self.prev_btn = QPushButton("< Previous")
+        self.prev_btn.clicked.connect(lambda: self.show_page(self.model.page - 1))
+        self.next_btn = QPushButton("Next >")
+        self.next_btn.clicked.connect(lambda: self.show_page(self.model.page + 1))
+        self.page_label = QLabel()
+        nav_layout.addWidget(self.prev_btn)
+        nav_layout.addWidget(self.page_label)
+        nav_layout.addWidget(self.next_btn)
+        nav_layout.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        nav_layout.addWidget(close_btn)
+        layout.addLayout(nav_layout)
+
+        self.update_navigation()
+
+    def show_page(self, page):
+        self.model.load_page(page)
+        self.update_navigation()
+
+    def update_navigation(self):
+        first_row = self.model.page_first_row()
+        last_row = min(self.model.end_row, first_row + self.model.page_size - 1)
+        self.page_label.setText(
+            f"Page {self.model.page + 1} of {self.model.page_count()} (rows {first_row}-{last_row})")
+        self.prev_btn.setEnabled(self.model.page > 0)
+        self.next_btn.setEnabled(self.model.page < self.model.page_count() - 1)
+
+
+class JournalReplaySignals(QObject):
+    """Signals for JournalReplayer"""
+    finished = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+
+class JournalReplayer(QRunnable):
+    """Write a journal's pending scans into the workbook on a QThreadPool worker"""
+    def __init__(self, config, journal_path, progress_path):
+        super().__init__()
+        self.config = config
+        self.journal_path = journal_path
+        self.progress_path = progress_path
+        self.signals = JournalReplaySignals()
+
+    def run(self):
+        try:
+            import scan_service  # Deferred: only needed for a replay
+            self.signals.finished.emit(
+                scan_service.replay_journal(self.config, self.journal_path, self.progress_path))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class JournalTableModel(QAbstractTableModel):
+    """Scan journal entries, newest first"""
+    HEADERS = ["Seq", "Time", "Barcode", "Status", "Building", "Room", "Device", "State"]
+    KEYS = ["seq", "timestamp", "barcode", "status", "location", "room", "device"]
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+        self.applied_through = 0
+
+    def load(self, journal_path):
+        self.beginResetModel()
+        scans, self.applied_through = scan_journal.read_journal(journal_path)
+        self.entries = scans[::-1]
+        self.endResetModel()
+
+    def pending_count(self):
+        return sum(1 for entry in self.entries if entry["seq"] > self.applied_through)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if index.column() == len(self.KEYS):
+            return "Applied" if entry["seq"] <= self.applied_through else "Pending"
+        value = entry.get(self.KEYS[index.column()])
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class JournalDialog(QDialog):
+    """Pending and applied scans of a journal, with a one-click replay into the workbook"""
+    def __init__(self, sources, thread_pool, parent=None):
+        super().__init__(parent)
+        self.sources = sources  # {label: (config, journal_path, progress_path)}
+        self.thread_pool = thread_pool
+        self.replayer = None
+        self.model = JournalTableModel()
+        self.setWindowTitle("Scan Journal")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+        source_layout = QHBoxLayout()
+        source_layout.addWidget(QLabel("Journal:"))
+        self.source_combo = QComboBox()
+        self.source_combo.addItems(list(sources))
+        self.source_combo.currentIndexChanged.connect(self.refresh)
+        source_layout.addWidget(self.source_combo)
+        source_layout.addStretch()
+        layout.addLayout(source_layout)
+
+        table = QTableView()
+        table.setModel(self.model)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        layout.addWidget(table)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        self.replay_btn = QPushButton("Replay Pending")
+        self.replay_btn.setToolTip("Write pending scans into the workbook")
+        self.replay_btn.clicked.connect(self.replay)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(self.replay_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def refresh(self):
+        _, journal_path, _ = self.sources[self.source_combo.currentText()]
+        self.model.load(journal_path)
+        pending = self.model.pending_count()
+        self.status_label.setText(
+            f"{pending} pending, {len(self.model.entries) - pending} applied ({os.path.basename(journal_path)})")
+        self.replay_btn.setEnabled(pending > 0 and self.replayer is None)
+
+    def replay(self):
+        reply = QMessageBox.question(
+            self, "Replay Scans",
+            "Write the pending scans into the workbook now?\n\n"
+            "Stop the server first so it does not overwrite the workbook at the same time.")
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        config, journal_path, progress_path = self.sources[self.source_combo.currentText()]
+        self.replayer = JournalReplayer(config, journal_path, progress_path)
+        self.replayer.signals.finished.connect(self.on_replay_finished)
+        self.replayer.signals.failed.connect(self.on_replay_failed)
+        self.replay_btn.setEnabled(False)
+        self.status_label.setText("⏳ Replaying scans...")
+        self.thread_pool.start(self.replayer)
+
+    def on_replay_finished(self, count):
+        self.replayer = None
+        self.refresh()
+        self.status_label.setText(f"✅ Replayed {count} scans. " + self.status_label.text())
+
+    def on_replay_failed(self, error):
+        self.replayer = None
+        self.refresh()
+        QMessageBox.critical(self, "Error", f"Error replaying scans:\n{error}")
+
+
+class BackupTableModel(QAbstractTableModel):
+    """config.json backups from the backup index, newest first"""
+    HEADERS = ["Saved", "Revision", "Hash", "Changes"]
+
+    def __init__(self):
+        super().__init__()
+        self.backups = []
+        self.changes = {}  # Hash -> settings that differ from config.json
+
+    def load(self, config_path):
+        self.beginResetModel()
+        self.backups = config_backups.list_backups(config_path)
+        current = config_core.load_config(config_path) if os.path.exists(config_path) else {}
+        self.changes = {}
+        for backup in self.backups:
+            if backup["hash"] not in self.changes:
+                try:
+                    self.changes[backup["hash"]] = len(config_backups.diff_backup(config_path, backup["hash"], current))
+                except (OSError, ValueError):
+                    self.changes[backup["hash"]] = None  # Content missing or unreadable
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.backups)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        backup = self.backups[index.row()]
+        if index.column() == 0:
+            return backup["saved"].replace("T", " ")
+        if index.column() == 1:
+            return str(backup["revision"])
+        if index.column() == 2:
+            return backup["hash"]
+        changes = self.changes.get(backup["hash"])
+        if changes is None:
+            return "missing"
+        return "same as current" if changes == 0 else f"{changes} setting(s)"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class BackupsDialog(QDialog):
+    """Backups of config.json: compare with the current file, restore one, set the retention policy"""
+    def __init__(self, config_path, parent=None):
+        super().__init__(parent)
+        self.config_path = config_path
+        self.restored = None  # The restored config.json dict, once one is restored
+        self.model = BackupTableModel()
+        self.setWindowTitle("Configuration Backups")
+        self.resize(700, 450)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        retention_layout = QHBoxLayout()
+        retention_layout.addWidget(QLabel("Keep the last"))
+        self.retention_spins = {}
+        for key, suffix in (("keepLast", "backups, the newest of"), ("keepDaily", "days and of"),
+                            ("keepWeekly", "weeks")):
+            spin = QSpinBox()
+            spin.setRange(0, 999)
+            self.retention_spins[key] = spin
+            retention_layout.addWidget(spin)
+            retention_layout.addWidget(QLabel(suffix))
+        apply_btn = QPushButton("Apply")
+        apply_btn.setToolTip("Save the retention policy and remove the backups it no longer keeps")
+        apply_btn.clicked.connect(self.apply_retention)
+        retention_layout.addWidget(apply_btn)
+        retention_layout.addStretch()
+        layout.addLayout(retention_layout)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        diff_btn = QPushButton("Diff...")
+        diff_btn.clicked.connect(self.diff_selected)
+        restore_btn = QPushButton("Restore")
+        restore_btn.clicked.connect(self.restore_selected)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        button_layout.addWidget(diff_btn)
+        button_layout.addWidget(restore_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def refresh(self):
+        try:
+            self.model.load(self.config_path)
+            retention = config_backups.load_store(config_backups.default_store_dir(self.config_path))["retention"]
+        except (OSError, ValueError) as e:
+            self.status_label.setText(f"❌ Error reading backups: {e}")
+            return
+        for key, spin in self.retention_spins.items():
+            spin.setValue(retention[key])
+        distinct = len({backup["hash"] for backup in self.model.backups})
+        self.status_label.setText(f"{len(self.model.backups)} backup(s) of {distinct} distinct configuration(s)")
+
+    def selected_backup(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.information(self, "Backups", "Select a backup first.")
+            return None
+        return self.model.backups[rows[0].row()]
+
+    def diff_selected(self):
+        backup = self.selected_backup()
+        if backup is None:
+            return
+        try:
+            differences = config_backups.diff_backup(self.config_path, backup["hash"])
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Error reading backup:\n{str(e)}")
+            return
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Diff Backup")
+        if not differences:
+            msg.setText(f"The backup from {backup['saved']} has the same settings as config.json.")
+        else:
+            msg.setText(f"Restoring the backup from {backup['saved']} changes {len(differences)} setting(s).")
+            msg.setDetailedText("\n".join(
+                f"{key}: {current!r} -> {restored!r}" for key, current, restored in differences
+            ))
+        msg.exec()
+
+    def restore_selected(self):
+        backup = self.selected_backup()
+        if backup is None:
+            return
+        reply = QMessageBox.question(
+            self, "Restore Backup",
+            f"Replace config.json with the backup from {backup['saved']}?\n\n"
+            "The current config.json is backed up first.")
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            self.restored = config_backups.restore_backup(self.config_path, backup["hash"])
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error restoring backup:\n{str(e)}")
+            return
+        self.accept()
+
+    def apply_retention(self):
+        retention = {key: spin.value() for key, spin in self.retention_spins.items()}
+        try:
+            removed = config_backups.set_retention(self.config_path, **retention)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Error applying retention:\n{str(e)}")
+            return
+        self.refresh()
+        self.status_label.setText(f"✅ {removed} backup(s) removed. " + self.status_label.text())
+
+
+class ProgressReportModel(QAbstractTableModel):
+    """Rows of progress_report.report_rows(): building totals followed by their rooms"""
+    HEADERS = progress_report.CSV_HEADERS
+
+    def __init__(self):
+        super().__init__()
+        self.report = None
+        self.rows = []
+
+    def load(self, report, unfinished_only):
+        self.beginResetModel()
+        self.report = report
+        self.rows = list(progress_report.report_rows(report, unfinished_only))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        building_total = row[1] == "(all)"
+        if role == Qt.ItemDataRole.DisplayRole:
+            if index.column() == 0 and not building_total:
+                return ""  # The building is on its total row just above
+            return str(row[index.column()])
+        if role == Qt.ItemDataRole.FontRole and building_total:
+            font = QFont()
+            font.setBold(True)
+            return font
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() >= 2:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class ProgressReportDialog(QDialog):
+    """Marked and unmarked assets per building and room, with CSV export"""
+    def __init__(self, config, thread_pool, parent=None):
+        super().__init__(parent)
+        self.model = ProgressReportModel()
+        self.setWindowTitle("Progress by Building")
+        self.resize(700, 550)
+
+        layout = QVBoxLayout(self)
+        self.unfinished_check = QCheckBox("Only buildings and rooms with unmarked assets")
+        self.unfinished_check.toggled.connect(self.reload_rows)
+        layout.addWidget(self.unfinished_check)
+
+        table = QTableView()
+        table.setModel(self.model)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(table)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel(f"⏳ Counting '{config['excel']['sheets']['inventory']}'...")
+        self.export_btn = QPushButton("Export CSV...")
+        self.export_btn.setEnabled(False)
+        self.export_btn.clicked.connect(self.export)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        button_layout.addWidget(self.export_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.reporter = ProgressReporter(config)  # Keep the signals object alive until the worker reports
+        self.reporter.signals.finished.connect(self.on_report)
+        self.reporter.signals.failed.connect(self.on_report_failed)
+        thread_pool.start(self.reporter)
+
+    def on_report(self, report, cached):
+        self.reporter = None
+        self.model.load(report, self.unfinished_check.isChecked())
+        self.export_btn.setEnabled(True)
+        left = report["total"] - report["marked"]
+        source = " (cached)" if cached else ""
+        self.status_label.setText(
+            f"{report['marked']}/{report['total']} marked, {left} left in {len(report['buildings'])} building(s){source}")
+
+    def on_report_failed(self, error):
+        self.reporter = None
+        self.status_label.setText(f"❌ Error building report: {error}")
+
+    def reload_rows(self):
+        if self.model.report is not None:
+            self.model.load(self.model.report, self.unfinished_check.isChecked())
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Progress", "progress.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            progress_report.write_csv(self.model.report, path, self.unfinished_check.isChecked())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error exporting report:\n{str(e)}")
+            return
+        self.status_label.setText(f"✅ Exported to {os.path.basename(path)}")
+
+
+class MetricsTableModel(QAbstractTableModel):
+    """Timer summaries and counters from instrumentation.snapshot()"""
+    HEADERS = ["Name", "Calls", "Total ms", "Mean ms", "p50 ms", "p95 ms", "Max ms", "Last ms"]
+    KEYS = ["count", "totalMs", "meanMs", "p50Ms", "p95Ms", "maxMs", "lastMs"]
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []  # (name, summary dict)
+
+    def load(self, data):
+        self.beginResetModel()
+        self.rows = sorted(data["timers"].items(), key=lambda item: -item[1]["totalMs"])
+        self.rows += [(name, {"count": value}) for name, value in sorted(data["counters"].items())]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        name, summary = self.rows[index.row()]
+        if index.column() == 0:
+            return name
+        value = summary.get(self.KEYS[index.column() - 1])
+        if value is None:
+            return ""
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class DiagnosticsDialog(QDialog):
+    """Recent timings and call counts of the instrumented code paths (Ctrl+Shift+D)"""
+    def __init__(self, workbook_cache=None, parent=None):
+        super().__init__(parent)
+        self.model = MetricsTableModel()
+        self.workbook_cache = workbook_cache
+        self.setWindowTitle("Diagnostics")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+        self.enabled_check = QCheckBox("Record timings")
+        self.enabled_check.setChecked(instrumentation.enabled)
+        self.enabled_check.toggled.connect(instrumentation.set_enabled)
+        layout.addWidget(self.enabled_check)
+
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        table = QTableView()
+        table.setModel(self.model)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        layout.addWidget(table)
+
+        layout.addWidget(QLabel("Recent timings (newest first):"))
+        self.recent_text = QTextEdit()
+        self.recent_text.setReadOnly(True)
+        self.recent_text.setMaximumHeight(180)
+        layout.addWidget(self.recent_text)
+
+        button_layout = QHBoxLayout()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        export_btn = QPushButton("Export...")
+        export_btn.setToolTip("Write the timings as JSON lines (.jsonl) or a Prometheus text file (.prom)")
+        export_btn.clicked.connect(self.export)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addStretch()
+        button_layout.addWidget(reset_btn)
+        button_layout.addWidget(export_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(DIAGNOSTICS_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def refresh(self):
+        data = instrumentation.snapshot()
+        self.model.load(data)
+        lines = [
+            f"{event['name']}: {event['ms']:.2f} ms ({event['thread']})"
+            for event in reversed(data["recent"])
+        ]
+        text = "\n".join(lines) if lines else "No timings recorded. Tick \"Record timings\" to start."
+        if text != self.recent_text.toPlainText():
+            self.recent_text.setPlainText(text)
+        if self.workbook_cache is not None:
+            stats = self.workbook_cache.stats()
+            self.cache_label.setText(
+                f"Open workbooks: {stats['open']}/{stats['capacity']}, {stats['hits']} hits, "
+                f"{stats['misses']} misses, {stats['evictions']} closed to make room"
+            )
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Timings", "timings.jsonl",
+            "JSON Lines (*.jsonl);;Prometheus Text (*.prom)"
+        )
+        if not path:
+            return
+        try:
+            if path.lower().endswith(".prom"):
+                instrumentation.write_prometheus(path)
+            else:
+                instrumentation.write_jsonl(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error exporting timings:\n{str(e)}")
+
+
+class ConfigWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.workbook = None  # Owned by workbook_cache; never closed here
+        self.workbook_path = None
+        self.workbook_cache = WorkbookCache(open_workbook, WORKBOOK_CACHE_SIZE)
+        self.sheet_names = []
+        self.max_columns = 26  # Default A-Z
+        self.column_model = ColumnListModel(self.max_columns)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.load_generation = 0
+        self.active_loader = None
+        self.index_builder = None
+        self.snapshot_builder = None
+        self.snapshot_pending = False
+        self.sheet_inspector = None
+        self.inspect_pending = False
+        self.collision_previewer = None
+        self.collision_pending = False
+        self.sheet_stats = {}  # Sheet name -> stats from sheet_inspect, for the loaded workbook
+        self.quality_scanner = None
+        self.reconciler = None
+        self.validator = config_core.ConfigValidator()
+        self.validation_status = None  # Last status text written by validation
+        self.preferred_sheets = dict(config_core.DEFAULT_SHEETS)  # Sheets to check once radios exist
+        self.profiles_path = profiles.default_profiles_path(config_core.default_config_path())
+        self.active_profile = None
+        self.progress_path = progress_counter.default_progress_path(config_core.default_config_path())
+        self.progress_mtime = None  # mtime of the progress file last shown
+        self.progress_refresher = None
+        self.config_hash = None  # Content hash of config.json as last loaded or saved here
+        self.form_baseline = None  # Content hash of the form right after that load or save
+        self.config_version = None  # (path, size, mtime) of config.json when last read for reload
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle("Barcode Scanner Configuration")
+        self.setGeometry(100, 100, 900, 800)
+        
+        # Main widget and layout
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        main_layout = QVBoxLayout(main_widget)
+        
+        # Profile section
+        profile_group = QGroupBox("Profiles")
+        profile_layout = QHBoxLayout()
+        self.profile_combo = QComboBox()
+        self.profile_combo.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+        self.profile_combo.setMinimumContentsLength(20)
+        profile_switch_btn = QPushButton("Switch")
+        profile_switch_btn.setToolTip("Load the selected profile into the form")
+        profile_switch_btn.clicked.connect(self.switch_profile)
+        profile_save_btn = QPushButton("Save As...")
+        profile_save_btn.setToolTip("Store the current form as a named profile")
+        profile_save_btn.clicked.connect(self.save_profile_as)
+        profile_clone_btn = QPushButton("Clone...")
+        profile_clone_btn.clicked.connect(self.clone_profile)
+        profile_diff_btn = QPushButton("Diff...")
+        profile_diff_btn.clicked.connect(self.diff_profile)
+        profile_delete_btn = QPushButton("Delete")
+        profile_delete_btn.clicked.connect(self.delete_profile)
+        self.active_profile_label = QLabel()
+        profile_layout.addWidget(QLabel("Profile:"))
+        profile_layout.addWidget(self.profile_combo)
+        profile_layout.addWidget(profile_switch_btn)
+        profile_layout.addWidget(profile_save_btn)
+        profile_layout.addWidget(profile_clone_btn)
+        profile_layout.addWidget(profile_diff_btn)
+        profile_layout.addWidget(profile_delete_btn)
+        profile_layout.addWidget(self.active_profile_label)
+        profile_layout.addStretch()
+        profile_group.setLayout(profile_layout)
+        main_layout.addWidget(profile_group)
+        
+        # File selection section
+        file_group = QGroupBox("Excel File Selection")
+        file_layout = QHBoxLayout()
+        self.file_path_edit = QLineEdit()
+        self.file_path_edit.setText(r'EXCEL SHEET')
+        file_browse_btn = QPushButton("Browse...")
+        file_browse_btn.clicked.connect(self.browse_file)
+        file_layout.addWidget(QLabel("File Path:"))
+        file_layout.addWidget(self.file_path_edit)
+        file_layout.addWidget(file_browse_btn)
+        file_group.setLayout(file_layout)
+        main_layout.addWidget(file_group)
+        
+        # Workbook loading progress (hidden while idle)
+        self.load_progress_widget = QWidget()
+        load_progress_layout = QHBoxLayout(self.load_progress_widget)
+        load_progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.load_progress_label = QLabel()
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setRange(0, 0)  # Busy indicator, openpyxl reports no progress
+        load_cancel_btn = QPushButton("Cancel")
+        load_cancel_btn.clicked.connect(self.cancel_excel_load)
+        load_progress_layout.addWidget(self.load_progress_label)
+        load_progress_layout.addWidget(self.load_progress_bar)
+        load_progress_layout.addWidget(load_cancel_btn)
+        self.load_progress_widget.hide()
+        main_layout.addWidget(self.load_progress_widget)
+        
+        # Sheet selection section
+        sheet_group = QGroupBox("Sheet Names")
+        sheet_layout = QVBoxLayout()
+        
+        self.inventory_sheet_group = QButtonGroup()
+        self.other_sheet_group = QButtonGroup()
+        
+        inv_label = QLabel("Inventory Sheet:")
+        inv_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        sheet_layout.addWidget(inv_label)
+        
+        self.inventory_radio_layout = QVBoxLayout()
+        sheet_layout.addLayout(self.inventory_radio_layout)
+        
+        other_label = QLabel("Other Sheet:")
+        other_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        sheet_layout.addWidget(other_label)
+        
+        self.other_radio_layout = QVBoxLayout()
+        sheet_layout.addLayout(self.other_radio_layout)
+        
+        custom_sheet_layout = QHBoxLayout()
+        custom_sheet_layout.addWidget(QLabel("Add Custom Sheet Name:"))
+        self.custom_inventory_sheet = QLineEdit()
+        self.custom_inventory_sheet.setPlaceholderText("Custom inventory sheet name")
+        custom_sheet_layout.addWidget(self.custom_inventory_sheet)
+        self.custom_other_sheet = QLineEdit()
+        self.custom_other_sheet.setPlaceholderText("Custom other sheet name")
+        custom_sheet_layout.addWidget(self.custom_other_sheet)
+        sheet_layout.addLayout(custom_sheet_layout)
+        
+        sheet_group.setLayout(sheet_layout)
+        main_layout.addWidget(sheet_group)
+        
+        # Column selection section
+        column_group = QGroupBox("Column Mappings")
+        column_layout = QVBoxLayout()
+        
+        # Asset ID columns (3 dropdowns with "None" option)
+        asset_id_layout = QHBoxLayout()
+        asset_id_layout.addWidget(QLabel("Asset ID Columns (1-3):"))
+        self.asset_id1_combo = self.create_column_combo()
+        self.asset_id2_combo = self.create_column_combo()
+        self.asset_id3_combo = self.create_column_combo()
+        asset_id_layout.addWidget(self.asset_id1_combo)
+        asset_id_layout.addWidget(self.asset_id2_combo)
+        asset_id_layout.addWidget(self.asset_id3_combo)
+        column_layout.addLayout(asset_id_layout)
+        
+        # Required columns
+        self.asset_name_combo = self.create_column_row(column_layout, "Asset Name Column:")
+        self.asset_desc_combo = self.create_column_row(column_layout, "Asset Description Column:")
+        self.status_combo = self.create_column_row(column_layout, "Status Column:")
+        self.location_combo = self.create_column_row(column_layout, "Building/Location Column:")
+        self.room_combo = self.create_column_row(column_layout, "Room Column:")
+        self.marked_check_combo = self.create_column_row(column_layout, "Marked Check Column:")
+        
+        self.asset_id_combos = [self.asset_id1_combo, self.asset_id2_combo, self.asset_id3_combo]
+        self.column_combos = {
+            "assetName": self.asset_name_combo,
+            "assetDescription": self.asset_desc_combo,
+            "status": self.status_combo,
+            "location": self.location_combo,
+            "room": self.room_combo,
+            "markedCheck": self.marked_check_combo,
+        }
+        
+        detect_layout = QHBoxLayout()
+        detect_btn = QPushButton("Auto-detect Columns")
+        detect_btn.setToolTip("Propose columns from the header rows of the inventory sheet")
+        detect_btn.clicked.connect(self.auto_detect_columns)
+        detect_layout.addWidget(detect_btn)
+        detect_layout.addStretch()
+        column_layout.addLayout(detect_layout)
+        
+        column_group.setLayout(column_layout)
+        main_layout.addWidget(column_group)
+        
+        # Barcode matching rules section
+        matching_group = QGroupBox("Barcode Matching")
+        matching_layout = QVBoxLayout()
+        
+        rule_layout = QHBoxLayout()
+        self.strip_zeros_check = QCheckBox("Ignore leading zeros")
+        self.strip_zeros_check.setToolTip("Match 000123 with 123 (Excel drops leading zeros from numbers)")
+        self.case_fold_check = QCheckBox("Ignore case")
+        self.digits_only_check = QCheckBox("Digits only")
+        self.digits_only_check.setToolTip("Compare only the digits of each ID")
+        rule_layout.addWidget(self.strip_zeros_check)
+        rule_layout.addWidget(self.case_fold_check)
+        rule_layout.addWidget(self.digits_only_check)
+        rule_layout.addStretch()
+        matching_layout.addLayout(rule_layout)
+        
+        affix_layout = QHBoxLayout()
+        affix_layout.addWidget(QLabel("Strip Prefixes:"))
+        self.strip_prefixes_edit = QLineEdit()
+        self.strip_prefixes_edit.setPlaceholderText("Comma-separated, e.g. S, INV-")
+        affix_layout.addWidget(self.strip_prefixes_edit)
+        affix_layout.addWidget(QLabel("Strip Suffixes:"))
+        self.strip_suffixes_edit = QLineEdit()
+        self.strip_suffixes_edit.setPlaceholderText("Comma-separated")
+        affix_layout.addWidget(self.strip_suffixes_edit)
+        matching_layout.addLayout(affix_layout)
+        
+        self.collision_label = QLabel("⚪ Load an Excel file to preview ID collisions")
+        matching_layout.addWidget(self.collision_label)
+        
+        matching_group.setLayout(matching_layout)
+        main_layout.addWidget(matching_group)
+        
+        # Row range section
+        range_group = QGroupBox("Row Range for Counting")
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("Start Row:"))
+        self.start_row_spin = QSpinBox()
+        self.start_row_spin.setMinimum(1)
+        self.start_row_spin.setMaximum(1000000)
+        self.start_row_spin.setValue(6)
+        self.start_row_spin.valueChanged.connect(self.update_total_count)
+        range_layout.addWidget(self.start_row_spin)
+        
+        range_layout.addWidget(QLabel("End Row:"))
+        self.end_row_spin = QSpinBox()
+        self.end_row_spin.setMinimum(1)
+        self.end_row_spin.setMaximum(1000000)
+        self.end_row_spin.setValue(357)
+        self.end_row_spin.valueChanged.connect(self.update_total_count)
+        range_layout.addWidget(self.end_row_spin)
+        
+        self.total_count_label = QLabel("Total Count: 352 items")
+        self.total_count_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        range_layout.addWidget(self.total_count_label)
+        self.marked_count_label = QLabel("Marked: -")
+        self.marked_count_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        self.marked_count_label.setToolTip("Marked rows in the counting range, as recorded by the server")
+        range_layout.addWidget(self.marked_count_label)
+        report_btn = QPushButton("By Building...")
+        report_btn.setToolTip("Marked and unmarked assets per building and room")
+        report_btn.clicked.connect(self.show_progress_report)
+        range_layout.addWidget(report_btn)
+        range_layout.addStretch()
+        
+        range_group.setLayout(range_layout)
+        main_layout.addWidget(range_group)
+        
+        # ngrok URL section
+        ngrok_group = QGroupBox("Server Configuration")
+        ngrok_layout = QHBoxLayout()
+        ngrok_layout.addWidget(QLabel("ngrok Server URL:"))
+        self.ngrok_url_edit = QLineEdit()
+        self.ngrok_url_edit.setPlaceholderText("https://example.ngrok-free.dev/api")
+        self.ngrok_url_edit.setText("<PASTE_NGROK_ADDRESS_HERE>/api")
+        ngrok_layout.addWidget(self.ngrok_url_edit)
+        ngrok_group.setLayout(ngrok_layout)
+        main_layout.addWidget(ngrok_group)
+        
+        # Validation status section
+        validation_layout = QHBoxLayout()
+        self.validation_label = QLabel("⚪ Configuration not validated")
+        validation_layout.addWidget(self.validation_label)
+        validation_layout.addStretch()
+        main_layout.addLayout(validation_layout)
+        
+        # Summary section
+        summary_group = QGroupBox("Configuration Summary")
+        summary_layout = QVBoxLayout()
+        self.summary_text = QTextEdit()
+        self.summary_text.setReadOnly(True)
+        self.summary_text.setMaximumHeight(150)
+        summary_layout.addWidget(self.summary_text)
+        summary_group.setLayout(summary_layout)
+        main_layout.addWidget(summary_group)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        test_btn = QPushButton("Test Configuration")
+        test_btn.clicked.connect(self.test_configuration)
+        self.scan_btn = QPushButton("Scan Workbook")
+        self.scan_btn.setToolTip("Check the inventory sheet for duplicate, blank and untrimmed asset IDs")
+        self.scan_btn.clicked.connect(self.scan_workbook)
+        journal_btn = QPushButton("Journal...")
+        journal_btn.setToolTip("Scans recorded by the server and whether they reached the workbook")
+        journal_btn.clicked.connect(self.show_journal)
+        self.reconcile_btn = QPushButton("Reconcile Other...")
+        self.reconcile_btn.setToolTip("Match the Other sheet against the inventory and export the result")
+        self.reconcile_btn.clicked.connect(self.reconcile_other)
+        backups_btn = QPushButton("Backups...")
+        backups_btn.setToolTip("Compare and restore earlier versions of config.json")
+        backups_btn.clicked.connect(self.show_backups)
+        save_btn = QPushButton("Save Configuration")
+        save_btn.clicked.connect(self.save_configuration)
+        button_layout.addWidget(test_btn)
+        button_layout.addWidget(self.scan_btn)
+        button_layout.addWidget(journal_btn)
+        button_layout.addWidget(self.reconcile_btn)
+        button_layout.addWidget(backups_btn)
+        button_layout.addWidget(save_btn)
+        button_layout.addStretch()
+        main_layout.addLayout(button_layout)
+        
+        # Asset ID dropdowns offer "None" (row 0 of the shared model), required ones don't
+        for combo in self.asset_id_combos:
+            combo.setModel(self.column_model)
+        for combo in self.column_combos.values():
+            combo.setModel(self.column_model)
+            combo.view().setRowHidden(0, True)
+            
+        # Load Excel file if it exists
+        if os.path.exists(self.file_path_edit.text()):
+            self.load_excel_file(self.file_path_edit.text())
+        
+        # Debounce typing in the file path so only the last path gets loaded
+        self.file_path_timer = QTimer(self)
+        self.file_path_timer.setSingleShot(True)
+        self.file_path_timer.setInterval(FILE_PATH_DEBOUNCE_MS)
+        self.file_path_timer.timeout.connect(self.on_file_path_changed)
+        
+        # Debounce matching rule edits so the collision preview runs once per pause
+        self.match_preview_timer = QTimer(self)
+        self.match_preview_timer.setSingleShot(True)
+        self.match_preview_timer.setInterval(MATCH_PREVIEW_DEBOUNCE_MS)
+        self.match_preview_timer.timeout.connect(self.preview_collisions)
+        
+        # Coalesce validation requests: everything changed within one event-loop tick
+        # is validated once
+        self.validation_timer = QTimer(self)
+        self.validation_timer.setSingleShot(True)
+        self.validation_timer.setInterval(0)
+        self.validation_timer.timeout.connect(self.validate_and_update_summary)
+        
+        # Connect signals for real-time validation
+        self.file_path_edit.textChanged.connect(self.file_path_timer.start)
+        self.ngrok_url_edit.textChanged.connect(self.request_validation)
+        # currentIndexChanged, not currentTextChanged: header text updates are not selection changes
+        self.asset_id1_combo.currentIndexChanged.connect(self.request_validation)
+        self.asset_id2_combo.currentIndexChanged.connect(self.request_validation)
+        self.asset_id3_combo.currentIndexChanged.connect(self.request_validation)
+        self.asset_name_combo.currentIndexChanged.connect(self.request_validation)
+        self.asset_desc_combo.currentIndexChanged.connect(self.request_validation)
+        self.status_combo.currentIndexChanged.connect(self.request_validation)
+        self.location_combo.currentIndexChanged.connect(self.request_validation)
+        self.room_combo.currentIndexChanged.connect(self.request_validation)
+        self.marked_check_combo.currentIndexChanged.connect(self.request_validation)
+        self.inventory_sheet_group.buttonToggled.connect(self.on_inventory_sheet_toggled)
+        # Through a lambda: QTimer.start(int) would take the signal's argument as the new interval
+        restart_match_preview = lambda *_: self.match_preview_timer.start()
+        for combo in self.asset_id_combos:
+            combo.currentIndexChanged.connect(restart_match_preview)
+        for check in (self.strip_zeros_check, self.case_fold_check, self.digits_only_check):
+            check.toggled.connect(restart_match_preview)
+        self.strip_prefixes_edit.textChanged.connect(restart_match_preview)
+        self.strip_suffixes_edit.textChanged.connect(restart_match_preview)
+        
+        # Set default selections
+        self.set_default_selections()
+        self.validate_and_update_summary()
+        
+        # Load existing config if it exists
+        self.load_existing_config()
+        self.watch_config_file()
+        self.refresh_profile_list()
+        
+        # Live marked count: the server rewrites config.progress.json after each scan
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(PROGRESS_POLL_MS)
+        self.progress_timer.timeout.connect(self.update_marked_count)
+        self.progress_timer.start()
+        config_path = config_core.default_config_path()
+        if os.path.exists(config_path):
+            try:
+                self.refresh_progress(config_core.load_config(config_path), [self.progress_path])
+            except Exception as e:
+                self.marked_count_label.setToolTip(f"Error reading config.json: {e}")
+        self.update_marked_count()
+        
+        # Hidden diagnostics view; --trace-prom also exports on a timer
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self).activated.connect(self.show_diagnostics)
+        if instrumentation.prometheus_path():
+            self.trace_export_timer = QTimer(self)
+            self.trace_export_timer.setInterval(TRACE_EXPORT_MS)
+            self.trace_export_timer.timeout.connect(instrumentation.write_prometheus)
+            self.trace_export_timer.start()
+        
+    def create_column_row(self, parent_layout, label_text):
+        layout = QHBoxLayout()
+        layout.addWidget(QLabel(label_text))
+        combo = self.create_column_combo()
+        layout.addWidget(combo)
+        layout.addStretch()
+        parent_layout.addLayout(layout)
+        return combo
+        
+    def create_column_combo(self):
+        """Column dropdown sized without measuring every item of the shared model"""
+        combo = QComboBox()
+        combo.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+        combo.setMinimumContentsLength(18)
+        combo.view().setUniformItemSizes(True)
+        return combo
+        
+    @instrumentation.traced()
+    def update_column_list(self):
+        """Size the shared column list to the inventory sheet and label it with its headers"""
+        if self.workbook is None or not self.sheet_names:
+            return
+        sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        if sheet not in self.sheet_names:
+            sheet = self.sheet_names[0]
+        ws = self.workbook[sheet]
+        
+        rows = list(ws.iter_rows(max_row=column_detect.SAMPLE_ROWS, values_only=True))
+        header_index = column_detect.find_header_row(rows)
+        headers = rows[header_index] if header_index is not None else ()
+        stats = self.sheet_stats.get(sheet)
+        if stats is not None:
+            # The real used width; max_column also counts formatted blank cells
+            self.max_columns = stats["columns"]
+        else:
+            self.max_columns = ws.max_column or max((len(row) for row in rows), default=0)
+        
+        # Never drop a column that is currently selected
+        selected = [combo.currentIndex() for combo in self.asset_id_combos + list(self.column_combos.values())]
+        self.column_model.set_columns(
+            max(self.max_columns, max(selected)),
+            [str(h).strip() if h is not None else "" for h in headers]
+        )
+        
+    def combo_letter(self, combo):
+        """Column letter selected in a column dropdown ("None" for no column)"""
+        return combo.currentData(Qt.ItemDataRole.EditRole) or "None"
+        
+    def set_combo_letter(self, combo, letter):
+        """Select a column letter in a column dropdown, growing the list if needed"""
+        idx = letter_to_index(letter)
+        if idx is None:
+            combo.setCurrentIndex(0)
+            return
+        if idx >= self.column_model.count:
+            self.column_model.set_columns(idx + 1, self.column_model.headers)
+        combo.setCurrentIndex(idx + 1)
+        
+    def load_existing_config(self):
+        """Load existing config.json if it exists"""
+        config_path = config_core.default_config_path()
+        if not os.path.exists(config_path):
+            return
+            
+        try:
+            config = config_core.load_config(config_path)
+            self.apply_config(config)
+            self.mark_config_applied(config)
+            self.validation_label.setText("✅ Loaded existing configuration")
+            
+        except Exception as e:
+            self.validation_label.setText(f"⚠️ Error loading config: {str(e)}")
+            
+    def watch_config_file(self):
+        """Apply edits to config.json made outside this window (another window, headless mode, by hand)"""
+        config_path = config_core.default_config_path()
+        self.config_reload_timer = QTimer(self)
+        self.config_reload_timer.setSingleShot(True)
+        self.config_reload_timer.setInterval(CONFIG_RELOAD_DEBOUNCE_MS)
+        self.config_reload_timer.timeout.connect(self.reload_config_from_disk)
+        # The directory too: an atomic replace drops the file from a file watch
+        self.config_watcher = QFileSystemWatcher([os.path.dirname(config_path)], self)
+        if os.path.exists(config_path):
+            self.config_watcher.addPath(config_path)
+        self.config_watcher.fileChanged.connect(self.config_reload_timer.start)
+        self.config_watcher.directoryChanged.connect(self.config_reload_timer.start)
+        
+    def mark_config_applied(self, config):
+        """Remember config as the one on disk and the form as matching it"""
+        self.config_hash = config_core.config_hash(config)
+        form = self.current_form_config()
+        self.form_baseline = config_core.config_hash(form) if form is not None else None
+        
+    def form_has_unsaved_edits(self):
+        form = self.current_form_config()
+        return (config_core.config_hash(form) if form is not None else None) != self.form_baseline
+        
+    def reload_config_from_disk(self):
+        """Apply config.json if its settings changed since this window last loaded or saved it"""
+        config_path = config_core.default_config_path()
+        if not os.path.exists(config_path):
+            return
+        if config_path not in self.config_watcher.files():
+            self.config_watcher.addPath(config_path)
+        try:
+            version = file_version(config_path)
+            if version == self.config_version:
+                return  # Another file in the directory changed (progress, index, backups)
+            config = config_core.load_config(config_path)
+        except (OSError, ValueError):
+            return  # Mid-write by an editor that does not replace atomically; the next event retries
+        self.config_version = version
+        if config.get("meta", {}).get("format", 0) > config_core.CONFIG_FORMAT:
+            self.validation_label.setText("⚠️ config.json was saved by a newer version and was not applied")
+            return
+        digest = config_core.config_hash(config)
+        if digest == self.config_hash:
+            return  # Our own save, or a rewrite that changed nothing
+        revision = config_core.config_revision(config)
+        if self.form_has_unsaved_edits():
+            # Don't throw away what the user is editing; saving will overwrite the file
+            self.config_hash = digest
+            self.validation_label.setText(
+                f"⚠️ config.json changed on disk (revision {revision}); your unsaved edits were kept")
+            return
+        self.apply_config(config)
+        self.mark_config_applied(config)
+        self.validation_label.setText(f"🔄 Applied config.json revision {revision} from disk")
+            
+    def apply_config(self, config):
+        """Fill the form from a config.json dict"""
+        settings = config_core.config_to_letters(config)
+            
+        # Load Excel file path (an unchanged path must not reload the workbook)
+        if "filePath" in settings and settings["filePath"] != self.file_path_edit.text():
+            self.file_path_edit.setText(settings["filePath"])
+            
+        # Load sheet names
+        if "sheets" in settings:
+            self.preferred_sheets.update(settings["sheets"])
+            self.select_preferred_sheets()
+            
+        # Load column mappings
+        for combo, col in zip(self.asset_id_combos, settings.get("assetIdSearch", [])):
+            if col is not None:
+                self.set_combo_letter(combo, col)
+        for key, col in settings.get("columns", {}).items():
+            self.set_combo_letter(self.column_combos[key], col)
+                
+        # Load row range
+        if "startRow" in settings:
+            self.start_row_spin.setValue(settings["startRow"])
+        if "endRow" in settings:
+            self.end_row_spin.setValue(settings["endRow"])
+                
+        # Load ngrok URL
+        if "ngrokUrl" in settings:
+            self.ngrok_url_edit.setText(settings["ngrokUrl"])
+            
+        # Load matching rules (none means exact matching)
+        self.set_matching_rules(settings.get("matching"))
+            
+    def load_profile_store(self):
+        """Read profiles.json, reporting errors in the status label"""
+        try:
+            return profiles.load_profiles(self.profiles_path)
+        except Exception as e:
+            self.validation_label.setText(f"⚠️ Error loading profiles: {str(e)}")
+            return None
+            
+    def save_profile_store(self, store):
+        try:
+            profiles.save_profiles(store, self.profiles_path)
+            return True
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving profiles:\n{str(e)}")
+            return False
+            
+    def refresh_profile_list(self, select=None):
+        """Fill the profile dropdown from profiles.json"""
+        store = self.load_profile_store()
+        if store is None:
+            return
+        self.active_profile = store["active"] if store["active"] in store["profiles"] else None
+        self.profile_combo.clear()
+        self.profile_combo.addItems(profiles.profile_names(store))
+        select = select or self.active_profile
+        if select is not None:
+            self.profile_combo.setCurrentText(select)
+        self.active_profile_label.setText(f"Active: {self.active_profile or 'none'}")
+        
+    def selected_profile(self):
+        """Profile selected in the dropdown, or None (with a message) if there is none"""
+        name = self.profile_combo.currentText()
+        if not name:
+            QMessageBox.information(self, "Profiles", "No profile selected. Use 'Save As...' to create one.")
+            return None
+        return name
+        
+    def switch_profile(self):
+        """Load the selected profile into the form and make it the active profile"""
+        name = self.selected_profile()
+        store = self.load_profile_store() if name else None
+        if store is None:
+            return
+        try:
+            self.apply_config(profiles.get_profile(store, name))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading profile:\n{str(e)}")
+            return
+        store["active"] = name
+        if self.save_profile_store(store):
+            self.refresh_profile_list(name)
+            self.validation_label.setText(f"✅ Switched to profile '{name}'. Save to apply it to config.json")
+            
+    def save_profile_as(self):
+        """Store the current form as a named profile and make it active"""
+        config = self.form_config()
+        if config is None:
+            return
+        name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:", text=self.active_profile or "")
+        store = self.load_profile_store() if ok and name.strip() else None
+        if store is None:
+            return
+        if name.strip() in store["profiles"] and name.strip() != self.active_profile:
+            reply = QMessageBox.question(self, "Save Profile", f"Replace profile '{name.strip()}'?")
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        try:
+            name = profiles.put_profile(store, name, config)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        store["active"] = name
+        if self.save_profile_store(store):
+            self.refresh_profile_list(name)
+            self.validation_label.setText(f"✅ Saved profile '{name}'")
+            
+    def clone_profile(self):
+        """Copy the selected profile under a new name"""
+        source = self.selected_profile()
+        if source is None:
+            return
+        name, ok = QInputDialog.getText(self, "Clone Profile", f"New name for a copy of '{source}':",
+                                        text=f"{source} copy")
+        store = self.load_profile_store() if ok and name.strip() else None
+        if store is None:
+            return
+        try:
+            name = profiles.clone_profile(store, source, name)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if self.save_profile_store(store):
+            self.refresh_profile_list(name)
+            self.validation_label.setText(f"✅ Cloned '{source}' as '{name}'")
+            
+    def delete_profile(self):
+        name = self.selected_profile()
+        if name is None:
+            return
+        reply = QMessageBox.question(self, "Delete Profile", f"Delete profile '{name}'?")
+        store = self.load_profile_store() if reply == QMessageBox.StandardButton.Yes else None
+        if store is None:
+            return
+        try:
+            profiles.delete_profile(store, name)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        if self.save_profile_store(store):
+            self.refresh_profile_list()
+            self.validation_label.setText(f"✅ Deleted profile '{name}'")
+            
+    def diff_profile(self):
+        """Compare the selected profile with another profile or the current form"""
+        name = self.selected_profile()
+        store = self.load_profile_store() if name else None
+        if store is None:
+            return
+        current_form = "(current form)"
+        others = [current_form] + [other for other in profiles.profile_names(store) if other != name]
+        other, ok = QInputDialog.getItem(self, "Diff Profiles", f"Compare '{name}' with:", others, 0, False)
+        if not ok:
+            return
+        if other == current_form:
+            other_config = self.form_config()
+            if other_config is None:
+                return
+        else:
+            other_config = profiles.get_profile(store, other)
+        differences = profiles.diff_configs(profiles.get_profile(store, name), other_config)
+        
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Diff Profiles")
+        if not differences:
+            msg.setText(f"'{name}' and {other} are identical.")
+        else:
+            msg.setText(f"{len(differences)} setting(s) differ between '{name}' and {other}.")
+            msg.setDetailedText("\n".join(
+                f"{key}: {value_a!r} -> {value_b!r}" for key, value_a, value_b in differences
+            ))
+        msg.exec()
+        
+    def browse_file(self):
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select Excel File",
+            "",
+            "Excel Files (*.xlsx *.xls)"
+        )
+        if file_name:
+            self.file_path_edit.setText(file_name)
+            
+    def on_file_path_changed(self):
+        file_path = self.file_path_edit.text()
+        self.validator.invalidate_file()
+        if self.validator.file_exists(file_path):
+            self.load_excel_file(file_path)
+        self.request_validation()
+            
+    def load_excel_file(self, file_path):
+        """Start loading an Excel file in the background, superseding any running load"""
+        if self.active_loader is not None:
+            self.active_loader.cancel()
+            
+        self.load_generation += 1
+        loader = WorkbookLoader(self.load_generation, file_path, self.workbook_cache)
+        loader.signals.progress.connect(self.on_excel_load_progress)
+        loader.signals.loaded.connect(self.on_excel_loaded)
+        loader.signals.failed.connect(self.on_excel_load_failed)
+        self.active_loader = loader
+        
+        self.load_progress_label.setText(f"Loading {os.path.basename(file_path)}...")
+        self.load_progress_widget.show()
+        self.thread_pool.start(loader)
+        
+    def cancel_excel_load(self):
+        """Cancel the running workbook load, if any"""
+        if self.active_loader is None:
+            return
+        self.active_loader.cancel()
+        self.active_loader = None
+        self.load_generation += 1  # Discard anything the cancelled worker still emits
+        self.load_progress_widget.hide()
+        self.validation_label.setText("⚪ Excel file loading cancelled")
+        
+    def on_excel_load_progress(self, generation, message):
+        if generation == self.load_generation:
+            self.load_progress_label.setText(message)
+            
+    @instrumentation.traced()
+    def on_excel_loaded(self, generation, workbook, sheet_names):
+        """Apply a workbook opened by WorkbookLoader and detect sheets"""
+        if generation != self.load_generation:
+            # A newer path or a cancel superseded this load; the workbook stays cached
+            return
+        self.workbook_path = self.active_loader.file_path
+        self.active_loader = None
+        self.load_progress_widget.hide()
+        
+        self.workbook = workbook
+        self.sheet_names = sheet_names
+        self.sheet_stats = {}
+        
+        # Populate sheet radio buttons
+        self.populate_sheet_radios()
+        
+        # Size the column list to the inventory sheet
+        self.update_column_list()
+            
+        self.validation_label.setText("✅ Excel file loaded successfully")
+        self.build_snapshot()
+        self.inspect_sheets()
+        self.match_preview_timer.start()
+        
+    def build_snapshot(self):
+        """Start snapshotting the mapped columns of the inventory sheet in the background
+
+        While a build runs, another request is remembered and started when
+        the running one reports.
+        """
+        if self.snapshot_builder is not None:
+            self.snapshot_pending = True
+            return
+        self.snapshot_pending = False
+        sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        if self.workbook_path is None or sheet not in self.sheet_names:
+            return
+        selected = self.selected_column_indices()
+        columns = [c for c in selected.pop("assetIdSearch") if c is not None]
+        columns += [c for c in selected.values() if c is not None]
+        builder = SnapshotBuilder(self.workbook_path, sheet, sorted(set(columns)))
+        builder.signals.finished.connect(self.on_snapshot_built)
+        builder.signals.failed.connect(self.on_snapshot_failed)
+        self.snapshot_builder = builder  # Keep the signals object alive until the worker reports
+        self.thread_pool.start(builder)
+        
+    def on_snapshot_built(self, rows, rebuilt):
+        self.snapshot_builder = None
+        if self.snapshot_pending:
+            self.build_snapshot()
+        
+    def on_snapshot_failed(self, error):
+        self.snapshot_builder = None
+        # Everything still works from the workbook itself, just slower
+        self.validation_label.setText(f"⚠️ Column snapshot not built: {error}")
+        if self.snapshot_pending:
+            self.build_snapshot()
+        
+    def inspect_sheets(self):
+        """Start collecting per-sheet stats of the loaded workbook in the background"""
+        if self.sheet_inspector is not None:
+            self.inspect_pending = True
+            return
+        self.inspect_pending = False
+        if self.workbook_path is None:
+            return
+        inspector = SheetInspector(self.workbook_path)
+        inspector.signals.finished.connect(self.on_sheets_inspected)
+        inspector.signals.failed.connect(self.on_sheet_inspect_failed)
+        self.sheet_inspector = inspector  # Keep the signals object alive until the worker reports
+        self.thread_pool.start(inspector)
+        
+    def on_sheets_inspected(self, file_path, results, cached):
+        self.sheet_inspector = None
+        if self.inspect_pending:
+            self.inspect_sheets()
+            return
+        if file_path != self.workbook_path:
+            return
+        self.sheet_stats = {stats["sheet"]: stats for stats in results}
+        self.populate_sheet_radios(keep_selection=True)
+        self.update_column_list()
+        
+    def on_sheet_inspect_failed(self, error):
+        self.sheet_inspector = None
+        # The pickers keep workbook order without stats
+        if self.inspect_pending:
+            self.inspect_sheets()
+        
+    def on_excel_load_failed(self, generation, error):
+        if generation != self.load_generation:
+            return
+        self.active_loader = None
+        self.load_progress_widget.hide()
+        self.validation_label.setText(f"❌ Error loading Excel file: {error}")
+            
+    @instrumentation.traced()
+    def populate_sheet_radios(self, keep_selection=False):
+        """Populate radio buttons for sheet selection, best inventory match first once stats are in"""
+        checked = dict(self.preferred_sheets)
+        if keep_selection:
+            for group, key in [(self.inventory_sheet_group, "inventory"), (self.other_sheet_group, "other")]:
+                button = group.checkedButton()
+                checked[key] = button.property("sheetName") if button is not None else None
+        
+        # Clear existing radios
+        for layout, group in [(self.inventory_radio_layout, self.inventory_sheet_group),
+                              (self.other_radio_layout, self.other_sheet_group)]:
+            for i in reversed(range(layout.count())):
+                radio = layout.itemAt(i).widget()
+                group.removeButton(radio)
+                radio.deleteLater()
+            
+        if self.sheet_stats:
+            ordered = [stats["sheet"] for stats in sheet_inspect.by_score(self.sheet_stats.values())]
+            ordered += [name for name in self.sheet_names if name not in self.sheet_stats]
+        else:
+            ordered = self.sheet_names
+            
+        # Create radio buttons for inventory sheet
+        for sheet_name in ordered:
+            radio = self.sheet_radio(sheet_name)
+            self.inventory_sheet_group.addButton(radio)
+            self.inventory_radio_layout.addWidget(radio)
+            if sheet_name == checked["inventory"]:
+                radio.setChecked(True)
+                self.custom_inventory_sheet.clear()
+                
+        # Create radio buttons for other sheet (workbook order; it is not an inventory)
+        for sheet_name in self.sheet_names:
+            radio = QRadioButton(sheet_name)
+            radio.setProperty("sheetName", sheet_name)
+            self.other_sheet_group.addButton(radio)
+            self.other_radio_layout.addWidget(radio)
+            if sheet_name == checked["other"]:
+                radio.setChecked(True)
+                self.custom_other_sheet.clear()
+                
+    def sheet_radio(self, sheet_name):
+        """Inventory sheet radio labelled with the sheet's stats, if known"""
+        stats = self.sheet_stats.get(sheet_name)
+        if stats is None:
+            radio = QRadioButton(sheet_name)
+        else:
+            radio = QRadioButton(f"{sheet_name} — {sheet_inspect.describe(stats)}")
+            detected = ", ".join(sorted(stats["detected"])) or "none"
+            radio.setToolTip(
+                f"Used range: {stats['usedRange'] or 'empty'}\n"
+                f"Rows with values: {stats['filledRows']}\n"
+                f"Header row: {stats['headerRow'] or 'not found'}\n"
+                f"Detected fields: {detected}"
+            )
+        radio.setProperty("sheetName", sheet_name)
+        return radio
+        
+
+    def select_preferred_sheets(self):
+        """Check the radios named in preferred_sheets, or put the names in the custom fields"""
+        for group, custom_edit, key in [(self.inventory_sheet_group, self.custom_inventory_sheet, "inventory"),
+                                        (self.other_sheet_group, self.custom_other_sheet, "other")]:
+            name = self.preferred_sheets[key]
+            match = next((button for button in group.buttons() if button.property("sheetName") == name), None)
+            if match is not None:
+                match.setChecked(True)
+                custom_edit.clear()
+            else:
+                # Exclusive groups cannot be cleared directly
+                group.setExclusive(False)
+                for button in group.buttons():
+                    button.setChecked(False)
+                group.setExclusive(True)
+                custom_edit.setText(name)
+                
+    def on_inventory_sheet_toggled(self, button, checked):
+        if checked:
+            self.update_column_list()
+            self.match_preview_timer.start()
+            
+    def set_default_selections(self):
+        """Set default column selections based on current hardcoded values"""
+        # Asset ID: C, D, E; Name F; Description G; Status P; Location Q; Room R; Marked S
+        for combo, col in zip(self.asset_id_combos, config_core.DEFAULT_ASSET_ID_COLUMNS):
+            self.set_combo_letter(combo, col)
+        for key, combo in self.column_combos.items():
+            self.set_combo_letter(combo, config_core.DEFAULT_COLUMNS[key])
+        
+    def selected_sheet(self, button_group, custom_edit):
+        """Checked sheet radio, else the custom sheet name, else None"""
+        for button in button_group.buttons():
+            if button.isChecked():
+                return button.property("sheetName")
+        return custom_edit.text() or None
+        
+    def selected_column_indices(self):
+        """Selected columns as zero-based indices, shaped like the config.json columns section"""
+        columns = {"assetIdSearch": [letter_to_index(col) for col in self.selected_asset_id_letters()]}
+        for key, col in self.selected_column_letters().items():
+            columns[key] = letter_to_index(col)
+        return columns
+        
+    def selected_asset_id_letters(self):
+        """Letters chosen in the three Asset ID dropdowns ("None" when unused)"""
+        return [self.combo_letter(combo) for combo in self.asset_id_combos]
+        
+    def selected_column_letters(self):
+        """Letters chosen in the single-column dropdowns, keyed like config.json"""
+        return {key: self.combo_letter(combo) for key, combo in self.column_combos.items()}
+        
+    def matching_rules(self):
+        """Matching rules from the Barcode Matching section, shaped like config.json"""
+        return barcode_match.normalize_rules({
+            "caseFold": self.case_fold_check.isChecked(),
+            "stripPrefixes": self.strip_prefixes_edit.text().split(","),
+            "stripSuffixes": self.strip_suffixes_edit.text().split(","),
+            "digitsOnly": self.digits_only_check.isChecked(),
+            "stripLeadingZeros": self.strip_zeros_check.isChecked(),
+        })
+        
+    def set_matching_rules(self, rules):
+        rules = barcode_match.normalize_rules(rules)
+        self.case_fold_check.setChecked(rules["caseFold"])
+        self.strip_prefixes_edit.setText(", ".join(rules["stripPrefixes"]))
+        self.strip_suffixes_edit.setText(", ".join(rules["stripSuffixes"]))
+        self.digits_only_check.setChecked(rules["digitsOnly"])
+        self.strip_zeros_check.setChecked(rules["stripLeadingZeros"])
+        
+    def preview_collisions(self):
+        """Start counting rows whose IDs collide under the current rules in the background
+
+        While a count runs, another request is remembered and started when
+        the running one reports.
+        """
+        if self.collision_previewer is not None:
+            self.collision_pending = True
+            return
+        self.collision_pending = False
+        sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        if self.workbook_path is None or sheet not in self.sheet_names:
+            return
+        id_columns = [c for c in self.selected_column_indices()["assetIdSearch"] if c is not None]
+        if not id_columns:
+            self.collision_label.setText("⚪ Select an Asset ID column to preview ID collisions")
+            return
+        previewer = CollisionPreviewer(self.workbook_path, sheet, id_columns, self.matching_rules())
+        previewer.signals.finished.connect(self.on_collisions_previewed)
+        previewer.signals.failed.connect(self.on_collision_preview_failed)
+        self.collision_previewer = previewer  # Keep the signals object alive until the worker reports
+        self.collision_label.setText("⏳ Checking ID collisions...")
+        self.thread_pool.start(previewer)
+        
+    def on_collisions_previewed(self, report):
+        self.collision_previewer = None
+        if self.collision_pending:
+            self.preview_collisions()
+            return
+        added = report["collidingRows"] - report["exactCollidingRows"]
+        text = (f"{report['rows']} rows, {report['keys']} match keys: {report['collidingRows']} rows collide "
+                f"({report['exactCollidingRows']} share identical IDs)")
+        self.collision_label.setText(("⚠️ " if added > 0 else "✅ ") + text)
+        self.collision_label.setToolTip("\n".join(
+            f"'{key}': rows {first} and {row}" for key, first, row in report["examples"]
+        ) or "No collisions added by these rules")
+        
+    def on_collision_preview_failed(self, error):
+        self.collision_previewer = None
+        self.collision_label.setText(f"❌ Error checking ID collisions: {error}")
+        if self.collision_pending:
+            self.preview_collisions()
+        
+    def auto_detect_columns(self):
+        """Set column dropdowns from the header rows of the inventory sheet"""
+        if self.workbook is None or self.workbook_path != self.file_path_edit.text():
+            QMessageBox.information(self, "Auto-detect", "Load an Excel file first.")
+            return
+        inventory_sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        if inventory_sheet not in self.sheet_names:
+            QMessageBox.critical(self, "Error", "Select an inventory sheet from the Excel file first!")
+            return
+            
+        try:
+            result, cached = column_detect.detect_workbook_columns(self.workbook, self.workbook_path, inventory_sheet)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error detecting columns:\n{str(e)}")
+            return
+            
+        columns = result["columns"]
+        if "assetIdSearch" in columns:
+            asset_ids = columns["assetIdSearch"]
+            for i, combo in enumerate(self.asset_id_combos):
+                self.set_combo_letter(combo, index_to_letter(asset_ids[i]) if i < len(asset_ids) else "None")
+        for key, combo in self.column_combos.items():
+            if key in columns:
+                self.set_combo_letter(combo, index_to_letter(columns[key]))
+                
+        missing = [name for name, key in config_core.REQUIRED_COLUMNS if key not in columns]
+        if "assetIdSearch" not in columns:
+            missing.insert(0, "Asset ID")
+        header = f"header row {result['headerRow']}" if result["headerRow"] else "values (no header row found)"
+        message = f"🔍 Columns detected from {header}"
+        if cached:
+            message += " (cached)"
+        if missing:
+            message += f"; not detected, left unchanged: {', '.join(missing)}"
+        self.validation_label.setText(message)
+        
+    def update_total_count(self):
+        """Update total count label based on row range"""
+        start = self.start_row_spin.value()
+        end = self.end_row_spin.value()
+        total = max(0, end - start + 1)
+        self.total_count_label.setText(f"Total Count: {total} items")
+        self.request_validation()
+        
+    def request_validation(self, *_):
+        """Schedule validation for the next event-loop tick"""
+        instrumentation.count("validation.requested")
+        self.validation_timer.start()
+        
+    @instrumentation.traced()
+    def validate_and_update_summary(self):
+        """Validate configuration and update summary in real-time
+
+        Only fields whose value changed are re-parsed, and the status label and
+        summary are redrawn only when their text changes. Status messages from
+        other actions stay until the validation result itself changes.
+        """
+        self.validation_timer.stop()
+        errors, warnings, summary = self.validator.validate(
+            self.file_path_edit.text(),
+            self.selected_asset_id_letters(),
+            self.selected_column_letters(),
+            self.start_row_spin.value(),
+            self.end_row_spin.value(),
+            self.ngrok_url_edit.text()
+        )
+                
+        # Update validation label
+        if errors:
+            status = "❌ " + "; ".join(errors)
+        elif warnings:
+            status = "⚠️ " + "; ".join(warnings)
+        else:
+            status = "✅ Configuration valid"
+        if status != self.validation_status:
+            self.validation_status = status
+            self.validation_label.setText(status)
+            
+        # Update summary text
+        summary_text = "\n".join(summary)
+        if summary_text != self.summary_text.toPlainText():
+            self.summary_text.setPlainText(summary_text)
+        
+    def test_configuration(self):
+        """Test configuration by reading sample data from Excel"""
+        file_path = self.file_path_edit.text()
+        
+        if not os.path.exists(file_path):
+            QMessageBox.critical(self, "Error", "Excel file does not exist!")
+            return
+            
+        try:
+            # Get selected inventory sheet
+            inventory_sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+                
+            if not inventory_sheet:
+                QMessageBox.critical(self, "Error", "No inventory sheet selected!")
+                return
+                
+            # Reuse the workbook opened by load_excel_file
+            if self.workbook is None or self.workbook_path != file_path:
+                if self.active_loader is None:
+                    self.load_excel_file(file_path)
+                QMessageBox.information(self, "Loading", "The Excel file is still loading. Please try again in a moment.")
+                return
+            wb = self.workbook
+            
+            if inventory_sheet not in wb.sheetnames:
+                QMessageBox.warning(self, "Warning", f"Sheet '{inventory_sheet}' not found in Excel file. It will be created when needed.")
+                return
+                
+            ws = wb[inventory_sheet]
+            
+            # Get selected columns
+            columns_to_read = []
+            column_labels = []
+            
+            for combo in [self.asset_id1_combo, self.asset_id2_combo, self.asset_id3_combo]:
+                col = self.combo_letter(combo)
+                if col != "None":
+                    idx = letter_to_index(col)
+                    columns_to_read.append(idx + 1)  # openpyxl uses 1-based indexing
+                    column_labels.append(f"Asset ID ({col})")
+                    
+            for combo, label in [(self.asset_name_combo, "Name"), (self.asset_desc_combo, "Desc"),
+                                  (self.status_combo, "Status"), (self.location_combo, "Location"),
+                                  (self.room_combo, "Room"), (self.marked_check_combo, "Marked")]:
+                col = self.combo_letter(combo)
+                idx = letter_to_index(col)
+                columns_to_read.append(idx + 1)
+                column_labels.append(f"{label} ({col})")
+                
+            # Page through the counting range, one page in memory at a time,
+            # from the column snapshot when it is current and has these columns
+            snapshot = column_snapshot.load_snapshot(file_path, inventory_sheet, [col - 1 for col in columns_to_read])
+            try:
+                model = SheetPreviewModel(ws, columns_to_read, column_labels,
+                                          self.start_row_spin.value(), self.end_row_spin.value(),
+                                          snapshot=snapshot)
+                dialog = SheetPreviewDialog(
+                    model,
+                    f"Successfully read data from sheet '{inventory_sheet}'.\n"
+                    f"Rows {model.start_row}-{model.end_row} shown below, {model.page_size} per page.\n"
+                    f"Selected columns validated successfully!",
+                    self)
+                dialog.exec()
+            finally:
+                if snapshot is not None:
+                    snapshot.close()
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error testing configuration:\n{str(e)}")
+            
+    def scan_workbook(self):
+        """Start a full data-quality scan of the inventory sheet"""
+        if self.quality_scanner is not None:
+            self.quality_scanner.cancel()
+            self.quality_scanner = None
+            self.scan_btn.setText("Scan Workbook")
+            self.validation_label.setText("⚪ Workbook scan cancelled")
+            return
+            
+        file_path = self.file_path_edit.text()
+        if not os.path.exists(file_path):
+            QMessageBox.critical(self, "Error", "Excel file does not exist!")
+            return
+        inventory_sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        if not inventory_sheet:
+            QMessageBox.critical(self, "Error", "No inventory sheet selected!")
+            return
+            
+        scanner = DataQualityScanner(file_path, inventory_sheet, self.selected_column_indices(),
+                                     self.start_row_spin.value(), self.end_row_spin.value())
+        scanner.signals.progress.connect(self.on_scan_progress)
+        scanner.signals.finished.connect(self.on_scan_finished)
+        scanner.signals.failed.connect(self.on_scan_failed)
+        self.quality_scanner = scanner
+        self.scan_btn.setText("Cancel Scan")
+        self.validation_label.setText(f"⏳ Scanning '{inventory_sheet}'...")
+        self.thread_pool.start(scanner)
+        
+    def on_scan_progress(self, rows):
+        if self.quality_scanner is not None and self.sender() is self.quality_scanner.signals:
+            self.validation_label.setText(f"⏳ Scanning workbook... {rows} rows")
+            
+    def on_scan_finished(self, report):
+        if self.quality_scanner is None or self.sender() is not self.quality_scanner.signals:
+            return
+        self.quality_scanner = None
+        self.scan_btn.setText("Scan Workbook")
+        
+        summary, details = data_quality.format_report(report)
+        problems = len(report["duplicates"]) + len(report["blankIdRows"]) + len(report["whitespaceIds"])
+        self.validation_label.setText(("⚠️ " if problems else "✅ ") + "Workbook scan: " + summary.replace("\n", "; "))
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("Workbook Scan")
+        box.setIcon(QMessageBox.Icon.Warning if problems else QMessageBox.Icon.Information)
+        box.setText(summary)
+        if details:
+            box.setDetailedText(details)
+        box.exec()
+        
+    def on_scan_failed(self, error):
+        if self.quality_scanner is None or self.sender() is not self.quality_scanner.signals:
+            return
+        self.quality_scanner = None
+        self.scan_btn.setText("Scan Workbook")
+        self.validation_label.setText(f"❌ Error scanning workbook: {error}")
+        
+    def reconcile_other(self):
+        """Export the Other sheet classified as exact, near, unknown or duplicate"""
+        config = self.form_config()
+        if config is None:
+            return
+        if not os.path.exists(config["excel"]["filePath"]):
+            QMessageBox.critical(self, "Error", "Excel file does not exist!")
+            return
+        out_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Reconciliation", "other_reconciled.csv", "CSV Files (*.csv);;Excel Files (*.xlsx)")
+        if not out_path:
+            return
+        reconciler = OtherReconciler(config, out_path)
+        reconciler.signals.finished.connect(self.on_reconciled)
+        reconciler.signals.failed.connect(self.on_reconcile_failed)
+        self.reconciler = reconciler  # Keep the signals object alive until the worker reports
+        self.reconcile_btn.setEnabled(False)
+        self.validation_label.setText(f"⏳ Reconciling '{config['excel']['sheets']['other']}'...")
+        self.thread_pool.start(reconciler)
+        
+    def on_reconciled(self, counts, out_path):
+        self.reconciler = None
+        self.reconcile_btn.setEnabled(True)
+        summary = reconcile.format_counts(counts)
+        self.validation_label.setText(f"✅ Other sheet: {summary}")
+        QMessageBox.information(self, "Reconcile Other",
+                                f"Other sheet: {summary}.\n\n"
+                                "Exact and near rows belong to an inventory row; unknown rows are not in the "
+                                f"inventory.\n\nWritten to {out_path}")
+        
+    def on_reconcile_failed(self, error):
+        self.reconciler = None
+        self.reconcile_btn.setEnabled(True)
+        self.validation_label.setText(f"❌ Error reconciling the Other sheet: {error}")
+        
+    def show_journal(self):
+        """Open the scan journal of config.json and of each profile"""
+        config_path = config_core.default_config_path()
+        sources = {}
+        try:
+            if os.path.exists(config_path):
+                sources["config.json"] = (config_core.load_config(config_path),
+                                          scan_journal.default_journal_path(config_path),
+                                          progress_counter.default_progress_path(config_path))
+            store = profiles.load_profiles(self.profiles_path)
+            for name in profiles.profile_names(store):
+                sources[f"Profile: {name}"] = (store["profiles"][name],
+                                               scan_journal.default_journal_path(config_path, name),
+                                               progress_counter.default_progress_path(config_path, name))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error reading configuration:\n{str(e)}")
+            return
+        if not sources:
+            QMessageBox.information(self, "Scan Journal", "Save a configuration first.")
+            return
+        JournalDialog(sources, self.thread_pool, self).exec()
+        
+    def show_progress_report(self):
+        """Open the per-building progress of the counting range in the form"""
+        config = self.form_config()
+        if config is None:
+            return
+        if not os.path.exists(config["excel"]["filePath"]):
+            QMessageBox.critical(self, "Error", "Excel file does not exist!")
+            return
+        ProgressReportDialog(config, self.thread_pool, self).exec()
+        
+    def show_backups(self):
+        """Open the config.json backups and apply one if it is restored"""
+        config_path = config_core.default_config_path()
+        dialog = BackupsDialog(config_path, self)
+        dialog.exec()
+        config = dialog.restored
+        if config is None:
+            return
+        self.apply_config(config)
+        self.mark_config_applied(config)
+        self.config_version = file_version(config_path)
+        if os.path.exists(config["excel"]["filePath"]):
+            self.build_asset_index(config, asset_index.default_index_path(config_path))
+            self.refresh_progress(config, [self.progress_path])
+        self.validation_label.setText(
+            f"✅ Restored a backup as config.json revision {config_core.config_revision(config)}")
+        
+    def show_diagnostics(self):
+        """Open the timings of the instrumented code paths"""
+        DiagnosticsDialog(self.workbook_cache, self).exec()
+        
+    def closeEvent(self, event):
+        """Close the cached workbook handles with the window"""
+        if self.active_loader is not None:
+            self.active_loader.cancel()
+        self.workbook = None
+        self.workbook_cache.clear()
+        super().closeEvent(event)
+        
+    def form_config(self):
+        """config.json dict for the current form, or None (with a message) if no sheets are selected"""
+        config = self.current_form_config()
+        if config is None:
+            QMessageBox.critical(self, "Error", "Please select both inventory and other sheets!")
+        return config
+        
+    def current_form_config(self):
+        """config.json dict for the current form, or None if no sheets are selected"""
+        # Get selected sheets
+        inventory_sheet = self.selected_sheet(self.inventory_sheet_group, self.custom_inventory_sheet)
+        other_sheet = self.selected_sheet(self.other_sheet_group, self.custom_other_sheet)
+            
+        if not inventory_sheet or not other_sheet:
+            return None
+            
+        return config_core.build_config(
+            self.file_path_edit.text(),
+            inventory_sheet,
+            other_sheet,
+            self.selected_asset_id_letters(),
+            self.selected_column_letters(),
+            self.start_row_spin.value(),
+            self.end_row_spin.value(),
+            self.ngrok_url_edit.text(),
+            self.matching_rules()
+        )
+        
+    def save_configuration(self):
+        """Save configuration to config.json and to the active profile"""
+        try:
+            # Build configuration
+            config = self.form_config()
+            if config is None:
+                return
+            
+            # Back up the existing config.json and save the new one; running
+            # servers and other windows pick it up from the file
+            config_path = config_core.default_config_path()
+            config_core.save_config(config, config_path)
+            self.mark_config_applied(config)
+            
+            # Keep the active profile in step with config.json
+            index_copies = []
+            if self.active_profile is not None:
+                store = profiles.load_profiles(self.profiles_path)
+                profiles.put_profile(store, self.active_profile, config)
+                profiles.save_profiles(store, self.profiles_path)
+                index_copies.append(profiles.profile_index_path(self.profiles_path, self.active_profile))
+                
+            # Build the asset-ID index and count marked rows for server.js in the background
+            if os.path.exists(config["excel"]["filePath"]):
+                self.build_asset_index(config, asset_index.default_index_path(config_path), index_copies)
+                progress_paths = [self.progress_path]
+                if self.active_profile is not None:
+                    progress_paths.append(progress_counter.default_progress_path(config_path, self.active_profile))
+                self.refresh_progress(config, progress_paths)
+                
+            profile_note = f"Profile '{self.active_profile}' was updated too.\n" if self.active_profile else ""
+            QMessageBox.information(self, "Success", 
+                                   "Configuration saved successfully!\n\n"
+                                   "The server URL will be automatically loaded from config.json.\n"
+                                   f"{profile_note}"
+                                   "The asset index is being rebuilt in the background.\n"
+                                   "A running server applies the changes without a restart.")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving configuration:\n{str(e)}")
+            
+    def build_asset_index(self, config, index_path, copies=()):
+        """Start building config.index.json next to config.json (and copies for profiles)"""
+        builder = AssetIndexBuilder(config, index_path, copies)
+        builder.signals.finished.connect(self.on_asset_index_built)
+        builder.signals.failed.connect(self.on_asset_index_failed)
+        self.index_builder = builder  # Keep the signals object alive until the worker reports
+        self.validation_label.setText("⏳ Building asset index...")
+        self.thread_pool.start(builder)
+        
+    def on_asset_index_built(self, count, rebuilt):
+        state = "built" if rebuilt else "up to date"
+        self.validation_label.setText(f"✅ Asset index {state} ({count} IDs)")
+        
+    def on_asset_index_failed(self, error):
+        self.validation_label.setText(f"❌ Error building asset index: {error}")
+        
+    def refresh_progress(self, config, progress_paths):
+        """Recount marked rows in the background if the stored count is out of date"""
+        if not os.path.exists(config["excel"]["filePath"]):
+            return
+        refresher = ProgressRefresher(config, progress_paths)
+        refresher.signals.finished.connect(self.on_progress_refreshed)
+        refresher.signals.failed.connect(self.on_progress_failed)
+        self.progress_refresher = refresher  # Keep the signals object alive until the worker reports
+        self.thread_pool.start(refresher)
+        
+    def on_progress_refreshed(self, marked, total):
+        self.progress_refresher = None
+        self.update_marked_count()
+        
+    def on_progress_failed(self, error):
+        self.progress_refresher = None
+        self.marked_count_label.setToolTip(f"Error counting marked rows: {error}")
+        
+    def update_marked_count(self):
+        """Show the marked/total figure from config.progress.json when the file changed"""
+        try:
+            mtime = os.stat(self.progress_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.progress_mtime:
+            return
+        self.progress_mtime = mtime
+        progress = progress_counter.load_progress(self.progress_path) if mtime is not None else None
+        if progress is None:
+            self.marked_count_label.setText("Marked: -")
+            return
+        self.marked_count_label.setText(f"Marked: {progress['markedCount']}/{progress['counting']['totalCount']}")
+        self.marked_count_label.setToolTip(
+            f"Marked rows in the counting range, as recorded by the server (updated {progress['updated']})")
+
@@ -0,0 +1,151 @@
+"""Full-sheet data-quality scan of the inventory.
+
+The sheet is read once, only the mapped columns, into columnar arrays:
+from the column snapshot when it is current, otherwise streamed with
+xlsx_stream.iter_columns and progress reports. The checks then run over
+those arrays:
+
+- asset IDs used by more than one row, across all assetIdSearch columns
+- rows that have a name or description but no asset ID
+- asset IDs with leading or trailing whitespace
+- marked rows inside the counting range (counting.startRow-endRow), by the
+  marked-check or status rule of asset_index.is_marked
+"""
+from array import array
+
+import column_snapshot
+import instrumentation
+from asset_index import normalize_asset_id, is_marked
+
+# Rows between progress callbacks
+PROGRESS_INTERVAL = 10000
+
+
+class ScanCancelled(Exception):
+    """Raised when a scan is cancelled through its cancel callback"""
+
+
+def read_columns(file_path, sheet_name, columns, progress=None, is_cancelled=None):
+    """Stream the mapped columns of a sheet into columnar arrays
+
+    Returns (row_numbers, id_columns, has_data, marked): the sheet row of
+    each entry, one list of raw values per asset-ID column, and byte arrays
+    flagging rows with a name/description and marked rows (a marked-check
+    or status value).
+    """
+    id_cols = [c for c in columns.get("assetIdSearch", []) if c is not None]
+    data_cols = [columns[key] for key in ("assetName", "assetDescription") if columns.get(key) is not None]
+    read = id_cols + data_cols
+    id_slots = range(len(id_cols))
+    data_slots = range(len(id_cols), len(id_cols) + len(data_cols))
+    flag_slots = {}  # "markedCheck"/"status" -> position in read
+    for key in ("markedCheck", "status"):
+        if columns.get(key) is not None:
+            flag_slots[key] = len(read)
+            read.append(columns[key])
+    marked_slot = flag_slots.get("markedCheck")
+    status_slot = flag_slots.get("status")
+
+    row_numbers = array("I")
+    id_columns = [[] for _ in id_cols]
+    has_data = array("b")
+    marked = array("b")
+
+    for count, (row_number, row) in enumerate(column_snapshot.iter_columns(file_path, sheet_name, read, build=False), start=1):
+        row_numbers.append(row_number)
+        for slot in id_slots:
+            id_columns[slot].append(row[slot])
+        has_data.append(any(row[slot] not in (None, "") for slot in data_slots))
+        marked.append(is_marked(row[marked_slot] if marked_slot is not None else None,
+                                row[status_slot] if status_slot is not None else None))
+
+        if count % PROGRESS_INTERVAL == 0:
+            if is_cancelled is not None and is_cancelled():
+                raise ScanCancelled()
+            if progress is not None:
+                progress(count)
+
+    return row_numbers, id_columns, has_data, marked
+
+
+def analyze_columns(row_numbers, id_columns, has_data, marked, start_row, end_row):
+    """Run the data-quality checks over columnar arrays from read_columns"""
+    row_count = len(row_numbers)
+    rows_by_id = {}
+    blank_id_rows = array("I")
+    whitespace_ids = []
+    marked_in_range = 0
+
+    for i in range(row_count):
+        row_number = row_numbers[i]
+        if marked[i] and start_row <= row_number <= end_row:
+            marked_in_range += 1
+        row_has_id = False
+        for values in id_columns:
+            raw = values[i]
+            asset_id = normalize_asset_id(raw)
+            if asset_id is None:
+                continue
+            row_has_id = True
+            if isinstance(raw, str) and raw != raw.strip():
+                whitespace_ids.append((row_number, raw))
+            rows = rows_by_id.get(asset_id)
+            if rows is None:
+                rows_by_id[asset_id] = array("I", [row_number])
+            elif rows[-1] != row_number:  # Same ID in two columns of one row is not a duplicate
+                rows.append(row_number)
+        if not row_has_id and has_data[i]:
+            blank_id_rows.append(row_number)
+
+    duplicates = sorted(
+        ((asset_id, list(rows)) for asset_id, rows in rows_by_id.items() if len(rows) > 1),
+        key=lambda item: item[1][0]
+    )
+    return {
+        "rows": row_count,
+        "uniqueIds": len(rows_by_id),
+        "duplicates": duplicates,
+        "blankIdRows": list(blank_id_rows),
+        "whitespaceIds": whitespace_ids,
+        "markedInRange": marked_in_range,
+        "rangeTotal": max(0, end_row - start_row + 1),
+    }
+
+
+@instrumentation.traced("data_quality.scan_workbook")
+def scan_workbook(file_path, sheet_name, columns, start_row, end_row, progress=None, is_cancelled=None):
+    """Run the data-quality scan on one sheet of a workbook"""
+    row_numbers, id_columns, has_data, marked = read_columns(file_path, sheet_name, columns, progress, is_cancelled)
+    return analyze_columns(row_numbers, id_columns, has_data, marked, start_row, end_row)
+
+
+def format_report(report, limit=50):
+    """Summary line and detail text for a scan report"""
+    summary = (
+        f"{report['rows']} rows scanned, {report['uniqueIds']} unique IDs\n"
+        f"Duplicate IDs: {len(report['duplicates'])}\n"
+        f"Rows with no ID: {len(report['blankIdRows'])}\n"
+        f"IDs with stray whitespace: {len(report['whitespaceIds'])}\n"
+        f"Marked in counting range: {report['markedInRange']}/{report['rangeTotal']}"
+    )
+
+    details = []
+    if report["duplicates"]:
+        details.append("Duplicate IDs (rows):")
+        for asset_id, rows in report["duplicates"][:limit]:
+            more = f" ... ({len(rows)} rows)" if len(rows) > limit else ""
+            details.append(f"  {asset_id}: {', '.join(str(r) for r in rows[:limit])}{more}")
+        if len(report["duplicates"]) > limit:
+            details.append(f"  ... and {len(report['duplicates']) - limit} more")
+    if report["blankIdRows"]:
+        rows = report["blankIdRows"]
+        shown = ", ".join(str(r) for r in rows[:limit])
+        more = f" ... and {len(rows) - limit} more" if len(rows) > limit else ""
+        details.append(f"Rows with no ID: {shown}{more}")
+    if report["whitespaceIds"]:
+        details.append("IDs with stray whitespace (row: value):")
+        for row_number, raw in report["whitespaceIds"][:limit]:
+            details.append(f"  {row_number}: {raw!r}")
+        if len(report["whitespaceIds"]) > limit:
+            details.append(f"  ... and {len(report['whitespaceIds']) - limit} more")
+    return summary, "\n".join(details)
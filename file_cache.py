@@ -0,0 +1,142 @@
+"""Small JSON caches keyed by workbook version.
+
+Results derived from a workbook (detected columns, sheet stats, ...) are
+cached under a key built from the file path, size and mtime, so they are
+reused until the file changes. Each cache is one JSON file in .cache/ next
+to the scripts.
+
+WorkbookCache keeps a few open workbook handles the same way, in memory.
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+
+CACHE_DIR_NAME = ".cache"
+
+
+def cache_dir():
+    """Directory holding the cache files, created on first use"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_version(file_path):
+    """(absolute path, size, mtime in ns) identifying one version of a file"""
+    st = os.stat(file_path)
+    return os.path.abspath(file_path), st.st_size, st.st_mtime_ns
+
+
+def version_key(file_path, *parts):
+    """Cache key for a file version plus any extra parts (sheet name, options)"""
+    path, size, mtime_ns = file_version(file_path)
+    return "|".join([path, str(size), str(mtime_ns)] + [str(part) for part in parts])
+
+
+class JsonFileCache:
+    """Bounded key/value cache persisted as one JSON file
+
+    Entries for older versions of a file are dropped when a newer version
+    of the same file is stored, and the oldest entries go first once
+    max_entries is reached.
+    """
+    def __init__(self, name, max_entries=64):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = None
+
+    @property
+    def path(self):
+        return os.path.join(cache_dir(), f"{self.name}.json")
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key):
+        return self._load().get(key)
+
+    def put(self, key, value):
+        entries = self._load()
+        path, version = key.split("|")[0], key.split("|")[1:3]
+        for stale in [k for k in entries if k.split("|")[0] == path and k.split("|")[1:3] != version]:
+            del entries[stale]
+        entries.pop(key, None)
+        entries[key] = value
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+        self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+
+class WorkbookCache:
+    """Open workbooks keyed by file version, least recently used closed first
+
+    opener(path) opens a workbook; the cache owns what it returns and calls
+    its close() on eviction, when a newer version of the same file is
+    opened, and in clear(). Callers must not close cached workbooks
+    themselves. Safe to call from worker threads; workbooks are opened
+    outside the lock.
+    """
+    def __init__(self, opener, capacity=3):
+        self.opener = opener
+        self.capacity = capacity
+        self._entries = OrderedDict()  # file_version() -> workbook, oldest first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path):
+        """The open workbook for the current version of file_path, opening it on a miss"""
+        key = file_version(file_path)
+        with self._lock:
+            workbook = self._entries.get(key)
+            if workbook is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return workbook
+            self.misses += 1
+
+        workbook = self.opener(file_path)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                # Another thread opened the same version meanwhile
+                closing = [workbook]
+                workbook = existing
+            else:
+                self._entries[key] = workbook
+                closing = [self._entries.pop(k) for k in list(self._entries)
+                           if k[0] == key[0] and k != key]
+                while len(self._entries) > self.capacity:
+                    closing.append(self._entries.popitem(last=False)[1])
+                    self.evictions += 1
+        for stale in closing:
+            stale.close()
+        return workbook
+
+    def clear(self):
+        """Close every cached workbook"""
+        with self._lock:
+            closing = list(self._entries.values())
+            self._entries.clear()
+        for workbook in closing:
+            workbook.close()
+
+    def stats(self):
+        """{"open", "capacity", "hits", "misses", "evictions"}"""
+        with self._lock:
+            return {"open": len(self._entries), "capacity": self.capacity,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
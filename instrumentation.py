@@ -0,0 +1,259 @@
+"""Lightweight timers, counters and histograms for the configuration tools.
+
+    with instrumentation.timed("openpyxl.load_workbook"):
+        ...
+
+    @instrumentation.traced()
+    def populate_sheet_radios(self): ...
+
+    instrumentation.count("validation.requested")
+
+Tracing is off by default. While off, timed() hands back one shared no-op
+context manager and traced functions make a single flag check before
+calling through, so the calls can stay in place in production. Turn it on
+with configure() (config_window.py --trace) or from the Diagnostics dialog
+(Ctrl+Shift+D in the configuration window).
+
+Recorded data can go to a JSON-lines file (one line per timing, appended
+as it happens) and to a Prometheus text file (rewritten by
+write_prometheus(), for the node_exporter textfile collector). Pure Python
+with no third-party imports; safe to call from worker threads.
+"""
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from collections import deque
+
+# Histogram bucket upper bounds in milliseconds (Prometheus exports them in seconds)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Timings kept for the Diagnostics dialog and percentile estimates
+RECENT_EVENTS = 200
+RECENT_PER_METRIC = 256
+
+PROMETHEUS_PREFIX = "barcode_config"
+
+enabled = False
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_recent = deque(maxlen=RECENT_EVENTS)
+_jsonl_file = None
+_prometheus_path = None
+
+
+class Timer:
+    """Call count, total, extremes, histogram and recent samples of one timed name"""
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)  # The last bucket is +Inf
+        self.samples = deque(maxlen=RECENT_PER_METRIC)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        self.last_ms = ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.samples.append(ms)
+
+    def percentile(self, fraction):
+        """Nearest-rank percentile of the recent samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "totalMs": round(self.total_ms, 3),
+            "meanMs": round(self.total_ms / self.count, 3) if self.count else None,
+            "minMs": round(self.min_ms, 3) if self.min_ms is not None else None,
+            "maxMs": round(self.max_ms, 3),
+            "lastMs": round(self.last_ms, 3),
+            "p50Ms": self.percentile(0.50),
+            "p95Ms": self.percentile(0.95),
+        }
+
+
+class _NullTimer:
+    """What timed() returns while tracing is off"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _ActiveTimer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def configure(enable=True, jsonl_path=None, prometheus_path=None):
+    """Turn tracing on or off and choose where timings are exported"""
+    global _jsonl_file, _prometheus_path
+    with _lock:
+        if _jsonl_file is not None:
+            _jsonl_file.close()
+            _jsonl_file = None
+        if jsonl_path:
+            _jsonl_file = open(jsonl_path, "a", buffering=1)  # Line-buffered
+        _prometheus_path = prometheus_path
+    set_enabled(enable)
+
+
+def set_enabled(enable):
+    global enabled
+    enabled = bool(enable)
+
+
+def prometheus_path():
+    """Prometheus text file chosen with configure(), or None"""
+    return _prometheus_path
+
+
+def timed(name):
+    """Context manager that records the time spent in its block under name"""
+    if not enabled:
+        return _NULL_TIMER
+    return _ActiveTimer(name)
+
+
+def traced(name=None):
+    """Decorator that records each call's duration (default name: the function's qualname)"""
+    def decorate(func):
+        metric = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(metric, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1):
+    """Add to a counter"""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def record(name, ms):
+    """Add one timing in milliseconds"""
+    now = time.time()
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = Timer()
+        timer.add(ms)
+        event = {"ts": round(now, 3), "name": name, "ms": round(ms, 3),
+                 "thread": threading.current_thread().name}
+        _recent.append(event)
+        if _jsonl_file is not None:
+            _jsonl_file.write(json.dumps(event) + "\n")
+
+
+def reset():
+    """Forget all timings and counters"""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _recent.clear()
+
+
+def snapshot():
+    """Summaries of every timer and counter plus the recent timings, newest last"""
+    with _lock:
+        return {
+            "timers": {name: timer.summary() for name, timer in _timers.items()},
+            "counters": dict(_counters),
+            "recent": list(_recent),
+        }
+
+
+def write_jsonl(path):
+    """Write the current summaries and recent timings as JSON lines"""
+    data = snapshot()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        for name, summary in sorted(data["timers"].items()):
+            f.write(json.dumps(dict(summary, type="timer", name=name)) + "\n")
+        for name, value in sorted(data["counters"].items()):
+            f.write(json.dumps({"type": "counter", "name": name, "value": value}) + "\n")
+        for event in data["recent"]:
+            f.write(json.dumps(dict(event, type="event")) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Timers and counters in the Prometheus text exposition format"""
+    with _lock:
+        timers = [(name, timer.count, timer.total_ms, list(timer.buckets)) for name, timer in sorted(_timers.items())]
+        counters = sorted(_counters.items())
+
+    lines = []
+    if timers:
+        metric = f"{PROMETHEUS_PREFIX}_duration_seconds"
+        lines.append(f"# HELP {metric} Time spent in instrumented code paths.")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, calls, total_ms, buckets in timers:
+            label = _label(name)
+            cumulative = 0
+            for bound, hits in zip(BUCKETS_MS, buckets):
+                cumulative += hits
+                lines.append(f'{metric}_bucket{{name="{label}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{name="{label}",le="+Inf"}} {calls}')
+            lines.append(f'{metric}_sum{{name="{label}"}} {total_ms / 1000:.6f}')
+            lines.append(f'{metric}_count{{name="{label}"}} {calls}')
+    if counters:
+        metric = f"{PROMETHEUS_PREFIX}_events_total"
+        lines.append(f"# HELP {metric} Counted events in the configuration tools.")
+        lines.append(f"# TYPE {metric} counter")
+        for name, value in counters:
+            lines.append(f'{metric}{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """Write the Prometheus text file atomically (default: the configured path)"""
+    path = path or _prometheus_path
+    if not path:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
@@ -0,0 +1,147 @@
+"""Compact lookup pack for answering barcode lookups on the device.
+
+The pack is the asset index (asset_index.py) boiled down to what the app
+shows for a scan: asset ID -> name, description and marked flag. IDs are
+sorted in UTF-16 code-unit order, the order JavaScript compares strings in,
+so services/database.js can binary-search them without building a map.
+The matching rules and their variant keys come along, so tolerant matching
+works offline too. It is written gzip'd next to the index:
+
+    config.index.json          -> config.lookup.json.gz
+    config.index.<slug>.json   -> config.lookup.<slug>.json.gz
+
+server.js serves it at GET /api/lookup-pack, and after that only the rows
+marked since (GET /api/lookup-pack/marks), so devices keep it current
+without downloading it again.
+
+    python lookup_pack.py                      # write the pack for config.json
+    python lookup_pack.py --profile "North Campus"
+"""
+import sys
+import os
+import gzip
+import json
+import hashlib
+import argparse
+
+import asset_index
+
+PACK_VERSION = 2  # 2: "source" records the workbook version
+INDEX_PREFIX = "config.index"
+PACK_PREFIX = "config.lookup"
+
+
+def pack_path_for_index(index_path):
+    """Lookup pack file that belongs to an asset index file"""
+    directory, name = os.path.split(index_path)
+    if name.startswith(INDEX_PREFIX) and name.endswith(".json"):
+        name = PACK_PREFIX + name[len(INDEX_PREFIX):-len(".json")] + ".json.gz"
+    else:
+        name = os.path.splitext(name)[0] + ".lookup.json.gz"
+    return os.path.join(directory, name)
+
+
+def _js_order(text):
+    return text.encode("utf-16-be")
+
+
+def pack_id(index):
+    """Identity of the workbook content, columns and rules a pack was built from"""
+    source = index["source"]
+    parts = [source.get("sha256") or f"{source['size']}:{source['mtimeMs']}", source["sheet"],
+             json.dumps(index["columns"], sort_keys=True), json.dumps(index.get("matching"), sort_keys=True)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def build_lookup_pack(index, revision=1):
+    """Pack dict from an asset index dict"""
+    entries = index["entries"]
+    ids = sorted(entries, key=_js_order)
+    position = {asset_id: i for i, asset_id in enumerate(ids)}
+    variants = sorted(index.get("variants", {}).items(), key=lambda item: _js_order(item[0]))
+    return {
+        "version": PACK_VERSION,
+        "packId": pack_id(index),
+        "revision": revision,
+        "sheet": index["source"]["sheet"],
+        # Workbook size and mtime, so server.js stops serving the pack once the workbook changes
+        "source": {"size": index["source"]["size"], "mtimeMs": index["source"]["mtimeMs"]},
+        "matching": index.get("matching"),
+        "ids": ids,
+        "names": [entries[asset_id][1] for asset_id in ids],
+        "descriptions": [entries[asset_id][2] for asset_id in ids],
+        "marked": [1 if entries[asset_id][3] else 0 for asset_id in ids],
+        "variantKeys": [key for key, _ in variants],
+        "variantTargets": [position[asset_id] for _, asset_id in variants],
+    }
+
+
+def load_lookup_pack(pack_path):
+    """Read a pack file, or None if it is missing or unreadable"""
+    try:
+        with gzip.open(pack_path, "rt", encoding="utf-8") as f:
+            pack = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+    if pack.get("version") != PACK_VERSION:
+        return None
+    return pack
+
+
+def write_lookup_pack(pack, pack_path):
+    """Write the pack gzip'd and atomically (temp file + rename)"""
+    tmp_path = pack_path + ".tmp"
+    # mtime=0 keeps the bytes identical for identical packs
+    with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(json.dumps(pack, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    os.replace(tmp_path, pack_path)
+
+
+def refresh_lookup_pack(index, pack_path):
+    """Write the pack for an index unless the file already holds it, returning (pack, rebuilt)
+
+    The revision goes up by one whenever the content changes, so devices
+    can tell a new pack from the one they have.
+    """
+    previous = load_lookup_pack(pack_path)
+    pack = build_lookup_pack(index, previous["revision"] if previous else 1)
+    if previous == pack:
+        return pack, False
+    if previous is not None:
+        pack["revision"] = previous["revision"] + 1
+    write_lookup_pack(pack, pack_path)
+    return pack, True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the device lookup pack served by server.js")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         asset_index.CONFIG_FILE_NAME),
+                        help="path to config.json")
+    parser.add_argument("--profile", metavar="NAME", help="pack a profile from profiles.json instead of config.json")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.profile:
+            import profiles
+            profiles_path = profiles.default_profiles_path(args.config)
+            config = profiles.get_profile(profiles.load_profiles(profiles_path), args.profile)
+            index_path = profiles.profile_index_path(profiles_path, args.profile)
+        else:
+            with open(args.config, "r") as f:
+                config = json.load(f)
+            index_path = asset_index.default_index_path(args.config)
+        index, _ = asset_index.refresh_asset_index(config, index_path)
+        pack_path = pack_path_for_index(index_path)
+        pack, rebuilt = refresh_lookup_pack(index, pack_path)
+    except Exception as e:
+        print(f"❌ Error writing lookup pack: {e}", file=sys.stderr)
+        return 1
+
+    state = f"written (revision {pack['revision']})" if rebuilt else "up to date"
+    print(f"✅ Lookup pack {state}: {len(pack['ids'])} IDs, {os.path.getsize(pack_path)} bytes in {pack_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Named configuration profiles, one per workbook or site.
+
+All profiles live in profiles.json next to config.json:
+
+    {"version": 1, "active": "North Campus",
+     "profiles": {"North Campus": {<config.json dict>}, ...}}
+
+Profiles are keyed by name, so finding one is a single dict lookup, and
+each is a complete config.json dict. config.json itself stays the default
+configuration for server.js; requests can pick another profile with
+?profile=<name> or an X-Profile header. Each profile has its own asset index,
+config.index.<slug>.json.
+"""
+import os
+import re
+import copy
+import json
+
+PROFILES_VERSION = 1
+PROFILES_FILE_NAME = "profiles.json"
+
+
+def default_profiles_path(config_path):
+    """profiles.json that belongs to a config file"""
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), PROFILES_FILE_NAME)
+
+
+def profile_slug(name):
+    """File-name-safe form of a profile name (same rule as profileSlug in server.js)"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "profile"
+
+
+def profile_index_path(profiles_path, name):
+    """Asset index file for a profile"""
+    return os.path.join(os.path.dirname(os.path.abspath(profiles_path)), f"config.index.{profile_slug(name)}.json")
+
+
+def empty_store():
+    return {"version": PROFILES_VERSION, "active": None, "profiles": {}}
+
+
+def load_profiles(profiles_path):
+    """Read profiles.json, or an empty store if it does not exist yet"""
+    if not os.path.exists(profiles_path):
+        return empty_store()
+    with open(profiles_path, "r") as f:
+        store = json.load(f)
+    if store.get("version") != PROFILES_VERSION:
+        raise ValueError(f"Unsupported profiles.json version: {store.get('version')}")
+    store.setdefault("active", None)
+    store.setdefault("profiles", {})
+    return store
+
+
+def save_profiles(store, profiles_path):
+    """Write profiles.json atomically (temp file + rename)"""
+    tmp_path = profiles_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(store, f, indent=2)
+    os.replace(tmp_path, profiles_path)
+
+
+def profile_names(store):
+    """Profile names in display order"""
+    return sorted(store["profiles"], key=str.lower)
+
+
+def get_profile(store, name):
+    """The config dict of a profile"""
+    try:
+        return store["profiles"][name]
+    except KeyError:
+        raise ValueError(f"Profile '{name}' not found")
+
+
+def put_profile(store, name, config):
+    """Add or replace a profile"""
+    name = name.strip()
+    if not name:
+        raise ValueError("Profile name cannot be empty")
+    slug = profile_slug(name)
+    for other in store["profiles"]:
+        if other != name and profile_slug(other) == slug:
+            raise ValueError(f"Profile name '{name}' is too similar to existing profile '{other}'")
+    store["profiles"][name] = copy.deepcopy(config)
+    return name
+
+
+def clone_profile(store, source, target):
+    """Copy a profile under a new name"""
+    if target.strip() in store["profiles"]:
+        raise ValueError(f"Profile '{target.strip()}' already exists")
+    return put_profile(store, target, get_profile(store, source))
+
+
+def delete_profile(store, name):
+    get_profile(store, name)
+    del store["profiles"][name]
+    if store["active"] == name:
+        store["active"] = None
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(_flatten(child, f"{prefix}.{key}" if prefix else key))
+        return items
+    return {prefix: value}
+
+
+def diff_configs(a, b):
+    """Settings that differ between two config dicts as (key, a_value, b_value)
+
+    Keys are dotted paths such as "excel.columns.room"; a setting missing on
+    one side is reported as None.
+    """
+    flat_a, flat_b = _flatten(a), _flatten(b)
+    return [
+        (key, flat_a.get(key), flat_b.get(key))
+        for key in sorted(set(flat_a) | set(flat_b))
+        if flat_a.get(key) != flat_b.get(key)
+    ]
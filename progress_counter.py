@@ -0,0 +1,124 @@
+"""Persisted marked/total progress for the counting range.
+
+A row counts as marked when its markedCheck or its status cell has a value
+(the scan backends treat a non-empty status as already marked, and their
+writes do not refresh formula results in markedCheck). The number of marked
+rows in counting.startRow-endRow is computed once with one pass over those
+two columns (column_snapshot.py) and stored next to config.json as
+config.progress.json (config.progress.<slug>.json for a profile):
+
+    {"version": 1, "source": {"filePath": ..., "sheet": ..., "size": ..., "mtimeMs": ...},
+     "counting": {"startRow": 6, "endRow": 357, "totalCount": 352, "markedCheck": 18, "status": 15},
+     "markedCount": 120, "updated": "2026-01-05T14:03:11.512Z"}
+
+The scan backends (server.js, scan_service.py) then add one per newly
+marked row and rewrite this small file, instead of re-counting the range
+on every scan. The configuration window shows the stored figure.
+"""
+import os
+import json
+from datetime import datetime, timezone
+
+import column_snapshot
+import instrumentation
+from asset_index import file_signature
+
+PROGRESS_VERSION = 1
+PROGRESS_FILE_NAME = "config.progress.json"
+
+
+def default_progress_path(config_path, profile=None):
+    """Progress file that belongs to a config file, or to one of its profiles"""
+    name = PROGRESS_FILE_NAME
+    if profile:
+        import profiles
+        name = f"config.progress.{profiles.profile_slug(profile)}.json"
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), name)
+
+
+def counting_settings(config):
+    """The parts of a config that decide the count"""
+    excel = config["excel"]
+    return dict(excel["counting"], markedCheck=excel["columns"]["markedCheck"], status=excel["columns"]["status"])
+
+
+def _is_set(value):
+    return value is not None and str(value).strip() != ""
+
+
+def count_marked(file_path, sheet_name, marked_col, status_col, start_row, end_row):
+    """Marked rows in start_row-end_row, reading only the markedCheck and status columns"""
+    count = 0
+    for row_number, (marked, status) in column_snapshot.iter_columns(file_path, sheet_name, [marked_col, status_col]):
+        if row_number > end_row:
+            break
+        if row_number >= start_row and (_is_set(marked) or _is_set(status)):
+            count += 1
+    return count
+
+
+def make_progress(config, marked_count):
+    """Progress dict for config with the workbook's current size and mtime"""
+    excel = config["excel"]
+    signature = file_signature(excel["filePath"], with_hash=False)
+    return {
+        "version": PROGRESS_VERSION,
+        "source": dict(signature, filePath=excel["filePath"], sheet=excel["sheets"]["inventory"]),
+        "counting": counting_settings(config),
+        "markedCount": marked_count,
+        "updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+    }
+
+
+@instrumentation.traced("progress_counter.build_progress")
+def build_progress(config):
+    """Count the marked rows of the counting range with one streaming pass"""
+    excel = config["excel"]
+    counting = excel["counting"]
+    columns = excel["columns"]
+    marked = count_marked(excel["filePath"], excel["sheets"]["inventory"], columns["markedCheck"], columns["status"],
+                          counting["startRow"], counting["endRow"])
+    return make_progress(config, marked)
+
+
+def write_progress(progress, progress_path):
+    """Write the progress file atomically (temp file + rename)"""
+    tmp_path = progress_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+
+def load_progress(progress_path):
+    """Read a progress file, or None if it is missing or unreadable"""
+    try:
+        with open(progress_path, "r") as f:
+            progress = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if progress.get("version") != PROGRESS_VERSION:
+        return None
+    return progress
+
+
+def progress_matches_config(progress, config):
+    """True when the progress was counted for this workbook, sheet and counting range"""
+    excel = config["excel"]
+    source = progress.get("source", {})
+    return (source.get("filePath") == excel["filePath"]
+            and source.get("sheet") == excel["sheets"]["inventory"]
+            and progress.get("counting") == counting_settings(config))
+
+
+def refresh_progress(config, progress_path, force=False):
+    """Recount when the workbook or counting settings changed, returning (progress, rebuilt)"""
+    progress = None if force else load_progress(progress_path)
+    if progress is not None and progress_matches_config(progress, config):
+        current = file_signature(config["excel"]["filePath"], with_hash=False)
+        source = progress["source"]
+        if current["size"] == source.get("size") and current["mtimeMs"] == source.get("mtimeMs"):
+            return progress, False
+
+    progress = build_progress(config)
+    write_progress(progress, progress_path)
+    return progress, True
@@ -0,0 +1,173 @@
+"""Marked/unmarked counts per building and room, for planning the next sweep.
+
+The counting range of the inventory sheet is read once, only the asset ID,
+location, room, markedCheck and status columns (column_snapshot.py), and
+every row with an asset ID is counted under its building (location) and
+room. A row counts as marked the same way as in progress_counter.py. The
+result is cached per workbook version (see file_cache.py), so reopening the
+report for an unchanged workbook costs one lookup:
+
+    {"total": 352, "marked": 120,
+     "buildings": [{"building": "Library", "total": 40, "marked": 12,
+                    "rooms": [{"room": "101", "total": 8, "marked": 8}, ...]}, ...]}
+
+    python progress_report.py                     # print the report for config.json
+    python progress_report.py --csv progress.csv
+"""
+import sys
+import os
+import re
+import csv
+import json
+import argparse
+
+import column_snapshot
+import instrumentation
+from asset_index import normalize_asset_id
+from file_cache import JsonFileCache, version_key
+
+NO_BUILDING = "(no building)"
+NO_ROOM = "(no room)"
+
+CSV_HEADERS = ["Building", "Room", "Assets", "Marked", "Unmarked", "Done %"]
+
+_cache = JsonFileCache("progress_report")
+
+
+def _report_settings(config):
+    excel = config["excel"]
+    columns = excel["columns"]
+    return {
+        "idColumns": [c for c in columns["assetIdSearch"] if c is not None],
+        "location": columns["location"],
+        "room": columns["room"],
+        "markedCheck": columns["markedCheck"],
+        "status": columns["status"],
+        "startRow": excel["counting"]["startRow"],
+        "endRow": excel["counting"]["endRow"],
+    }
+
+
+def _is_set(value):
+    return value is not None and str(value).strip() != ""
+
+
+def _natural(text):
+    """Sort key that puts room "9" before room "10" """
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", text.lower())]
+
+
+@instrumentation.traced("progress_report.build_report")
+def build_report(file_path, sheet_name, settings):
+    """Group the counting range by building and room with one streaming pass
+
+    settings holds idColumns, location, room, markedCheck, status (zero-based
+    columns) and startRow/endRow (1-based), as from _report_settings().
+    """
+    id_count = len(settings["idColumns"])
+    read = settings["idColumns"] + [settings[key] for key in ("location", "room", "markedCheck", "status")]
+    groups = {}  # building -> room -> [total, marked]
+    for row_number, row in column_snapshot.iter_columns(file_path, sheet_name, read):
+        if row_number > settings["endRow"]:
+            break
+        if row_number < settings["startRow"] or not any(_is_set(value) for value in row[:id_count]):
+            continue
+        location, room, marked, status = row[id_count:]
+        # Same text rules as asset IDs, so a room typed as 101 and read as 101.0 stays "101"
+        counts = groups.setdefault(normalize_asset_id(location) or NO_BUILDING, {}).setdefault(
+            normalize_asset_id(room) or NO_ROOM, [0, 0])
+        counts[0] += 1
+        if _is_set(marked) or _is_set(status):
+            counts[1] += 1
+
+    buildings = []
+    for building in sorted(groups, key=_natural):
+        rooms = [{"room": room, "total": total, "marked": marked}
+                 for room, (total, marked) in sorted(groups[building].items(), key=lambda item: _natural(item[0]))]
+        buildings.append({
+            "building": building,
+            "total": sum(room["total"] for room in rooms),
+            "marked": sum(room["marked"] for room in rooms),
+            "rooms": rooms,
+        })
+    return {
+        "total": sum(building["total"] for building in buildings),
+        "marked": sum(building["marked"] for building in buildings),
+        "buildings": buildings,
+    }
+
+
+def progress_report(config):
+    """The report for a config.json dict, cached per workbook version; returns (report, cached)"""
+    excel = config["excel"]
+    settings = _report_settings(config)
+    key = version_key(excel["filePath"], excel["sheets"]["inventory"], json.dumps(settings, sort_keys=True))
+    report = _cache.get(key)
+    if report is not None:
+        return report, True
+    report = build_report(excel["filePath"], excel["sheets"]["inventory"], settings)
+    _cache.put(key, report)
+    return report, False
+
+
+def report_rows(report, unfinished_only=False):
+    """CSV rows: each building's total (room "(all)") followed by its rooms"""
+    for building in report["buildings"]:
+        if unfinished_only and building["marked"] == building["total"]:
+            continue
+        yield _row(building["building"], "(all)", building)
+        for room in building["rooms"]:
+            if unfinished_only and room["marked"] == room["total"]:
+                continue
+            yield _row(building["building"], room["room"], room)
+
+
+def _row(building, room, counts):
+    done = round(100 * counts["marked"] / counts["total"], 1) if counts["total"] else 0.0
+    return [building, room, counts["total"], counts["marked"], counts["total"] - counts["marked"], done]
+
+
+def write_csv(report, csv_path, unfinished_only=False):
+    """Write the report as CSV (UTF-8 with BOM so Excel shows accented names)"""
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(report_rows(report, unfinished_only))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Marked/unmarked assets per building and room")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+                        help="path to config.json")
+    parser.add_argument("--profile", metavar="NAME", help="report a profile from profiles.json instead of config.json")
+    parser.add_argument("--csv", metavar="FILE", help="write the report to FILE instead of printing it")
+    parser.add_argument("--unfinished", action="store_true", help="only buildings and rooms with unmarked assets")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.profile:
+            import profiles
+            store = profiles.load_profiles(profiles.default_profiles_path(args.config))
+            config = profiles.get_profile(store, args.profile)
+        else:
+            with open(args.config, "r") as f:
+                config = json.load(f)
+        report, _ = progress_report(config)
+        if args.csv:
+            write_csv(report, args.csv, args.unfinished)
+    except Exception as e:
+        print(f"❌ Error building progress report: {e}", file=sys.stderr)
+        return 1
+
+    if args.csv:
+        print(f"✅ Progress report written to {args.csv}")
+        return 0
+    for building, room, total, marked, unmarked, done in report_rows(report, args.unfinished):
+        label = building if room == "(all)" else f"    {room}"
+        print(f"{label:<32} {marked:>6}/{total:<6} {unmarked:>6} left  {done:5.1f}%")
+    print(f"Total: {report['marked']}/{report['total']} marked")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
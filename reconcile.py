@@ -0,0 +1,127 @@
+"""Reconcile the "Other" sheet against the inventory.
+
+Scans that match no inventory row are appended to the Other sheet (barcode,
+building, room in columns A-C). Many of them are inventory IDs that only
+failed the exact match: a dropped leading zero, different case, a scanner
+prefix. reconcile_other() streams both sheets once and classifies every
+Other row:
+
+    exact      the barcode is an inventory ID (added or fixed after the scan)
+    near       it matches an inventory ID under the matching rules, or
+               ignoring case and leading zeros (NEAR_RULES)
+    unknown    no inventory ID comes close
+    duplicate  the same barcode is already on an earlier Other row
+
+Only the inventory IDs and the Other barcodes seen so far are held in
+memory; rows are yielded and written one at a time, so CSV and XLSX
+exports stay flat however long either sheet is.
+
+    python config_window.py --reconcile other.csv
+    python config_window.py --reconcile other.xlsx --profile "North Campus"
+"""
+import csv
+
+import barcode_match
+import column_snapshot
+import instrumentation
+import workbook_lock
+import xlsx_stream
+from asset_index import normalize_asset_id
+
+# Other sheet layout written by server.js and scan_service.py
+OTHER_COLUMNS = [0, 1, 2]  # Barcode, building, room
+
+# Forced on top of the configured rules when looking for near matches
+NEAR_RULES = {"caseFold": True, "stripLeadingZeros": True}
+
+CLASSES = ("exact", "near", "unknown", "duplicate")
+
+HEADERS = ["Other Row", "Barcode", "Building", "Room", "Class", "Inventory Row", "Inventory ID"]
+
+
+@instrumentation.traced("reconcile.inventory_ids")
+def inventory_ids(config):
+    """(exact, near) maps for the inventory sheet: ID -> row and near key -> (row, ID)
+
+    Built from every assetIdSearch column with one pass; the first row wins
+    for IDs and keys that appear more than once.
+    """
+    excel = config["excel"]
+    id_cols = [c for c in excel["columns"]["assetIdSearch"] if c is not None]
+    rules = near_rules(config)
+    exact, near = {}, {}
+    for row_number, values in column_snapshot.iter_columns(excel["filePath"], excel["sheets"]["inventory"], id_cols):
+        for value in values:
+            asset_id = normalize_asset_id(value)
+            if asset_id is None or asset_id in exact:
+                continue
+            exact[asset_id] = row_number
+            key = barcode_match.match_key(asset_id, rules)
+            if key is not None:
+                near.setdefault(key, (row_number, asset_id))
+    return exact, near
+
+
+def near_rules(config):
+    """The config's matching rules with NEAR_RULES switched on"""
+    return barcode_match.normalize_rules(dict(barcode_match.matching_rules(config), **NEAR_RULES))
+
+
+def reconcile_other(config):
+    """Yield one HEADERS-shaped list per Other row that holds a barcode"""
+    excel = config["excel"]
+    other_sheet = excel["sheets"]["other"]
+    exact, near = inventory_ids(config)
+    rules = near_rules(config)
+    if other_sheet not in xlsx_stream.sheet_names(excel["filePath"]):
+        return  # Nothing has been scanned outside the inventory yet
+
+    first_seen = {}  # Barcode -> first Other row
+    with workbook_lock.reading(excel["filePath"]) as (path, _):
+        for row_number, (barcode, building, room) in xlsx_stream.iter_columns(path, other_sheet, OTHER_COLUMNS):
+            barcode = normalize_asset_id(barcode)
+            if barcode is None:
+                continue
+            row = [row_number, barcode, normalize_asset_id(building) or "", normalize_asset_id(room) or ""]
+            first = first_seen.setdefault(barcode, row_number)
+            if first != row_number:
+                yield row + ["duplicate", None, None]
+            elif barcode in exact:
+                yield row + ["exact", exact[barcode], barcode]
+            else:
+                match = near.get(barcode_match.match_key(barcode, rules))
+                if match is not None:
+                    yield row + ["near", match[0], match[1]]
+                else:
+                    yield row + ["unknown", None, None]
+
+
+def _counted(rows, counts):
+    for row in rows:
+        counts[row[4]] += 1
+        yield row
+
+
+def export_reconciliation(config, out_path):
+    """Write reconcile_other() to a .csv or .xlsx file, returning the count per class"""
+    counts = dict.fromkeys(CLASSES, 0)
+    rows = _counted(reconcile_other(config), counts)
+    if out_path.lower().endswith(".xlsx"):
+        import openpyxl  # Deferred; only XLSX exports need it
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Reconciliation")
+        sheet.append(HEADERS)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(out_path)
+    else:
+        with open(out_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(rows)
+    return counts
+
+
+def format_counts(counts):
+    """One-line summary, e.g. "12 exact, 30 near, 5 unknown, 3 duplicate" """
+    return ", ".join(f"{counts[name]} {name}" for name in CLASSES)
@@ -0,0 +1,136 @@
+"""Write-ahead journal of scan events.
+
+Every scan is appended to scans.journal.jsonl next to config.json (a
+profile uses scans.journal.<slug>.jsonl) and
+fsync'd before the workbook is touched, so a scan survives a failed
+workbook write (Excel holding the file open) or a crash. After a workbook
+write succeeds, an "applied" marker records how far the journal has been
+written into the workbook:
+
+    {"type": "scan", "seq": 41, "barcode": "12345", "status": "F", "location": "North Hall",
+     "room": "101", "timestamp": "2026-01-05T14:03:11.512Z", "device": "10.0.0.7"}
+    {"type": "applied", "through": 41, "timestamp": "2026-01-05T14:03:12.020Z"}
+
+Scans after the last marker are pending and are replayed into the workbook
+by scan_service.py on start, or from the Journal view of the configuration
+window. server.js writes the same format.
+"""
+import os
+import json
+import threading
+from datetime import datetime, timezone
+
+JOURNAL_FILE_NAME = "scans.journal.jsonl"
+
+# Applied scans kept by compact(), for the Journal view
+KEEP_APPLIED = 1000
+
+
+def default_journal_path(config_path, profile=None):
+    """Journal file that belongs to a config file, or to one of its profiles"""
+    name = JOURNAL_FILE_NAME
+    if profile:
+        import profiles
+        name = f"scans.journal.{profiles.profile_slug(profile)}.jsonl"
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), name)
+
+
+def _timestamp():
+    """UTC time in the format of JavaScript's Date.toISOString()"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def read_journal(journal_path):
+    """(scan entries, applied_through) from a journal file
+
+    A torn last line from a crash mid-append is ignored.
+    """
+    scans = []
+    applied_through = 0
+    try:
+        with open(journal_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "scan":
+                    scans.append(entry)
+                elif entry.get("type") == "applied":
+                    applied_through = max(applied_through, entry.get("through", 0))
+    except FileNotFoundError:
+        pass
+    return scans, applied_through
+
+
+class ScanJournal:
+    """Append-only, fsync'd scan journal; safe to share between threads"""
+    def __init__(self, journal_path):
+        self.path = journal_path
+        self.lock = threading.Lock()
+        self._repair()
+        scans, self.applied_through = read_journal(journal_path)
+        self.last_seq = max([entry["seq"] for entry in scans] + [self.applied_through])
+        self._file = open(journal_path, "ab")
+
+    def _repair(self):
+        """Cut a torn last line so the next append starts on a fresh line"""
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append_scan(self, barcode, status=None, location=None, room=None, device=None):
+        """Durably record one scan and return its sequence number"""
+        with self.lock:
+            self.last_seq += 1
+            self._append({
+                "type": "scan", "seq": self.last_seq, "barcode": str(barcode), "status": status,
+                "location": location, "room": room, "timestamp": _timestamp(), "device": device,
+            })
+            return self.last_seq
+
+    def mark_applied(self, through):
+        """Record that every scan up to seq through is in the workbook"""
+        with self.lock:
+            if through <= self.applied_through:
+                return
+            self.applied_through = through
+            self._append({"type": "applied", "through": through, "timestamp": _timestamp()})
+
+    def pending(self):
+        """Scan entries not yet written to the workbook, oldest first"""
+        scans, applied_through = read_journal(self.path)
+        return [entry for entry in scans if entry["seq"] > applied_through]
+
+    def compact(self, keep_applied=KEEP_APPLIED):
+        """Rewrite the journal with all pending scans and the last keep_applied applied ones"""
+        with self.lock:
+            scans, applied_through = read_journal(self.path)
+            applied = [entry for entry in scans if entry["seq"] <= applied_through]
+            kept = applied[-keep_applied:] if keep_applied else []
+            kept += [entry for entry in scans if entry["seq"] > applied_through]
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+                if applied_through:
+                    marker = {"type": "applied", "through": applied_through, "timestamp": _timestamp()}
+                    f.write(json.dumps(marker, separators=(",", ":")).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+
+    def close(self):
+        with self.lock:
+            self._file.close()
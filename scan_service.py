@@ -0,0 +1,558 @@
+"""Python scan-ingest service, an alternative backend to server.js.
+
+    python scan_service.py [--config config.json] [--profile NAME] [--port 3000]
+                           [--batch-size 50] [--flush-interval 2]
+
+Serves the same API as server.js (POST /api/barcode, GET /api/barcodes,
+GET /api/barcode/lookup/<id>, GET /health) from config.json or a profile.
+The workbook is loaded once and kept in memory. Scans are applied to it
+immediately under one lock, so concurrent scanners never lose each other's
+changes, and written back in batches: after --batch-size scans or
+--flush-interval seconds, whichever comes first, and on shutdown. Each write
+goes to a temp file that atomically replaces the workbook.
+
+Every scan is first appended to the write-ahead journal (scan_journal.py),
+so scans that were not written yet survive a crash and are replayed into
+the workbook on the next start.
+
+Each flush holds the workbook lock (workbook_lock.py) that server.js also
+takes. If someone else saved the workbook since it was loaded (server.js,
+or Excel), the flush reloads it under the lock and applies the unwritten
+scans again on top, so both sets of changes end up in the file.
+
+IDs are matched with the config's matching rules (barcode_match.py), the
+same way server.js does.
+
+config.json (or profiles.json with --profile) is watched while the service
+runs. When its settings change, pending scans are written with the old
+settings and the workbook is reloaded with the new ones; no restart needed.
+
+Benchmark it with: python -m benchmarks.scan_load --workbook inventory.xlsx
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import barcode_match
+import config_core
+import progress_counter
+import column_snapshot
+import scan_journal
+import workbook_lock
+from asset_index import normalize_asset_id, cell_text, is_marked
+from file_cache import file_version
+
+DEFAULT_PORT = 3000
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# How often the config file is checked for changes, in seconds
+CONFIG_POLL_INTERVAL = 1.0
+
+
+def _is_set(value):
+    return value is not None and str(value).strip() != ""
+
+
+class Inventory:
+    """Workbook held in memory with scans applied immediately and flushed in batches
+
+    All state is guarded by one condition variable; flush_loop() runs on its
+    own thread and writes the workbook when a batch is due. With a journal,
+    scans are journaled before they are applied, pending journal entries are
+    replayed on load, and each workbook write is recorded as applied. With a
+    progress_path, the marked count is stored after every write
+    (progress_counter.py).
+    """
+    def __init__(self, config, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 journal=None, progress_path=None):
+        self.progress_path = progress_path
+        self.configure(config)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.condition = threading.Condition()
+        self.pending = 0  # Scans applied in memory but not yet written
+        self.unwritten = []  # (data, status, location, room) of those scans, to apply again after a reload
+        self.first_pending = None  # time.monotonic() of the oldest unwritten scan
+        self.flushes = 0
+        self.closed = False
+        self.flusher = None
+        self.journal = journal
+        self.applied_seq = 0  # Last journal seq applied in memory
+        self.replayed = 0
+        self.load()
+        if progress_path is not None:
+            self.write_progress()
+        if journal is not None:
+            self.replay_journal()
+
+    def configure(self, config):
+        """Take the workbook, sheets, columns and rules from a config.json dict"""
+        self.config = config
+        excel = config["excel"]
+        self.file_path = excel["filePath"]
+        self.inventory_sheet = excel["sheets"]["inventory"]
+        self.other_sheet = excel["sheets"]["other"]
+        self.columns = excel["columns"]
+        self.rules = barcode_match.matching_rules(config)
+        self.start_row = excel["counting"]["startRow"]
+        self.end_row = excel["counting"]["endRow"]
+        self.total_count = excel["counting"]["totalCount"]
+
+    def reload(self, config):
+        """Switch to new settings without dropping scans
+
+        Scans made with the old settings are written first; requests wait on
+        the lock until the workbook is loaded with the new ones.
+        """
+        with self.condition:
+            if self.pending:
+                self._flush_locked()
+            old = self.config
+            self.configure(config)
+            try:
+                self.load()
+            except Exception:
+                # Keep serving the old workbook rather than nothing
+                self.configure(old)
+                self.load()
+                raise
+            if self.progress_path is not None:
+                self.write_progress()
+
+    def load(self):
+        """Load the workbook and build the in-memory ID lookup"""
+        import openpyxl  # Deferred so importing this module stays cheap
+
+        id_cols = [c for c in self.columns["assetIdSearch"] if c is not None]
+        name_col = self.columns["assetName"]
+        desc_col = self.columns["assetDescription"]
+        marked_col = self.columns["markedCheck"]
+        status_col = self.columns["status"]
+
+        # Cached cell values (formula results) come from the column snapshot;
+        # openpyxl keeps the formulas so they survive the write back
+        self.entries = {}  # asset ID -> [row, name, description]
+        self.variants = {}  # Match key -> asset ID, when matching rules are set
+        tolerant = barcode_match.rules_active(self.rules)
+        self.marked = set()  # Rows with a marked check or a status, as in the asset index
+        self.marked_rows = set()  # Those in the counting range
+        read = id_cols + [name_col, desc_col, marked_col, status_col]
+        width = len(id_cols)
+        # Both reads come from one copy, so they see the same version of the workbook
+        with workbook_lock.reading(self.file_path) as (path, version):
+            rows = column_snapshot.iter_copy(self.file_path, self.inventory_sheet, read, path, version)
+            for row_number, values in rows:
+                for value in values[:width]:
+                    asset_id = normalize_asset_id(value)
+                    if asset_id is not None and asset_id not in self.entries:
+                        self.entries[asset_id] = [row_number, cell_text(values[width]), cell_text(values[width + 1])]
+                        key = barcode_match.match_key(asset_id, self.rules) if tolerant else None
+                        if key is not None:
+                            self.variants.setdefault(key, asset_id)
+                if is_marked(values[width + 2], values[width + 3]):
+                    self.marked.add(row_number)
+                    if self.start_row <= row_number <= self.end_row:
+                        self.marked_rows.add(row_number)
+            self.workbook = openpyxl.load_workbook(path)
+            self.signature = version
+        if self.inventory_sheet not in self.workbook.sheetnames:
+            raise ValueError(f"Sheet '{self.inventory_sheet}' not found in Excel file")
+        self.sheet = self.workbook[self.inventory_sheet]
+
+        self.other_ids = set()
+        self.other_next_row = 1
+        if self.other_sheet in self.workbook.sheetnames:
+            other = self.workbook[self.other_sheet]
+            for (value,) in other.iter_rows(min_col=1, max_col=1, values_only=True):
+                asset_id = normalize_asset_id(value)
+                if asset_id is not None:
+                    self.other_ids.add(asset_id)
+            if other.max_row > 1 or other.cell(row=1, column=1).value is not None:
+                self.other_next_row = other.max_row + 1
+
+    def write_progress(self):
+        """Store the marked count of the workbook on disk"""
+        progress = progress_counter.make_progress(self.config, len(self.marked_rows))
+        progress_counter.write_progress(progress, self.progress_path)
+
+    def _scanned(self, scan):
+        """Count one applied scan and wake the flusher when a batch is full"""
+        if self.pending == 0:
+            self.first_pending = time.monotonic()
+        self.pending += 1
+        self.unwritten.append(scan)
+        self.condition.notify()
+
+    def replay_journal(self):
+        """Apply the journal's pending scans to the in-memory workbook"""
+        with self.condition:
+            for entry in self.journal.pending():
+                self._apply(entry["barcode"], entry.get("status"), entry.get("location"), entry.get("room"))
+                self.applied_seq = entry["seq"]
+                self.replayed += 1
+
+    def apply_scan(self, data, status=None, location=None, room=None, device=None):
+        """Journal and apply one scan like server.js POST /api/barcode, returning its response"""
+        with self.condition:
+            seq = None
+            if self.journal is not None:
+                seq = self.journal.append_scan(data, status, location, room, device)
+            result = self._apply(data, status, location, room)
+            if seq is not None:
+                self.applied_seq = seq
+            return result
+
+    def _entry(self, asset_id):
+        """Inventory entry of a normalized asset ID: exact match first, then its match key"""
+        entry = self.entries.get(asset_id)
+        if entry is None and self.variants:
+            exact = self.variants.get(barcode_match.match_key(asset_id, self.rules))
+            entry = self.entries.get(exact) if exact is not None else None
+        return entry
+
+    def _apply(self, data, status, location, room):
+        """Apply one scan to the workbook in memory; the caller holds the condition"""
+        asset_id = normalize_asset_id(data)
+        entry = self._entry(asset_id)
+        if entry is not None:
+            row, name, _ = entry
+            status_cell = self.sheet.cell(row=row, column=self.columns["status"] + 1)
+            if _is_set(status_cell.value):
+                return {"success": True, "found": True, "alreadyMarked": True, "lValue": name,
+                        "message": f"{name} Exists", "barcode": {"data": data}}
+
+            status_cell.value = status or "F"
+            if location:
+                self.sheet.cell(row=row, column=self.columns["location"] + 1).value = location
+            if room:
+                self.sheet.cell(row=row, column=self.columns["room"] + 1).value = room
+            self.marked.add(row)
+            if self.start_row <= row <= self.end_row:
+                self.marked_rows.add(row)
+            self._scanned((data, status, location, room))
+            marked_count = len(self.marked_rows)
+            return {"success": True, "found": True, "lValue": name, "markedCount": marked_count,
+                    "totalCount": self.total_count,
+                    "message": f"{name} Found! {marked_count}/{self.total_count}",
+                    "barcode": {"data": data}}
+
+        if asset_id in self.other_ids:
+            return {"success": True, "found": False, "alreadyInOther": True,
+                    "message": "Already in 'Other' sheet (duplicate prevented)", "barcode": {"data": data}}
+
+        if self.other_sheet not in self.workbook.sheetnames:
+            self.workbook.create_sheet(self.other_sheet)
+        other = self.workbook[self.other_sheet]
+        row = self.other_next_row
+        other.cell(row=row, column=1).value = data
+        if location:
+            other.cell(row=row, column=2).value = location
+        if room:
+            other.cell(row=row, column=3).value = room
+        self.other_next_row += 1
+        self.other_ids.add(asset_id)
+        self._scanned((data, status, location, room))
+        return {"success": True, "found": False, "notInInventory": True,
+                "message": "Found! But not what we're looking for. Added to 'Other' sheet",
+                "barcode": {"data": data}}
+
+    def lookup(self, barcode):
+        """Answer like server.js GET /api/barcode/lookup/<id>"""
+        asset_id = normalize_asset_id(barcode)
+        with self.condition:
+            entry = self._entry(asset_id)
+            if entry is None:
+                return {"success": True, "found": False, "assetDescription": None,
+                        "assetId": barcode, "isMarked": False}
+            row, _, description = entry
+            return {"success": True, "found": True, "assetDescription": description,
+                    "assetId": barcode, "isMarked": row in self.marked}
+
+    def other_barcodes(self):
+        """Barcodes in the Other sheet, like server.js GET /api/barcodes"""
+        with self.condition:
+            if self.other_sheet not in self.workbook.sheetnames:
+                return []
+            return [
+                {"data": str(value).strip()}
+                for (value,) in self.workbook[self.other_sheet].iter_rows(min_col=1, max_col=1, values_only=True)
+                if _is_set(value)
+            ]
+
+    def _flush_locked(self):
+        """Write the workbook atomically; the caller holds the condition"""
+        with workbook_lock.writing(self.file_path, "scan_service"):
+            if file_version(self.file_path) != self.signature:
+                self._merge_locked()
+            tmp_path = self.file_path + ".tmp"
+            self.workbook.save(tmp_path)
+            os.replace(tmp_path, self.file_path)
+            self.signature = file_version(self.file_path)
+        self.flushes += 1
+        if self.journal is not None:
+            self.journal.mark_applied(self.applied_seq)
+        if self.progress_path is not None:
+            self.write_progress()
+        self.pending = 0
+        self.first_pending = None
+        self.unwritten = []
+
+    def _merge_locked(self):
+        """Reload a workbook someone else saved and apply the unwritten scans to it again
+
+        The caller holds the condition and the workbook lock, so nothing can
+        save in between.
+        """
+        print(f"🔄 {self.file_path} changed on disk; applying {len(self.unwritten)} scan(s) to the saved version",
+              file=sys.stderr)
+        scans, self.unwritten = self.unwritten, []
+        try:
+            self.load()
+        except Exception:
+            self.unwritten = scans  # Still in memory; the next flush tries again
+            raise
+        for scan in scans:
+            self._apply(*scan)
+
+    def flush(self):
+        """Write pending scans now, returning True if anything was written"""
+        with self.condition:
+            if not self.pending:
+                # Scans that changed nothing (already marked) need no write
+                if self.journal is not None:
+                    self.journal.mark_applied(self.applied_seq)
+                return False
+            self._flush_locked()
+            return True
+
+    def flush_loop(self):
+        """Flush after batch_size scans or flush_interval seconds, until close()"""
+        with self.condition:
+            while not self.closed:
+                due = self.pending >= self.batch_size
+                if self.pending and not due:
+                    remaining = self.flush_interval - (time.monotonic() - self.first_pending)
+                    due = remaining <= 0
+                    if not due:
+                        self.condition.wait(remaining)
+                        continue
+                if not due:
+                    self.condition.wait()
+                    continue
+                try:
+                    self._flush_locked()
+                except Exception as e:
+                    print(f"❌ Error writing workbook: {e}", file=sys.stderr)
+                    self.condition.wait(self.flush_interval)  # Retry later with the scans still pending
+
+    def start(self):
+        self.flusher = threading.Thread(target=self.flush_loop, name="inventory-flush", daemon=True)
+        self.flusher.start()
+
+    def close(self):
+        """Stop the flusher and write anything still pending"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.flusher is not None:
+            self.flusher.join()
+        self.flush()
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the Inventory is server.inventory"""
+    protocol_version = "HTTP/1.1"  # Keep-alive for scanners that send many requests
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass  # One line per scan would dominate the console
+
+    def send_json(self, body, status=200):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_cors_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", "Origin, X-Requested-With, Content-Type, Accept")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.send_cors_headers()
+        self.end_headers()
+
+    def do_GET(self):
+        inventory = self.server.inventory
+        path = urlsplit(self.path).path
+        try:
+            if path == "/health":
+                self.send_json({"status": "OK", "message": "Barcode scan service is running",
+                                "excelFileAccessible": os.path.exists(inventory.file_path),
+                                "pendingScans": inventory.pending, "flushes": inventory.flushes})
+            elif path == "/api/barcodes":
+                self.send_json(inventory.other_barcodes())
+            elif path.startswith("/api/barcode/lookup/"):
+                barcode = unquote(path[len("/api/barcode/lookup/"):])
+                if not barcode:
+                    self.send_json({"success": False, "error": "Barcode is required"}, 400)
+                else:
+                    self.send_json(inventory.lookup(barcode))
+            else:
+                self.send_json({"success": False, "error": "Not found"}, 404)
+        except Exception as e:
+            self.send_json({"success": False, "error": str(e)}, 500)
+
+    def do_POST(self):
+        inventory = self.server.inventory
+        if urlsplit(self.path).path != "/api/barcode":
+            self.send_json({"success": False, "error": "Not found"}, 404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not body.get("data"):
+                self.send_json({"success": False, "error": "Barcode data is required"}, 400)
+                return
+            self.send_json(inventory.apply_scan(body["data"], body.get("status"), body.get("location"),
+                                                body.get("room"), body.get("device") or self.client_address[0]))
+        except Exception as e:
+            self.send_json({"success": False, "error": str(e)}, 500)
+
+
+def create_server(inventory, host="", port=DEFAULT_PORT):
+    """HTTP server bound to host:port serving an Inventory (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), ScanRequestHandler)
+    server.daemon_threads = True
+    server.inventory = inventory
+    return server
+
+
+def load_service_config(config_path, profile=None):
+    """config.json, or a named profile from the profiles.json next to it"""
+    if profile:
+        import profiles
+        return profiles.get_profile(profiles.load_profiles(profiles.default_profiles_path(config_path)), profile)
+    return config_core.load_config(config_path)
+
+
+def watch_config(inventory, config_path, profile=None, interval=CONFIG_POLL_INTERVAL, stop=None):
+    """Reload the inventory whenever the settings in its config file change
+
+    Polls the size and mtime of config.json (profiles.json with a profile)
+    and compares content hashes, so saves that change nothing are ignored.
+    Runs until stop (a threading.Event) is set.
+    """
+    if profile:
+        import profiles
+        watched = profiles.default_profiles_path(config_path)
+    else:
+        watched = config_path
+    stop = stop or threading.Event()
+    applied = config_core.config_hash(inventory.config)
+    seen = None
+    while not stop.wait(interval):
+        try:
+            version = file_version(watched)
+        except OSError:
+            continue  # Mid-replace or deleted; keep the current settings
+        if version == seen:
+            continue
+        seen = version
+        try:
+            config = load_service_config(config_path, profile)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable {os.path.basename(watched)}: {e}", file=sys.stderr)
+            continue
+        digest = config_core.config_hash(config)
+        if digest == applied:
+            continue
+        try:
+            inventory.reload(config)
+        except Exception as e:
+            print(f"❌ Error applying new settings from {os.path.basename(watched)}: {e}", file=sys.stderr)
+            continue
+        applied = digest
+        print(f"🔄 Settings reloaded from {os.path.basename(watched)} "
+              f"(revision {config_core.config_revision(config)}): {len(inventory.entries)} IDs")
+
+
+def replay_journal(config, journal_path, progress_path=None):
+    """Write the journal's pending scans into the workbook now, returning how many were replayed"""
+    journal = scan_journal.ScanJournal(journal_path)
+    try:
+        inventory = Inventory(config, journal=journal, progress_path=progress_path)
+        inventory.flush()
+        return inventory.replayed
+    finally:
+        journal.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barcode scan-ingest service with batched workbook writes")
+    parser.add_argument("--config", default=config_core.default_config_path(), help="path to config.json")
+    parser.add_argument("--profile", metavar="NAME", help="serve a profile from profiles.json instead of config.json")
+    parser.add_argument("--host", default="", help="address to listen on (default: all interfaces)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="write the workbook after this many scans")
+    parser.add_argument("--flush-interval", type=float, default=DEFAULT_FLUSH_INTERVAL,
+                        help="write pending scans at least this often, in seconds")
+    parser.add_argument("--no-journal", action="store_true", help="do not journal scans (faster, not crash-safe)")
+    args = parser.parse_args(argv)
+
+    journal = None
+    try:
+        config = load_service_config(args.config, args.profile)
+        if not args.no_journal:
+            journal = scan_journal.ScanJournal(scan_journal.default_journal_path(args.config, args.profile))
+            journal.compact()
+        progress_path = progress_counter.default_progress_path(args.config, args.profile)
+        inventory = Inventory(config, args.batch_size, args.flush_interval, journal, progress_path)
+        server = create_server(inventory, args.host, args.port)
+    except Exception as e:
+        print(f"❌ Error starting scan service: {e}", file=sys.stderr)
+        return 1
+
+    inventory.start()
+    watcher = threading.Thread(target=watch_config, args=(inventory, args.config, args.profile),
+                               name="config-watch", daemon=True)
+    watcher.start()
+    print("=" * 60)
+    print("BARCODE SCAN SERVICE STARTED")
+    print("=" * 60)
+    print(f"Server running on: http://localhost:{server.server_address[1]}")
+    print(f"Excel file: {inventory.file_path}")
+    print(f"Inventory: {len(inventory.entries)} IDs in '{inventory.inventory_sheet}', "
+          f"{len(inventory.marked_rows)}/{inventory.total_count} marked")
+    print(f"Writes: every {args.batch_size} scans or {args.flush_interval:g}s")
+    if journal is not None:
+        print(f"Journal: {journal.path} ({inventory.replayed} pending scans replayed)")
+    print("=" * 60)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        inventory.close()
+        if journal is not None:
+            journal.close()
+        print(f"✅ Pending scans written ({inventory.flushes} writes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
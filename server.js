@@ -1,14 +1,39 @@
 const express = require('express');
+const crypto = require('crypto');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
 const XLSX = require('xlsx');
+const zlib = require('zlib');
+const { DEFAULT_MATCHING, matchingRules, matchKey, cellMatches } = require('./services/matching');
 
 // ============================================================================
 // CONFIGURATION LOADER
 // ============================================================================
+const CONFIG_FILE = path.join(__dirname, 'config.json');
+const CONFIG_FORMAT = 1;  // Newest config.json layout this server understands (meta.format)
+
+// JSON with sorted keys and no whitespace, as config_hash in config_core.py writes it
+const canonicalJson = (value) => {
+  if (Array.isArray(value)) {
+    return '[' + value.map(canonicalJson).join(',') + ']';
+  }
+  if (value !== null && typeof value === 'object') {
+    return '{' + Object.keys(value).sort()
+      .map(key => JSON.stringify(key) + ':' + canonicalJson(value[key])).join(',') + '}';
+  }
+  return JSON.stringify(value);
+};
+
+// SHA-256 of a config's content, ignoring its "meta" section (same digest as config_core.py)
+const configHash = (configData) => {
+  const { meta, ...content } = configData;
+  return crypto.createHash('sha256').update(canonicalJson(content), 'utf8').digest('hex');
+};
+
 let config;
 try {
-  const configData = fs.readFileSync(path.join(__dirname, 'config.json'), 'utf8');
+  const configData = fs.readFileSync(CONFIG_FILE, 'utf8');
   config = JSON.parse(configData);
   console.log('✅ Configuration loaded from config.json');
 } catch (error) {
@@ -22,20 +47,646 @@ try {
   process.exit(1);
 }
 
-// Extract configuration constants
-const EXCEL_FILE = config.excel.filePath;
-const INVENTORY_SHEET = config.excel.sheets.inventory;
-const OTHER_SHEET = config.excel.sheets.other;
-const ASSET_ID_COLS = config.excel.columns.assetIdSearch.filter(x => x !== null && x !== undefined);
-const ASSET_NAME_COL = config.excel.columns.assetName;
-const ASSET_DESC_COL = config.excel.columns.assetDescription;
-const STATUS_COL = config.excel.columns.status;
-const LOCATION_COL = config.excel.columns.location;
-const ROOM_COL = config.excel.columns.room;
-const MARKED_CHECK_COL = config.excel.columns.markedCheck;
-const COUNT_START_ROW = config.excel.counting.startRow;
-const COUNT_END_ROW = config.excel.counting.endRow;
-const TOTAL_COUNT = config.excel.counting.totalCount;
+// ============================================================================
+// PROFILES (profiles.json, managed by config_window.py / profiles.py)
+// ============================================================================
+const INDEX_FILE = path.join(__dirname, 'config.index.json');
+const PROGRESS_FILE = path.join(__dirname, 'config.progress.json');
+const JOURNAL_FILE = path.join(__dirname, 'scans.journal.jsonl');
+const PROFILES_FILE = path.join(__dirname, 'profiles.json');
+
+// Same rule as profile_slug in profiles.py
+const profileSlug = (name) =>
+  name.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '') || 'profile';
+
+// Configuration constants, asset index, progress and scan journal for one workbook
+const createProfile = (profileConfig, indexFile, progressFile, journalFile, label) => {
+  const excel = profileConfig.excel;
+  const profile = {
+    label,
+    columns: excel.columns,
+    EXCEL_FILE: excel.filePath,
+    INVENTORY_SHEET: excel.sheets.inventory,
+    OTHER_SHEET: excel.sheets.other,
+    ASSET_ID_COLS: excel.columns.assetIdSearch.filter(x => x !== null && x !== undefined),
+    ASSET_NAME_COL: excel.columns.assetName,
+    ASSET_DESC_COL: excel.columns.assetDescription,
+    STATUS_COL: excel.columns.status,
+    LOCATION_COL: excel.columns.location,
+    ROOM_COL: excel.columns.room,
+    MARKED_CHECK_COL: excel.columns.markedCheck,
+    MATCHING: matchingRules(excel.matching),
+    COUNT_START_ROW: excel.counting.startRow,
+    COUNT_END_ROW: excel.counting.endRow,
+    TOTAL_COUNT: excel.counting.totalCount,
+    assetIndex: null,
+    packFile: lookupPackFile(indexFile),
+    lookupPack: null,
+    marks: [],
+    marksEpoch: Date.now().toString(36),
+    progressFile,
+    progress: null,
+    journal: null,
+  };
+  loadAssetIndex(profile, indexFile);
+  profile.journal = openJournal(journalFile, label);
+  return profile;
+};
+
+// ============================================================================
+// PROGRESS (config.progress*.json, same format as progress_counter.py)
+// ============================================================================
+// The marked count of the counting range is counted once and then updated
+// by one per newly marked row, instead of re-counting the range per scan.
+// A row is marked when its marked-check or its status cell has a value
+// (the same rule as is_marked in asset_index.py, used for every lookup too).
+const isSet = (value) => value !== undefined && value !== null && String(value).trim() !== '';
+
+const progressCounting = (profile) => ({
+  startRow: profile.COUNT_START_ROW,
+  endRow: profile.COUNT_END_ROW,
+  totalCount: profile.TOTAL_COUNT,
+  markedCheck: profile.MARKED_CHECK_COL,
+  status: profile.STATUS_COL,
+});
+
+const loadProgress = (profile) => {
+  try {
+    const progress = JSON.parse(fs.readFileSync(profile.progressFile, 'utf8'));
+    const source = progress.source || {};
+    const counting = progress.counting || {};
+    const expected = progressCounting(profile);
+    if (progress.version === 1 &&
+        source.filePath === profile.EXCEL_FILE &&
+        source.sheet === profile.INVENTORY_SHEET &&
+        Object.keys(expected).every(key => counting[key] === expected[key])) {
+      return progress;
+    }
+  } catch (error) {
+    // Missing or unreadable: counted from the sheet on the next scan
+  }
+  return null;
+};
+
+// Store the count with the workbook's size and mtime (call after writing the workbook)
+const writeProgress = (profile, markedCount) => {
+  const progress = {
+    version: 1,
+    source: { ...excelFileSignature(profile.EXCEL_FILE), filePath: profile.EXCEL_FILE, sheet: profile.INVENTORY_SHEET },
+    counting: progressCounting(profile),
+    markedCount,
+    updated: new Date().toISOString(),
+  };
+  const tmpFile = profile.progressFile + '.tmp';
+  fs.writeFileSync(tmpFile, JSON.stringify(progress));
+  fs.renameSync(tmpFile, profile.progressFile);
+  profile.progress = progress;
+};
+
+// Marked count of the workbook on disk: the stored count while it matches the
+// file, otherwise counted once from the sheet rows (call before writing)
+const currentMarkedCount = (profile, getSheetData) => {
+  if (!profile.progress) {
+    profile.progress = loadProgress(profile);
+  }
+  const progress = profile.progress;
+  if (progress) {
+    const current = excelFileSignature(profile.EXCEL_FILE);
+    if (current.size === progress.source.size && current.mtimeMs === progress.source.mtimeMs) {
+      return progress.markedCount;
+    }
+  }
+  const rows = getSheetData();
+  let markedCount = 0;
+  for (let j = profile.COUNT_START_ROW - 1; j <= profile.COUNT_END_ROW - 1; j++) {
+    const row = rows[j];
+    if (row && (isSet(row[profile.MARKED_CHECK_COL]) || isSet(row[profile.STATUS_COL]))) {
+      markedCount++;
+    }
+  }
+  return markedCount;
+};
+
+// ============================================================================
+// SCAN JOURNAL (scans.journal*.jsonl, same format as scan_journal.py)
+// ============================================================================
+// Every scan is appended and fsync'd before the workbook is rewritten, so a
+// failed write (Excel holding the file open) or a crash does not lose it.
+// Pending scans are replayed by scan_service.py or the Journal view of
+// config_window.py.
+const openJournal = (journalFile, label) => {
+  const journal = { fd: null, lastSeq: 0, appliedThrough: 0, pending: new Set() };
+  try {
+    let text = fs.existsSync(journalFile) ? fs.readFileSync(journalFile, 'utf8') : '';
+    if (text && !text.endsWith('\n')) {
+      // Cut a torn last line from a crash mid-append
+      text = text.slice(0, text.lastIndexOf('\n') + 1);
+      fs.truncateSync(journalFile, Buffer.byteLength(text));
+    }
+    const scanSeqs = [];
+    for (const line of text.split('\n')) {
+      let entry;
+      try {
+        entry = JSON.parse(line);
+      } catch (error) {
+        continue;
+      }
+      if (entry.type === 'scan') {
+        scanSeqs.push(entry.seq);
+        journal.lastSeq = Math.max(journal.lastSeq, entry.seq);
+      } else if (entry.type === 'applied') {
+        journal.appliedThrough = Math.max(journal.appliedThrough, entry.through || 0);
+      }
+    }
+    journal.lastSeq = Math.max(journal.lastSeq, journal.appliedThrough);
+    for (const seq of scanSeqs) {
+      if (seq > journal.appliedThrough) {
+        journal.pending.add(seq);
+      }
+    }
+    if (journal.pending.size) {
+      console.warn(`⚠️ ${journal.pending.size} journaled scans for ${label} are not in the workbook yet. ` +
+                   'Replay them from the Journal view in config_window.py');
+    }
+    journal.fd = fs.openSync(journalFile, 'a');
+  } catch (error) {
+    console.warn(`⚠️ Scan journal for ${label} not available: ${error.message}`);
+  }
+  return journal;
+};
+
+const appendJournal = (journal, entry) => {
+  fs.writeSync(journal.fd, JSON.stringify(entry) + '\n');
+  fs.fsyncSync(journal.fd);
+};
+
+// Durably record a scan before touching the workbook; returns its seq, or null without a journal
+const journalScan = (profile, { barcode, status, location, room, device }) => {
+  const journal = profile.journal;
+  if (journal.fd === null) {
+    return null;
+  }
+  journal.lastSeq += 1;
+  const seq = journal.lastSeq;
+  appendJournal(journal, {
+    type: 'scan', seq, barcode: String(barcode), status: status || null, location: location || null,
+    room: room || null, timestamp: new Date().toISOString(), device: device || null
+  });
+  journal.pending.add(seq);
+  return seq;
+};
+
+// Record that a scan is in the workbook (or needed no write). The applied
+// marker only moves past scans that are all done, so a scan whose write
+// failed stays pending even when later writes succeed.
+const markJournalApplied = (profile, seq) => {
+  const journal = profile.journal;
+  if (journal.fd === null || seq === null) {
+    return;
+  }
+  journal.pending.delete(seq);
+  const through = journal.pending.size ? Math.min(...journal.pending) - 1 : journal.lastSeq;
+  if (through > journal.appliedThrough) {
+    journal.appliedThrough = through;
+    appendJournal(journal, { type: 'applied', through, timestamp: new Date().toISOString() });
+  }
+};
+
+// ============================================================================
+// ASSET INDEX (config.index*.json, built by config_window.py / asset_index.py)
+// ============================================================================
+const INDEX_VERSION = 2;  // Same as INDEX_VERSION in asset_index.py
+
+const loadAssetIndex = (profile, indexFile) => {
+  const indexName = path.basename(indexFile);
+  try {
+    const indexData = JSON.parse(fs.readFileSync(indexFile, 'utf8'));
+    const source = indexData.source || {};
+    if (indexData.version === INDEX_VERSION &&
+        source.filePath === profile.EXCEL_FILE &&
+        source.sheet === profile.INVENTORY_SHEET &&
+        JSON.stringify(indexData.columns) === JSON.stringify(profile.columns) &&
+        JSON.stringify(indexData.matching || DEFAULT_MATCHING) === JSON.stringify(profile.MATCHING)) {
+      profile.assetIndex = indexData;
+      console.log(`✅ Asset index loaded for ${profile.label} (${Object.keys(indexData.entries).length} IDs)`);
+    } else {
+      console.warn(`⚠️ ${indexName} does not match ${profile.label}, falling back to sheet scans`);
+    }
+  } catch (error) {
+    console.warn(`⚠️ ${indexName} not available, falling back to sheet scans`);
+  }
+};
+
+// Size and mtime of an Excel file, in the format written by asset_index.py
+const excelFileSignature = (excelFile) => {
+  const stat = fs.statSync(excelFile, { bigint: true });
+  return { size: Number(stat.size), mtimeMs: Number(stat.mtimeNs / 1000000n) };
+};
+
+// Index entry of a scanned ID: exact match first, then its match key
+// (loadAssetIndex made sure the index was built with the profile's rules)
+const assetIndexEntry = (profile, assetId) => {
+  const assetIndex = profile.assetIndex;
+  const entry = assetIndex.entries[String(assetId).trim()];
+  if (entry || !assetIndex.variants) {
+    return entry;
+  }
+  const exact = assetIndex.variants[matchKey(assetId, profile.MATCHING)];
+  return exact !== undefined ? assetIndex.entries[exact] : undefined;
+};
+
+// Look up an asset ID in a profile's index.
+// Returns { row, name, description, marked } (row is 1-based), null when the
+// ID is not in the inventory, or undefined when the index is missing or stale.
+const lookupAssetIndex = (profile, assetId) => {
+  const assetIndex = profile.assetIndex;
+  if (!assetIndex) {
+    return undefined;
+  }
+  const current = excelFileSignature(profile.EXCEL_FILE);
+  if (current.size !== assetIndex.source.size || current.mtimeMs !== assetIndex.source.mtimeMs) {
+    console.warn(`⚠️ Excel file changed since the asset index for ${profile.label} was built. Run: python asset_index.py`);
+    profile.assetIndex = null;
+    return undefined;
+  }
+  const entry = assetIndexEntry(profile, assetId);
+  if (!entry) {
+    return null;
+  }
+  return { row: entry[0], name: entry[1], description: entry[2], marked: entry[3] };
+};
+
+// Keep the index valid after this server rewrote the Excel file itself
+const markAssetIndexWritten = (profile, assetId) => {
+  const assetIndex = profile.assetIndex;
+  if (!assetIndex) {
+    return;
+  }
+  const entry = assetIndexEntry(profile, assetId);
+  if (entry) {
+    entry[3] = true;
+  }
+  Object.assign(assetIndex.source, excelFileSignature(profile.EXCEL_FILE));
+};
+
+// ============================================================================
+// WORKBOOK LOCKING (same protocol as workbook_lock.py)
+// ============================================================================
+// Writers hold <workbook>.lock, created exclusively with the owner as JSON,
+// while they read, change and replace the workbook, and replace it
+// atomically (temp file + rename). A lock on this host is stale once its
+// process is gone; one from another host once it is older than
+// LOCK_STALE_MS. A stale lock is renamed aside and put back if it turns out
+// to be newer than the one judged stale, and a writer only deletes the lock
+// it created. Readers take no lock; a failed read is retried. Every wait
+// doubles up to LOCK_BACKOFF_MAX_MS until LOCK_TIMEOUT_MS, without blocking
+// other requests.
+const LOCK_STALE_MS = 30000;
+const LOCK_TIMEOUT_MS = 10000;
+const LOCK_BACKOFF_FIRST_MS = 20;
+const LOCK_BACKOFF_MAX_MS = 500;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Call attempt() until it returns something other than undefined, backing off in between
+const withBackoff = async (attempt, describe) => {
+  const deadline = Date.now() + LOCK_TIMEOUT_MS;
+  let delay = LOCK_BACKOFF_FIRST_MS;
+  for (;;) {
+    const result = attempt();
+    if (result !== undefined) {
+      return result;
+    }
+    const remaining = deadline - Date.now();
+    if (remaining <= 0) {
+      throw new Error(describe());
+    }
+    await sleep(Math.min(delay, remaining));
+    delay = Math.min(delay * 2, LOCK_BACKOFF_MAX_MS);
+  }
+};
+
+const pidAlive = (pid) => {
+  try {
+    process.kill(pid, 0);
+    return true;
+  } catch (error) {
+    return error.code === 'EPERM';
+  }
+};
+
+const lockIdentity = (stat) => `${stat.ino}:${stat.mtimeNs}`;
+
+// A lock is held while its pid runs (same host) or, when the pid cannot be checked, for LOCK_STALE_MS
+const lockAlive = (owner, stat) => {
+  if (owner && owner.host === os.hostname() && owner.pid) {
+    return pidAlive(owner.pid);
+  }
+  return Date.now() - Number(stat.mtimeMs) <= LOCK_STALE_MS;
+};
+
+// { identity, owner, live } of a lock file, or null when there is none
+const inspectLock = (lockFile) => {
+  let stat;
+  try {
+    stat = fs.statSync(lockFile, { bigint: true });
+  } catch (error) {
+    if (error.code === 'ENOENT') {
+      return null;
+    }
+    throw error;
+  }
+  let owner = null;
+  try {
+    owner = JSON.parse(fs.readFileSync(lockFile, 'utf8'));
+  } catch (error) {
+    // Still being written, or gone again
+  }
+  return { identity: lockIdentity(stat), owner, live: lockAlive(owner, stat) };
+};
+
+// Remove a stale lock, unless another writer replaced it after it was judged stale
+const breakLock = (lockFile, identity) => {
+  const aside = `${lockFile}.stale.${process.pid}.${crypto.randomBytes(4).toString('hex')}`;
+  try {
+    fs.renameSync(lockFile, aside);
+  } catch (error) {
+    return;  // Already broken by another writer
+  }
+  try {
+    if (lockIdentity(fs.statSync(aside, { bigint: true })) !== identity) {
+      try {
+        fs.linkSync(aside, lockFile);  // A new lock; put it back
+      } catch (error) {
+        // Another writer has created a lock since
+      }
+    }
+  } finally {
+    fs.rmSync(aside, { force: true });
+  }
+};
+
+// Take the workbook's write lock; resolves to the handle for releaseWorkbookLock
+const acquireWorkbookLock = (excelFile) => {
+  const lockFile = path.resolve(excelFile) + '.lock';
+  let holder = null;
+  return withBackoff(() => {
+    try {
+      const fd = fs.openSync(lockFile, 'wx');
+      try {
+        fs.writeSync(fd, JSON.stringify({ pid: process.pid, host: os.hostname(), since: Date.now(), owner: 'server.js' }));
+        return { file: lockFile, ino: fs.fstatSync(fd, { bigint: true }).ino };
+      } finally {
+        fs.closeSync(fd);
+      }
+    } catch (error) {
+      if (error.code !== 'EEXIST') {
+        throw error;
+      }
+    }
+    const found = inspectLock(lockFile);
+    if (found) {
+      holder = found.owner;
+      if (!found.live) {
+        breakLock(lockFile, found.identity);  // Abandoned by a crashed writer
+      }
+    }
+    return undefined;
+  }, () => `${path.basename(excelFile)} is locked by ${(holder && holder.owner) || 'another writer'}`);
+};
+
+// Delete the lock file, if it is still the one this handle created
+const releaseWorkbookLock = (lock) => {
+  if (!lock) {
+    return;
+  }
+  try {
+    if (fs.statSync(lock.file, { bigint: true }).ino === lock.ino) {
+      fs.unlinkSync(lock.file);
+    }
+  } catch (error) {
+    // Broken as stale while held
+  }
+};
+
+// XLSX.readFile, retried while the file is being replaced or is open elsewhere
+const readWorkbook = (excelFile) => {
+  let lastError = null;
+  return withBackoff(() => {
+    try {
+      return XLSX.readFile(excelFile);
+    } catch (error) {
+      lastError = error;
+      return undefined;
+    }
+  }, () => `Could not read ${path.basename(excelFile)}: ${lastError.message}`);
+};
+
+// Write the workbook to a temp file and rename it over the original, so
+// readers never see a half-written file (call while holding the lock)
+const writeWorkbook = (workbook, excelFile) => {
+  const tmpFile = excelFile + '.tmp';
+  XLSX.writeFile(workbook, tmpFile, { bookType: path.extname(excelFile).slice(1).toLowerCase() || 'xlsx' });
+  let lastError = null;
+  return withBackoff(() => {
+    try {
+      fs.renameSync(tmpFile, excelFile);
+      return true;
+    } catch (error) {
+      if (!['EBUSY', 'EPERM', 'EACCES'].includes(error.code)) {
+        throw error;
+      }
+      lastError = error;  // Open in Excel or a virus scanner (Windows)
+      return undefined;
+    }
+  }, () => `Could not replace ${path.basename(excelFile)}: ${lastError.message}`);
+};
+
+// ============================================================================
+// DEVICE LOOKUP PACK (config.lookup*.json.gz, written by lookup_pack.py)
+// ============================================================================
+// Devices download the pack once and answer lookups from it; after that they
+// only ask for the IDs marked since (profile.marks, read from an offset). The
+// list starts over with a new epoch whenever the server starts or the pack
+// changes, and devices that send an old epoch get the whole list again.
+// Same rule as pack_path_for_index in lookup_pack.py
+const lookupPackFile = (indexFile) => {
+  const name = path.basename(indexFile).replace(/^config\.index(.*)\.json$/, 'config.lookup$1.json.gz');
+  return path.join(path.dirname(indexFile), name);
+};
+
+// The gzip'd pack of a profile, re-read when the file changes, or null when there is none
+const loadLookupPack = (profile) => {
+  let stat;
+  try {
+    stat = fs.statSync(profile.packFile);
+  } catch (error) {
+    profile.lookupPack = null;
+    return null;
+  }
+  const cached = profile.lookupPack;
+  if (cached && cached.mtimeMs === stat.mtimeMs) {
+    return cached;
+  }
+  const gz = fs.readFileSync(profile.packFile);
+  const pack = JSON.parse(zlib.gunzipSync(gz).toString('utf8'));
+  profile.lookupPack = {
+    mtimeMs: stat.mtimeMs, gz, packId: pack.packId, revision: pack.revision,
+    source: pack.source ? { size: pack.source.size, mtimeMs: pack.source.mtimeMs } : null,
+  };
+  if (!cached || cached.packId !== pack.packId || cached.revision !== pack.revision) {
+    // Rows the index knows are marked but the pack does not (marked after it was built)
+    const entries = profile.assetIndex ? profile.assetIndex.entries : {};
+    const marks = pack.ids.filter((id, i) => !pack.marked[i] && entries[id] && entries[id][3]);
+    // Marks made before the first pack was seen are still news to devices
+    profile.marks = cached ? marks : [...new Set([...profile.marks, ...marks])];
+    profile.marksEpoch = Date.now().toString(36);
+  }
+  return profile.lookupPack;
+};
+
+// Whether a pack still describes the workbook on disk. A pack is not served
+// once someone else changed the workbook, until lookup_pack.py (or a save in
+// the configuration window) rebuilds it; devices then ask the server instead.
+const lookupPackCurrent = (profile, pack) => {
+  if (!pack.source) {
+    return false;
+  }
+  const current = excelFileSignature(profile.EXCEL_FILE);
+  return current.size === pack.source.size && current.mtimeMs === pack.source.mtimeMs;
+};
+
+// Keep a current pack current after this server rewrote the workbook; the
+// marks list carries the change to devices. before is the workbook's
+// signature when it was read.
+const markLookupPackWritten = (profile, before) => {
+  const pack = profile.lookupPack;
+  if (pack && pack.source && pack.source.size === before.size && pack.source.mtimeMs === before.mtimeMs) {
+    Object.assign(pack.source, excelFileSignature(profile.EXCEL_FILE));
+  }
+};
+
+let defaultProfile = createProfile(config, INDEX_FILE, PROGRESS_FILE, JOURNAL_FILE, 'config.json');
+
+// ============================================================================
+// CONFIG HOT-RELOAD (config.json is replaced atomically by config_core.save_config)
+// ============================================================================
+// The directory is watched rather than the file, because an atomic replace
+// swaps the file out from under a file watch. Requests are handled
+// synchronously, so the profile is swapped between requests and no scan
+// sees half of each configuration. The asset index is rebuilt after a save,
+// so a new config.index.json is picked up the same way.
+let appliedConfigHash = configHash(config);
+const reloadTimers = new Map();
+
+const reloadConfig = () => {
+  let newConfig;
+  try {
+    newConfig = JSON.parse(fs.readFileSync(CONFIG_FILE, 'utf8'));
+  } catch (error) {
+    console.warn(`⚠️ Ignoring unreadable config.json, keeping the current settings: ${error.message}`);
+    return;
+  }
+  const meta = newConfig.meta || {};
+  if (meta.format > CONFIG_FORMAT) {
+    console.warn(`⚠️ config.json format ${meta.format} is newer than this server understands; not applied`);
+    return;
+  }
+  const digest = configHash(newConfig);
+  if (digest === appliedConfigHash) {
+    return;
+  }
+  if (meta.contentHash && meta.contentHash !== digest) {
+    console.warn('⚠️ config.json was edited by hand since it was last saved; applying it anyway');
+  }
+  if (canonicalJson(newConfig.excel) !== canonicalJson(config.excel)) {
+    // Only the workbook settings live in the profile; keep its warm index otherwise
+    let profile;
+    try {
+      profile = createProfile(newConfig, INDEX_FILE, PROGRESS_FILE, JOURNAL_FILE, 'config.json');
+    } catch (error) {
+      console.warn(`⚠️ config.json not applied, keeping the current settings: ${error.message}`);
+      return;
+    }
+    if (defaultProfile.journal.fd !== null) {
+      fs.closeSync(defaultProfile.journal.fd);
+    }
+    defaultProfile = profile;
+  }
+  config = newConfig;
+  appliedConfigHash = digest;
+  console.log(`🔄 config.json revision ${meta.revision || 0} applied without a restart`);
+};
+
+const reloadAssetIndex = () => {
+  loadAssetIndex(defaultProfile, INDEX_FILE);
+};
+
+const watchedFiles = new Map([
+  [path.basename(CONFIG_FILE), reloadConfig],
+  [path.basename(INDEX_FILE), reloadAssetIndex],
+]);
+
+fs.watch(__dirname, (eventType, filename) => {
+  const reload = watchedFiles.get(filename);
+  if (reload) {
+    // Editors and atomic replaces fire several events per save
+    clearTimeout(reloadTimers.get(filename));
+    reloadTimers.set(filename, setTimeout(reload, 200));
+  }
+});
+
+// Named profiles are loaded on first use and reloaded when profiles.json changes
+let profileStore = { mtimeMs: null, profiles: {} };
+const profileCache = new Map();
+
+const clearProfileCache = () => {
+  for (const profile of profileCache.values()) {
+    if (profile.journal.fd !== null) {
+      fs.closeSync(profile.journal.fd);
+    }
+  }
+  profileCache.clear();
+};
+
+const loadProfileStore = () => {
+  let stat;
+  try {
+    stat = fs.statSync(PROFILES_FILE);
+  } catch (error) {
+    profileStore = { mtimeMs: null, profiles: {} };
+    clearProfileCache();
+    return profileStore.profiles;
+  }
+  if (stat.mtimeMs !== profileStore.mtimeMs) {
+    const data = JSON.parse(fs.readFileSync(PROFILES_FILE, 'utf8'));
+    profileStore = { mtimeMs: stat.mtimeMs, profiles: data.profiles || {} };
+    clearProfileCache();
+  }
+  return profileStore.profiles;
+};
+
+// Profile for a request: ?profile=<name> or an X-Profile header, config.json otherwise.
+// Sends a 404 and returns null for unknown profiles.
+const requestProfile = (req, res) => {
+  const name = req.query.profile || req.get('X-Profile');
+  if (!name) {
+    return defaultProfile;
+  }
+  const profiles = loadProfileStore();
+  if (!profiles[name]) {
+    res.status(404).json({ success: false, error: `Profile not found: ${name}` });
+    return null;
+  }
+  if (!profileCache.has(name)) {
+    const slug = profileSlug(name);
+    const indexFile = path.join(__dirname, `config.index.${slug}.json`);
+    const progressFile = path.join(__dirname, `config.progress.${slug}.json`);
+    const journalFile = path.join(__dirname, `scans.journal.${slug}.jsonl`);
+    profileCache.set(name, createProfile(profiles[name], indexFile, progressFile, journalFile, `profile '${name}'`));
+  }
+  return profileCache.get(name);
+};
 
 // ============================================================================
 // EXPRESS SERVER SETUP
@@ -48,20 +699,33 @@ app.use(express.json());
 // CORS middleware
 app.use((req, res, next) => {
   res.header('Access-Control-Allow-Origin', '*');
-  res.header('Access-Control-Allow-Headers', 'Origin, X-Requested-With, Content-Type, Accept');
+  res.header('Access-Control-Allow-Headers', 'Origin, X-Requested-With, Content-Type, Accept, X-Profile, If-None-Match');
   res.header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS');
   next();
 });
 
 // Process barcode and update Excel file
-app.post('/api/barcode', (req, res) => {
+app.post('/api/barcode', async (req, res) => {
+  let seq = null;
+  let lock = null;
   try {
+    const profile = requestProfile(req, res);
+    if (!profile) {
+      return;
+    }
+    const {
+      EXCEL_FILE, INVENTORY_SHEET, OTHER_SHEET, ASSET_ID_COLS, ASSET_NAME_COL, STATUS_COL,
+      LOCATION_COL, ROOM_COL, MARKED_CHECK_COL, COUNT_START_ROW, COUNT_END_ROW, TOTAL_COUNT, MATCHING
+    } = profile;
     const { data, status, location, room } = req.body;
     
     if (!data) {
       return res.status(400).json({ success: false, error: 'Barcode data is required' });
     }
 
+    // Journal the scan first so it survives a failed workbook write
+    seq = journalScan(profile, { barcode: data, status, location, room, device: req.body.device || req.ip });
+
     if (!fs.existsSync(EXCEL_FILE)) {
       return res.status(500).json({ 
         success: false, 
@@ -69,7 +733,10 @@ app.post('/api/barcode', (req, res) => {
       });
     }
 
-    const workbook = XLSX.readFile(EXCEL_FILE);
+    // Held until the response is sent, so scan_service.py cannot save in between
+    lock = await acquireWorkbookLock(EXCEL_FILE);
+    const signatureBeforeWrite = excelFileSignature(EXCEL_FILE);
+    const workbook = await readWorkbook(EXCEL_FILE);
     const sheet1Name = INVENTORY_SHEET;
     const otherSheetName = OTHER_SHEET;
     
@@ -81,21 +748,50 @@ app.post('/api/barcode', (req, res) => {
     }
 
     const sheet1 = workbook.Sheets[sheet1Name];
-    const sheet1Data = XLSX.utils.sheet_to_json(sheet1, { header: 1, defval: '' });
+    
+    // Rows to search: the indexed row when the asset index is fresh,
+    // otherwise every row of the sheet
+    const indexed = lookupAssetIndex(profile, data);
+    let sheet1Data;
+    let candidateRows;
+    if (indexed === undefined) {
+      sheet1Data = XLSX.utils.sheet_to_json(sheet1, { header: 1, defval: '' });
+      candidateRows = sheet1Data.map((row, i) => i);
+    } else {
+      candidateRows = indexed ? [indexed.row - 1] : [];
+    }
+    const getSheet1Data = () => {
+      if (!sheet1Data) {
+        sheet1Data = XLSX.utils.sheet_to_json(sheet1, { header: 1, defval: '' });
+      }
+      return sheet1Data;
+    };
+    const readRow = (i) => {
+      if (sheet1Data) {
+        return sheet1Data[i] || [];
+      }
+      const row = [];
+      for (const colIdx of [...ASSET_ID_COLS, ASSET_NAME_COL, STATUS_COL]) {
+        const cell = sheet1[XLSX.utils.encode_cell({ r: i, c: colIdx })];
+        row[colIdx] = cell ? cell.v : '';
+      }
+      return row;
+    };
     
     let found = false;
 
     // Search for ASSET ID in configured columns
-    for (let i = 0; i < sheet1Data.length; i++) {
-      const row = sheet1Data[i];
+    for (const i of candidateRows) {
+      const row = readRow(i);
       
       // Check all configured Asset ID columns
       let assetFound = false;
+      let matchedId = null;
       for (const colIdx of ASSET_ID_COLS) {
         const cellValue = row[colIdx];
-        const match = cellValue !== undefined && cellValue !== null && String(cellValue).trim() === String(data).trim();
-        if (match) {
+        if (cellMatches(cellValue, data, MATCHING)) {
           assetFound = true;
+          matchedId = String(cellValue).trim();
           break;
         }
       }
@@ -109,6 +805,14 @@ app.post('/api/barcode', (req, res) => {
         const statusValue = row[STATUS_COL];
         
         if (!statusValue || String(statusValue).trim() === '') {
+          // Count marked items in configured column and row range before the
+          // row is written (its status is empty, so only its marked-check cell
+          // can have counted it), then add this row unless it was counted
+          const markedCell = sheet1[XLSX.utils.encode_cell({ r: i, c: MARKED_CHECK_COL })];
+          const alreadyCounted = markedCell && String(markedCell.v).trim() !== '';
+          const inRange = i >= COUNT_START_ROW - 1 && i <= COUNT_END_ROW - 1;
+          const markedCount = currentMarkedCount(profile, getSheet1Data) + (inRange && !alreadyCounted ? 1 : 0);
+
           // Mark status in configured column
           const cellAddressS = XLSX.utils.encode_cell({ r: i, c: STATUS_COL });
           sheet1[cellAddressS] = { t: 's', v: status || 'F' };
@@ -127,17 +831,12 @@ app.post('/api/barcode', (req, res) => {
           
           found = true;
           
-          // Count marked items in configured column and row range
-          // Count AFTER marking to include current item
-          let markedCount = 0;
-          for (let j = COUNT_START_ROW - 1; j <= COUNT_END_ROW - 1; j++) {
-            const markedValue = sheet1Data[j] ? sheet1Data[j][MARKED_CHECK_COL] : null;
-            if (markedValue && String(markedValue).trim() !== '') {
-              markedCount++;
-            }
-          }
-          
-          XLSX.writeFile(workbook, EXCEL_FILE);
+          await writeWorkbook(workbook, EXCEL_FILE);
+          markLookupPackWritten(profile, signatureBeforeWrite);
+          markAssetIndexWritten(profile, data);
+          profile.marks.push(matchedId);
+          writeProgress(profile, markedCount);
+          markJournalApplied(profile, seq);
           
           return res.json({ 
             success: true, 
@@ -151,6 +850,7 @@ app.post('/api/barcode', (req, res) => {
         } else {
           // Already marked
           found = true;
+          markJournalApplied(profile, seq);
           return res.json({ 
             success: true, 
             found: true,
@@ -182,6 +882,7 @@ app.post('/api/barcode', (req, res) => {
       });
       
       if (existsInOther) {
+        markJournalApplied(profile, seq);
         return res.json({ 
           success: true, 
           found: false,
@@ -217,7 +918,12 @@ app.post('/api/barcode', (req, res) => {
       }
       otherSheet['!ref'] = XLSX.utils.encode_range(range);
       
-      XLSX.writeFile(workbook, EXCEL_FILE);
+      const markedCount = currentMarkedCount(profile, getSheet1Data);
+      await writeWorkbook(workbook, EXCEL_FILE);
+      markLookupPackWritten(profile, signatureBeforeWrite);
+      markAssetIndexWritten(profile, data);
+      writeProgress(profile, markedCount);
+      markJournalApplied(profile, seq);
       
       res.json({ 
         success: true, 
@@ -229,18 +935,26 @@ app.post('/api/barcode', (req, res) => {
     }
     
   } catch (error) {
-    res.status(500).json({ success: false, error: error.message });
+    const journaled = seq !== null ? ' (scan saved in the journal for replay)' : '';
+    res.status(500).json({ success: false, error: error.message + journaled, journaled: seq !== null });
+  } finally {
+    releaseWorkbookLock(lock);
   }
 });
 
 // Get all scanned barcodes from the "Other" sheet
-app.get('/api/barcodes', (req, res) => {
+app.get('/api/barcodes', async (req, res) => {
   try {
+    const profile = requestProfile(req, res);
+    if (!profile) {
+      return;
+    }
+    const { EXCEL_FILE, OTHER_SHEET } = profile;
     if (!fs.existsSync(EXCEL_FILE)) {
       return res.json([]);
     }
 
-    const workbook = XLSX.readFile(EXCEL_FILE);
+    const workbook = await readWorkbook(EXCEL_FILE);
     const otherSheetName = OTHER_SHEET;
     
     if (!workbook.Sheets[otherSheetName]) {
@@ -261,10 +975,70 @@ app.get('/api/barcodes', (req, res) => {
   }
 });
 
+// Device lookup pack, gzip'd as written (devices send the ETag they have back)
+app.get('/api/lookup-pack', (req, res) => {
+  try {
+    const profile = requestProfile(req, res);
+    if (!profile) {
+      return;
+    }
+    const pack = loadLookupPack(profile);
+    if (!pack) {
+      return res.status(404).json({ success: false, error: 'No lookup pack yet. Save the configuration or run: python lookup_pack.py' });
+    }
+    if (!lookupPackCurrent(profile, pack)) {
+      return res.status(404).json({ success: false, stale: true, error: 'The workbook changed since the lookup pack was built. Run: python lookup_pack.py' });
+    }
+    const etag = `"${pack.packId}-${pack.revision}"`;
+    res.set('ETag', etag);
+    if (req.get('If-None-Match') === etag) {
+      return res.status(304).end();
+    }
+    res.set('Content-Type', 'application/json');
+    res.set('Content-Encoding', 'gzip');
+    res.send(pack.gz);
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
+// IDs marked since the lookup pack was built: ?epoch=<epoch>&since=<next from the last call>
+app.get('/api/lookup-pack/marks', (req, res) => {
+  try {
+    const profile = requestProfile(req, res);
+    if (!profile) {
+      return;
+    }
+    const pack = loadLookupPack(profile);
+    if (!pack) {
+      return res.status(404).json({ success: false, error: 'No lookup pack yet' });
+    }
+    if (!lookupPackCurrent(profile, pack)) {
+      return res.status(404).json({ success: false, stale: true, error: 'The lookup pack is out of date' });
+    }
+    const since = req.query.epoch === profile.marksEpoch ? Math.max(parseInt(req.query.since, 10) || 0, 0) : 0;
+    res.json({
+      success: true,
+      packId: pack.packId,
+      revision: pack.revision,
+      epoch: profile.marksEpoch,
+      next: profile.marks.length,
+      marked: profile.marks.slice(since),
+    });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
 // Lookup barcode without modifying the file
-app.get('/api/barcode/lookup/:barcode', (req, res) => {
+app.get('/api/barcode/lookup/:barcode', async (req, res) => {
   console.log('\n📡 Lookup request received');
   try {
+    const profile = requestProfile(req, res);
+    if (!profile) {
+      return;
+    }
+    const { EXCEL_FILE, INVENTORY_SHEET, ASSET_ID_COLS, ASSET_DESC_COL, MARKED_CHECK_COL, STATUS_COL, MATCHING } = profile;
     const { barcode } = req.params;
     console.log('Barcode to lookup:', barcode);
     
@@ -281,7 +1055,30 @@ app.get('/api/barcode/lookup/:barcode', (req, res) => {
       });
     }
 
-    const workbook = XLSX.readFile(EXCEL_FILE);
+    // Answer from the asset index without reading the workbook when possible
+    const indexed = lookupAssetIndex(profile, barcode);
+    if (indexed) {
+      console.log('✅ Barcode found in asset index');
+      return res.json({ 
+        success: true, 
+        found: true,
+        assetDescription: indexed.description,
+        assetId: barcode,
+        isMarked: indexed.marked
+      });
+    }
+    if (indexed === null) {
+      console.log('⚠️ Barcode not found in asset index');
+      return res.json({ 
+        success: true, 
+        found: false,
+        assetDescription: null,
+        assetId: barcode,
+        isMarked: false
+      });
+    }
+
+    const workbook = await readWorkbook(EXCEL_FILE);
     const sheet1Name = INVENTORY_SHEET;
     
     if (!workbook.Sheets[sheet1Name]) {
@@ -303,21 +1100,19 @@ app.get('/api/barcode/lookup/:barcode', (req, res) => {
       let assetFound = false;
       for (const colIdx of ASSET_ID_COLS) {
         const cellValue = row[colIdx];
-        const match = cellValue !== undefined && cellValue !== null && String(cellValue).trim() === String(barcode).trim();
-        if (match) {
+        if (cellMatches(cellValue, barcode, MATCHING)) {
           assetFound = true;
           break;
         }
       }
       
       if (assetFound) {
-        // Get Column G value (Asset Description) - index 6
-        const columnG = row[6];
-        const assetDescription = columnG ? String(columnG).trim() : '';
+        // Get Asset Description value from configured column
+        const descValue = row[ASSET_DESC_COL];
+        const assetDescription = descValue ? String(descValue).trim() : '';
         
-        // Check if already marked (Column S - index 18)
-        const columnS = row[18];
-        const isMarked = columnS && String(columnS).trim() !== '';
+        // Marked by its marked-check or its status cell, as in the asset index
+        const isMarked = isSet(row[MARKED_CHECK_COL]) || isSet(row[STATUS_COL]);
         
         console.log('✅ Barcode found in inventory');
         console.log('Asset Description:', assetDescription);
@@ -350,15 +1145,40 @@ app.get('/api/barcode/lookup/:barcode', (req, res) => {
 
 // Health check endpoint
 app.get('/health', (req, res) => {
-  const fileExists = fs.existsSync(EXCEL_FILE);
+  const profile = requestProfile(req, res);
+  if (!profile) {
+    return;
+  }
+  const fileExists = fs.existsSync(profile.EXCEL_FILE);
   res.json({ 
     status: 'OK', 
     message: 'Barcode server is running',
+    profile: profile.label,
     excelFileAccessible: fileExists
   });
 });
 
+// Names of the configured profiles
+app.get('/api/profiles', (req, res) => {
+  try {
+    const profiles = loadProfileStore();
+    res.json({ profiles: Object.keys(profiles).sort() });
+  } catch (error) {
+    res.status(500).json({ success: false, error: error.message });
+  }
+});
+
 app.listen(PORT, () => {
+  const {
+    EXCEL_FILE, INVENTORY_SHEET, OTHER_SHEET, ASSET_ID_COLS, ASSET_NAME_COL, ASSET_DESC_COL, STATUS_COL,
+    LOCATION_COL, ROOM_COL, MARKED_CHECK_COL, COUNT_START_ROW, COUNT_END_ROW, TOTAL_COUNT
+  } = defaultProfile;
+  let profileNames = [];
+  try {
+    profileNames = Object.keys(loadProfileStore()).sort();
+  } catch (error) {
+    console.warn('⚠️ profiles.json is invalid:', error.message);
+  }
   console.log('\n' + '='.repeat(60));
   console.log('BARCODE SERVER STARTED');
   console.log('='.repeat(60));
@@ -377,5 +1197,7 @@ app.listen(PORT, () => {
   console.log(`  Room Col: ${ROOM_COL}`);
   console.log(`  Marked Check Col: ${MARKED_CHECK_COL}`);
   console.log(`  Count Range: Rows ${COUNT_START_ROW}-${COUNT_END_ROW} (${TOTAL_COUNT} items)`);
+  console.log(`  Asset Index: ${defaultProfile.assetIndex ? 'loaded' : 'not loaded (sheet scans)'}`);
+  console.log(`  Profiles: ${profileNames.length ? profileNames.join(', ') : 'none'} (select with ?profile=<name>)`);
   console.log('='.repeat(60) + '\n');
 });
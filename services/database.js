@@ -1,11 +1,153 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
 import config from '../config.json';
+import { matchingRules, matchKey } from './matching';
 
 // Server URL is now configured in config.json
 // Update it using config_window.py or by editing config.json directly
 const SERVER_URL = config.server.ngrokUrl;
 
+// ============================================================================
+// OFFLINE LOOKUP PACK (GET /api/lookup-pack, built by lookup_pack.py)
+// ============================================================================
+// Lookups are answered from a copy of the pack kept in AsyncStorage, so a
+// scan shows its asset right away and without a connection. IDs the pack
+// does not have are still asked of the server, since they may have been
+// added to the workbook after the pack was built. The pack is downloaded
+// again only when the server has a new one (ETag); otherwise only the IDs
+// marked since are fetched and kept in lookupMarks. A pack the server no
+// longer serves (the workbook changed since it was built) is dropped.
+const PACK_STORAGE_KEY = 'lookupPack';
+const MARKS_STORAGE_KEY = 'lookupPackMarks';
+const LOOKUP_SYNC_INTERVAL_MS = 30000;
+
+let lookupPack = null;  // Pack as served, plus etag and its matching rules
+let lookupMarks = { packId: null, epoch: null, next: 0, ids: new Set() };
+let lookupPackLoaded = null;
+
+const loadStoredPack = () => {
+  if (!lookupPackLoaded) {
+    lookupPackLoaded = (async () => {
+      try {
+        const [storedPack, storedMarks] = await Promise.all([
+          AsyncStorage.getItem(PACK_STORAGE_KEY),
+          AsyncStorage.getItem(MARKS_STORAGE_KEY),
+        ]);
+        if (storedPack) {
+          const pack = JSON.parse(storedPack);
+          lookupPack = { ...pack, rules: matchingRules(pack.matching) };
+        }
+        if (storedMarks) {
+          const marks = JSON.parse(storedMarks);
+          lookupMarks = { ...marks, ids: new Set(marks.ids) };
+        }
+      } catch (error) {
+        console.error('Could not read the stored lookup pack:', error.message);
+      }
+    })();
+  }
+  return lookupPackLoaded;
+};
+
+const storeMarks = () => AsyncStorage.setItem(MARKS_STORAGE_KEY, JSON.stringify({
+  ...lookupMarks,
+  ids: [...lookupMarks.ids],
+})).catch(error => console.error('Could not store lookup marks:', error.message));
+
+// Position of value in a sorted array (JavaScript string order), or -1
+const binarySearch = (sorted, value) => {
+  let low = 0;
+  let high = sorted.length - 1;
+  while (low <= high) {
+    const mid = (low + high) >> 1;
+    if (sorted[mid] === value) {
+      return mid;
+    }
+    if (sorted[mid] < value) {
+      low = mid + 1;
+    } else {
+      high = mid - 1;
+    }
+  }
+  return -1;
+};
+
+// Pack position of a scanned ID: exact match first, then its match key
+const packPosition = (pack, barcodeData) => {
+  const position = binarySearch(pack.ids, String(barcodeData).trim());
+  if (position !== -1 || pack.variantKeys.length === 0) {
+    return position;
+  }
+  const key = matchKey(barcodeData, pack.rules);
+  const variant = key === null ? -1 : binarySearch(pack.variantKeys, key);
+  return variant === -1 ? -1 : pack.variantTargets[variant];
+};
+
+// Fetch a new pack if the server has one, then the IDs marked since
+export const syncLookupPack = async () => {
+  await loadStoredPack();
+  try {
+    const headers = lookupPack ? { 'If-None-Match': lookupPack.etag } : {};
+    const response = await fetch(`${SERVER_URL}/lookup-pack`, { headers });
+    if (response.status === 404) {
+      if (lookupPack) {
+        lookupPack = null;
+        await AsyncStorage.removeItem(PACK_STORAGE_KEY);
+        console.log('Lookup pack dropped: the server has no current pack');
+      }
+      return false;
+    }
+    if (response.status === 200) {
+      const pack = await response.json();
+      const etag = response.headers.get('ETag');
+      lookupPack = { ...pack, etag, rules: matchingRules(pack.matching) };
+      await AsyncStorage.setItem(PACK_STORAGE_KEY, JSON.stringify({ ...pack, etag }));
+      console.log(`Lookup pack ${pack.packId} revision ${pack.revision}: ${pack.ids.length} IDs`);
+    } else if (response.status !== 304) {
+      return false;
+    }
+
+    const { packId, epoch, next, ids } = lookupMarks;
+    const current = packId === lookupPack.packId;
+    const query = current ? `?epoch=${encodeURIComponent(epoch)}&since=${next}` : '';
+    const marks = await (await fetch(`${SERVER_URL}/lookup-pack/marks${query}`)).json();
+    if (!marks.success || marks.packId !== lookupPack.packId) {
+      return false;
+    }
+    // A new pack or a restarted server sends its whole list again
+    const keep = current && marks.epoch === epoch ? ids : new Set();
+    lookupMarks = { packId: marks.packId, epoch: marks.epoch, next: marks.next, ids: keep };
+    marks.marked.forEach(id => lookupMarks.ids.add(id));
+    await storeMarks();
+    return true;
+  } catch (error) {
+    console.log('Lookup pack sync skipped:', error.message);
+    return false;
+  }
+};
+
+// Sync now and then every intervalMs; returns a function that stops it
+export const startLookupSync = (intervalMs = LOOKUP_SYNC_INTERVAL_MS) => {
+  syncLookupPack();
+  const timer = setInterval(syncLookupPack, intervalMs);
+  return () => clearInterval(timer);
+};
+
 // Lookup barcode to get asset information
 export const lookupBarcode = async (barcodeData) => {
+  await loadStoredPack();
+  const position = lookupPack ? packPosition(lookupPack, barcodeData) : -1;
+  if (position !== -1) {
+    const result = {
+      success: true,
+      found: true,
+      assetDescription: lookupPack.descriptions[position],
+      assetId: barcodeData,
+      isMarked: lookupPack.marked[position] === 1 || lookupMarks.ids.has(lookupPack.ids[position]),
+    };
+    console.log('Lookup result (offline pack):', result);
+    return result;
+  }
+
   try {
     console.log('Looking up barcode:', barcodeData);
     console.log('Server URL:', `${SERVER_URL}/barcode/lookup/${encodeURIComponent(barcodeData)}`);
@@ -29,6 +171,11 @@ export const lookupBarcode = async (barcodeData) => {
       return { success: false, error: result.error };
     }
   } catch (error) {
+    if (lookupPack) {
+      // Offline: the pack's answer is the best there is
+      console.log('Lookup result (offline pack, server unreachable): not found');
+      return { success: true, found: false, assetDescription: null, assetId: barcodeData, isMarked: false };
+    }
     console.error('Lookup error:', error);
     console.error('Error details:', error.message);
     return { success: false, error: error.message };
@@ -59,6 +206,14 @@ export const saveBarcode = async (barcodeData) => {
     console.log('Save result:', result);
     
     if (result.success) {
+      if (result.found && lookupPack) {
+        // Seen as marked before the next sync brings it in from the server
+        const position = packPosition(lookupPack, barcodeData.data);
+        if (position !== -1) {
+          lookupMarks.ids.add(lookupPack.ids[position]);
+          storeMarks();
+        }
+      }
       return { 
         success: true, 
         found: result.found,
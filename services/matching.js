@@ -0,0 +1,83 @@
+// Tolerant asset-ID matching rules (excel.matching in config.json).
+// Mirrors barcode_match.py; server.js and the app (database.js) share this
+// file, so the server, the device lookup pack and the Python tools all
+// derive the same match key from a barcode.
+
+const DEFAULT_MATCHING = {
+  caseFold: false,
+  stripPrefixes: [],
+  stripSuffixes: [],
+  digitsOnly: false,
+  stripLeadingZeros: false,
+};
+
+// Rules completed with defaults, like normalize_rules in barcode_match.py
+const matchingRules = (matching) => {
+  const rules = { ...DEFAULT_MATCHING, ...(matching || {}) };
+  for (const key of ['stripPrefixes', 'stripSuffixes']) {
+    rules[key] = rules[key].map(affix => String(affix).trim()).filter(affix => affix !== '');
+  }
+  return rules;
+};
+
+const rulesActive = (rules) => Object.keys(DEFAULT_MATCHING).some(key =>
+  Array.isArray(rules[key]) ? rules[key].length > 0 : Boolean(rules[key]));
+
+// Drop the longest listed prefix (or suffix) that leaves something behind
+const stripAffix = (text, affixes, caseFold, prefix) => {
+  let best = '';
+  for (let affix of affixes) {
+    if (caseFold) {
+      affix = affix.toLowerCase();
+    }
+    if (affix.length > best.length && affix.length < text.length &&
+        (prefix ? text.startsWith(affix) : text.endsWith(affix))) {
+      best = affix;
+    }
+  }
+  if (!best) {
+    return text;
+  }
+  return prefix ? text.slice(best.length) : text.slice(0, text.length - best.length);
+};
+
+// Match key of a cell value or scanned barcode, or null (match_key in barcode_match.py)
+const matchKey = (value, rules) => {
+  if (value === undefined || value === null) {
+    return null;
+  }
+  let text = String(value).trim();
+  if (rules.caseFold) {
+    text = text.toLowerCase();
+  }
+  if (rules.stripPrefixes.length) {
+    text = stripAffix(text, rules.stripPrefixes, rules.caseFold, true);
+  }
+  if (rules.stripSuffixes.length) {
+    text = stripAffix(text, rules.stripSuffixes, rules.caseFold, false);
+  }
+  if (rules.digitsOnly) {
+    text = text.replace(/[^0-9]+/g, '');
+  }
+  if (rules.stripLeadingZeros) {
+    text = text.replace(/^0+/, '') || (text ? '0' : '');
+  }
+  return text || null;
+};
+
+// True when an inventory cell holds the scanned ID: exactly, or by match key
+const cellMatches = (cellValue, data, rules) => {
+  if (cellValue === undefined || cellValue === null) {
+    return false;
+  }
+  if (String(cellValue).trim() === String(data).trim()) {
+    return true;
+  }
+  if (!rulesActive(rules)) {
+    return false;
+  }
+  const key = matchKey(cellValue, rules);
+  return key !== null && key === matchKey(data, rules);
+};
+
+module.exports = { DEFAULT_MATCHING, matchingRules, rulesActive, matchKey, cellMatches };
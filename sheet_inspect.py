@@ -0,0 +1,118 @@
+"""Per-sheet statistics for workbooks with many tabs.
+
+Each sheet is read once with xlsx_stream.scan_sheet(): the real used range
+(cells holding a value, not the formatted area Excel reports), the column
+count, the header row found by column_detect and a score for how much the
+sheet looks like an asset inventory. Large workbooks are inspected one
+sheet per worker process, so a 40-tab export takes about as long as its
+biggest tab. Results are cached per workbook version (see file_cache.py).
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import column_detect
+import instrumentation
+import xlsx_stream
+from config_core import index_to_letter
+from file_cache import JsonFileCache, version_key
+
+# Sheet XML (uncompressed) below which starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 4 << 20
+
+# Share of the inventory score carried by each detected field; asset IDs matter most
+FIELD_WEIGHTS = {
+    "assetIdSearch": 0.4,
+    "assetName": 0.15,
+    "assetDescription": 0.1,
+    "status": 0.1,
+    "location": 0.1,
+    "room": 0.1,
+    "markedCheck": 0.05,
+}
+
+_cache = JsonFileCache("sheet_inspect")
+
+
+def inventory_score(detected, data_rows):
+    """How much a sheet looks like an inventory, from 0.0 to 1.0"""
+    if data_rows <= 0:
+        return 0.0
+    score = sum(FIELD_WEIGHTS[field] for field in detected["columns"])
+    if detected["headerRow"] is None:
+        # Value shapes alone are weak evidence
+        score *= 0.5
+    return round(score, 3)
+
+
+def inspect_sheet(file_path, sheet_name, sample_rows=column_detect.SAMPLE_ROWS):
+    """Stats for one sheet as a JSON-ready dict"""
+    scan = xlsx_stream.scan_sheet(file_path, sheet_name, sample_rows)
+    bounds = scan["bounds"]
+    if bounds is None:
+        return {"sheet": sheet_name, "usedRange": None, "rows": 0, "columns": 0, "filledRows": 0,
+                "headerRow": None, "dataRows": 0, "score": 0.0, "detected": {}}
+
+    first_row, first_col, last_row, last_col = bounds
+    detected = column_detect.detect_columns(scan["rows"])
+    header_row = detected["headerRow"]
+    # Rows with values below the header (title blocks above it are not data)
+    above = scan["rows"][:header_row] if header_row is not None else []
+    data_rows = scan["filledRows"] - sum(1 for row in above if any(v is not None for v in row))
+    return {
+        "sheet": sheet_name,
+        "usedRange": f"{index_to_letter(first_col)}{first_row}:{index_to_letter(last_col)}{last_row}",
+        "rows": last_row,
+        "columns": last_col + 1,
+        "filledRows": scan["filledRows"],
+        "headerRow": header_row,
+        "dataRows": max(data_rows, 0),
+        "score": inventory_score(detected, data_rows),
+        "detected": detected["columns"],
+    }
+
+
+def _use_processes(file_path, sheet_names):
+    if len(sheet_names) < 2 or (os.cpu_count() or 1) < 2:
+        return False
+    return sum(xlsx_stream.sheet_sizes(file_path).values()) >= PARALLEL_MIN_BYTES
+
+
+@instrumentation.traced()
+def inspect_workbook(file_path, sample_rows=column_detect.SAMPLE_ROWS, max_workers=None):
+    """Stats for every sheet in workbook order, cached per file version
+
+    Returns (results, cached).
+    """
+    key = version_key(file_path, sample_rows)
+    results = _cache.get(key)
+    if results is not None:
+        return results, True
+
+    names = xlsx_stream.sheet_names(file_path)
+    if _use_processes(file_path, names):
+        workers = min(len(names), max_workers or os.cpu_count() or 1)
+        # spawn, not fork: the configuration window calls this from a Qt worker thread
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(inspect_sheet, [file_path] * len(names), names, [sample_rows] * len(names)))
+    else:
+        results = [inspect_sheet(file_path, name, sample_rows) for name in names]
+
+    _cache.put(key, results)
+    return results, False
+
+
+def by_score(results):
+    """Results ordered best inventory match first (workbook order breaks ties)"""
+    return sorted(results, key=lambda stats: -stats["score"])
+
+
+def describe(stats):
+    """One-line summary for a sheet picker, e.g. "A1:S404, 19 cols, header row 5, match 85%" """
+    if stats["usedRange"] is None:
+        return "empty"
+    parts = [stats["usedRange"], f"{stats['columns']} cols"]
+    if stats["headerRow"] is not None:
+        parts.append(f"header row {stats['headerRow']}")
+    parts.append(f"match {round(stats['score'] * 100)}%")
+    return ", ".join(parts)
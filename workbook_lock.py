@@ -0,0 +1,283 @@
+"""Locking protocol for the inventory workbook, shared with server.js.
+
+Writers (server.js, scan_service.py) hold a sidecar lock file next to the
+workbook while they read, change and replace it:
+
+    inventory.xlsx.lock    {"pid": 4312, "host": "front-desk", "since": 1767621791512, "owner": "server.js"}
+
+The file is created with O_CREAT | O_EXCL, so only one writer holds it,
+and deleted on release by the writer that created it. A lock on this host
+is stale once its process is gone; the pid cannot be checked for a lock
+from another host (or on Windows), so such a lock is stale once it is
+older than STALE_AFTER seconds. The next writer breaks a stale lock by
+renaming it aside and putting it back if it turns out to be a newer lock
+than the one it judged. Python holders also keep an fcntl advisory lock
+on it where fcntl exists, so another Python process can tell a live
+holder from a dead one without trusting the pid. Writers then replace the
+workbook atomically (temp file + rename), so nothing ever sees a
+half-written file.
+
+Readers never take the lock and so never hold up a scan. They wait while a
+writer holds it, copy the workbook (a reflink where the filesystem
+supports one) and keep the copy only if the workbook did not change
+while it was copied and the copy is a complete zip. Every wait backs off
+exponentially up to a timeout.
+"""
+import os
+import json
+import time
+import errno
+import shutil
+import socket
+import hashlib
+import zipfile
+import tempfile
+from contextlib import contextmanager
+
+import instrumentation
+from file_cache import cache_dir, file_version
+
+try:
+    import fcntl
+except ImportError:  # Windows: the sidecar file alone is the lock
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+SNAPSHOT_DIR_NAME = "read-snapshots"
+
+# A lock whose pid cannot be checked is considered abandoned after this long
+STALE_AFTER = 30.0
+
+DEFAULT_TIMEOUT = 10.0
+BACKOFF_FIRST = 0.02
+BACKOFF_MAX = 0.5
+
+# Lock files held by this process; its own reads do not wait for them
+_held = set()
+
+# Linux FICLONE ioctl: share the copy's blocks with the original (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
+class WorkbookBusy(Exception):
+    """The workbook stayed locked or kept changing until the timeout"""
+
+
+def lock_path(file_path):
+    """Sidecar lock file of a workbook"""
+    return os.path.abspath(file_path) + LOCK_SUFFIX
+
+
+def backoff(timeout=DEFAULT_TIMEOUT):
+    """Sleep between attempts with doubling delays; yields the attempt number until timeout"""
+    deadline = time.monotonic() + timeout
+    delay = BACKOFF_FIRST
+    attempt = 0
+    while True:
+        yield attempt
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, BACKOFF_MAX)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True  # Exists but belongs to someone else (or cannot be checked)
+    return True
+
+
+def _alive(owner, mtime):
+    """Whether a lock without an fcntl holder is held: by its pid on this host, by its age otherwise"""
+    # os.kill(pid, 0) would send Ctrl+C on Windows, so only the age counts there
+    if owner and owner.get("host") == socket.gethostname() and "pid" in owner and os.name != "nt":
+        return _pid_alive(owner["pid"])
+    return time.time() - mtime <= STALE_AFTER
+
+
+def _inspect(path):
+    """(identity, owner, live) of a lock file, or None when there is none"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        live = None
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                live = True  # A live Python holder
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        owner = _read_owner(fd)
+        stat = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if live is None:
+        live = _alive(owner, stat.st_mtime)
+    return (stat.st_ino, stat.st_mtime_ns), owner, live
+
+
+def lock_holder(file_path):
+    """Owner dict of a live lock on the workbook, or None when it is free or stale"""
+    found = _inspect(lock_path(file_path))
+    if found is None or not found[2]:
+        return None
+    return found[1] or {"owner": "unknown"}
+
+
+def _read_owner(fd):
+    try:
+        return json.loads(os.pread(fd, 4096, 0) if hasattr(os, "pread") else os.read(fd, 4096))
+    except (OSError, ValueError):
+        return None  # Still being written, or not ours
+
+
+def _try_create(path, owner):
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o644)
+    except FileExistsError:
+        return None
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    os.write(fd, json.dumps({"pid": os.getpid(), "host": socket.gethostname(),
+                             "since": int(time.time() * 1000), "owner": owner}).encode("utf-8"))
+    return fd
+
+
+def _break(path, identity):
+    """Remove a stale lock, unless another writer replaced it after it was judged stale"""
+    aside = f"{path}.stale.{os.getpid()}.{os.urandom(4).hex()}"
+    try:
+        os.rename(path, aside)
+    except OSError:
+        return  # Already broken by another writer
+    try:
+        stat = os.stat(aside)
+        if (stat.st_ino, stat.st_mtime_ns) != identity:
+            try:
+                os.link(aside, path)  # A new lock; put it back
+            except OSError:
+                pass
+    finally:
+        os.remove(aside)
+
+
+@contextmanager
+def writing(file_path, owner="python", timeout=DEFAULT_TIMEOUT):
+    """Hold the workbook's write lock, breaking stale locks and backing off while it is taken"""
+    path = lock_path(file_path)
+    holder = None
+    for _ in backoff(timeout):
+        fd = _try_create(path, owner)
+        if fd is not None:
+            break
+        found = _inspect(path)
+        if found is None:
+            continue
+        identity, holder, live = found
+        if not live:
+            _break(path, identity)  # Abandoned by a crashed writer
+    else:
+        raise WorkbookBusy(f"{os.path.basename(file_path)} is locked by {(holder or {}).get('owner', 'another writer')}")
+    _held.add(path)
+    try:
+        yield
+    finally:
+        _held.discard(path)
+        created = os.fstat(fd).st_ino
+        os.close(fd)
+        try:
+            if os.stat(path).st_ino == created:
+                os.remove(path)
+        except FileNotFoundError:
+            pass  # Broken as stale while held
+
+
+def _clone(source, target):
+    """Copy a file, as a reflink when the filesystem can"""
+    if fcntl is not None and hasattr(fcntl, "ioctl"):
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return
+            except OSError as e:
+                if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                    raise
+    shutil.copyfile(source, target)
+
+
+@instrumentation.traced("workbook_lock.snapshot")
+def snapshot(file_path, target, timeout=DEFAULT_TIMEOUT):
+    """Copy the workbook to target once no writer holds it and the copy is complete"""
+    problem = "locked"
+    for _ in backoff(timeout):
+        if lock_path(file_path) not in _held and lock_holder(file_path) is not None:
+            problem = "locked"
+            continue
+        try:
+            before = file_version(file_path)
+            _clone(file_path, target)
+            if file_version(file_path) == before and zipfile.is_zipfile(target):
+                return before
+            problem = "changing"
+        except PermissionError:
+            problem = "open in another program"  # Excel on Windows
+    raise WorkbookBusy(f"{os.path.basename(file_path)} stayed {problem} for {timeout:g}s")
+
+
+def _snapshot_dir():
+    path = os.path.join(cache_dir(), SNAPSHOT_DIR_NAME)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return tempfile.gettempdir()  # No writable cache directory
+    return path
+
+
+@contextmanager
+def reading(file_path, timeout=DEFAULT_TIMEOUT):
+    """(path, file_version) of a private copy of the workbook for one read, deleted afterwards"""
+    fd, target = tempfile.mkstemp(suffix=os.path.splitext(file_path)[1], dir=_snapshot_dir())
+    os.close(fd)
+    try:
+        version = snapshot(file_path, target, timeout)
+        yield target, version
+    finally:
+        try:
+            os.remove(target)
+        except OSError:
+            pass  # Still open elsewhere (Windows); .cache/ can be deleted at any time
+
+
+def stable_snapshot(file_path, timeout=DEFAULT_TIMEOUT):
+    """Path of a copy of the current workbook version for readers that keep it open
+
+    Copies are named after the workbook version and reused until it
+    changes; copies of older versions are deleted where they are not open.
+    """
+    path, size, mtime_ns = file_version(file_path)
+    prefix = hashlib.sha1(path.encode("utf-8")).hexdigest()[:20]
+    target = os.path.join(_snapshot_dir(), f"{prefix}-{size}-{mtime_ns}{os.path.splitext(path)[1]}")
+    if not os.path.exists(target):
+        tmp_path = target + ".tmp"
+        version = snapshot(file_path, tmp_path, timeout)
+        if version != (path, size, mtime_ns):
+            # Changed since we named the copy; name it after what was copied
+            target = os.path.join(_snapshot_dir(), f"{prefix}-{version[1]}-{version[2]}{os.path.splitext(path)[1]}")
+        os.replace(tmp_path, target)
+    for name in os.listdir(_snapshot_dir()):
+        stale = os.path.join(_snapshot_dir(), name)
+        if name.startswith(prefix + "-") and stale != target and not name.endswith(".tmp"):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # Held open by a cached workbook (Windows)
+    return target
@@ -0,0 +1,300 @@
+"""Fast streaming reader for selected columns of an .xlsx sheet.
+
+openpyxl's read-only mode builds a value for every cell of every row, which
+dominates full-sheet passes on large inventories. This reader feeds the
+sheet XML straight to expat and keeps only the requested columns, several
+times faster than openpyxl on the same file and with flat memory use.
+
+Values come back as str, int, float or bool, like openpyxl with
+data_only=True except that date-formatted numbers stay numbers.
+"""
+import zipfile
+import posixpath
+import xml.parsers.expat
+from xml.etree.ElementTree import iterparse
+
+from config_core import letter_to_index
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Element names as reported by expat with namespace_separator=" "
+_MAIN = NS_MAIN[1:-1] + " "
+_ROW = _MAIN + "row"
+_CELL = _MAIN + "c"
+_VALUE = _MAIN + "v"
+_TEXT = _MAIN + "t"
+_SHARED_ITEM = _MAIN + "si"
+_PHONETIC = _MAIN + "rPh"
+
+# Bytes fed to expat per call
+CHUNK_SIZE = 1 << 16
+
+_DIGITS = "0123456789"
+
+
+def _sheet_paths(archive):
+    """Map sheet names to their XML part inside the archive"""
+    targets = {}
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        for _, el in iterparse(f):
+            if el.tag == NS_PKG_REL + "Relationship":
+                target = el.get("Target")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                targets[el.get("Id")] = target
+    paths = {}
+    with archive.open("xl/workbook.xml") as f:
+        for _, el in iterparse(f):
+            if el.tag == NS_MAIN + "sheet":
+                paths[el.get("name")] = targets[el.get(NS_REL + "id")]
+    return paths
+
+
+def _new_parser():
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+    return parser
+
+
+def _shared_strings(archive):
+    """Shared string table as a list"""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    parts = []
+    state = {"text": False, "phonetic": False}
+
+    def start(name, attrs):
+        if name == _TEXT:
+            state["text"] = not state["phonetic"]
+        elif name == _SHARED_ITEM:
+            parts.clear()
+        elif name == _PHONETIC:
+            # Phonetic hints are not part of the value
+            state["phonetic"] = True
+
+    def end(name):
+        if name == _TEXT:
+            state["text"] = False
+        elif name == _PHONETIC:
+            state["phonetic"] = False
+        elif name == _SHARED_ITEM:
+            strings.append("".join(parts))
+
+    def chars(data):
+        if state["text"]:
+            parts.append(data)
+
+    parser = _new_parser()
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = chars
+    with archive.open("xl/sharedStrings.xml") as f:
+        parser.ParseFile(f)
+    return strings
+
+
+def _number(text):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def sheet_names(file_path):
+    """Sheet names of a workbook, in workbook order"""
+    with zipfile.ZipFile(file_path) as archive:
+        return list(_sheet_paths(archive))
+
+
+def sheet_sizes(file_path):
+    """Uncompressed size in bytes of each sheet's XML part, in workbook order"""
+    with zipfile.ZipFile(file_path) as archive:
+        return {name: archive.getinfo(path).file_size for name, path in _sheet_paths(archive).items()}
+
+
+def scan_sheet(file_path, sheet_name, sample_rows):
+    """Sample the top rows of a sheet and find its used range in one pass
+
+    Returns {"rows": [...], "bounds": (first_row, first_col, last_row,
+    last_col) or None, "filledRows": n}. rows holds one tuple per sheet row
+    from row 1 up to sample_rows (or the last used row, if sooner), padded
+    to the widest sampled row like openpyxl's iter_rows(values_only=True).
+    bounds covers the cells that actually hold a value (rows one-based,
+    columns zero-based), unlike the <dimension> element or openpyxl's
+    max_row/max_column, which count formatted blank cells too.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        paths = _sheet_paths(archive)
+        if sheet_name not in paths:
+            raise ValueError(f"Sheet '{sheet_name}' not found in Excel file")
+        strings = _shared_strings(archive)
+
+        sampled = {}  # Row number -> {column: value}
+        parts = []
+        bounds = None
+        filled_rows = 0
+        row_filled = False
+        col = 0
+        cell_type = "n"
+        collecting = False
+        next_row = 1
+        next_col = 0
+        column_cache = {}
+
+        def start(name, attrs):
+            nonlocal col, cell_type, collecting, next_row, next_col
+            if name == _CELL:
+                ref = attrs.get("r")
+                if ref:
+                    letters = ref.rstrip(_DIGITS)
+                    col = column_cache.get(letters)
+                    if col is None:
+                        col = column_cache[letters] = letter_to_index(letters)
+                else:
+                    col = next_col
+                next_col = col + 1
+                cell_type = attrs.get("t", "n")
+                parts.clear()
+            elif name == _VALUE or name == _TEXT:
+                collecting = True
+            elif name == _ROW:
+                r = attrs.get("r")
+                if r:
+                    next_row = int(r)
+
+        def end(name):
+            nonlocal bounds, filled_rows, row_filled, collecting, next_row, next_col
+            if name == _CELL:
+                if parts:
+                    text = "".join(parts)
+                    if next_row <= sample_rows:
+                        sampled.setdefault(next_row, {})[col] = _cell_value(cell_type, text, strings)
+                    if bounds is None:
+                        bounds = [next_row, col, next_row, col]
+                    else:
+                        bounds[1] = min(bounds[1], col)
+                        bounds[2] = next_row
+                        bounds[3] = max(bounds[3], col)
+                    row_filled = True
+            elif name == _ROW:
+                filled_rows += row_filled
+                row_filled = False
+                next_row += 1
+                next_col = 0
+            else:
+                collecting = False
+
+        def chars(data):
+            if collecting:
+                parts.append(data)
+
+        parser = _new_parser()
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = chars
+        with archive.open(paths[sheet_name]) as f:
+            parser.ParseFile(f)
+
+    width = max((max(cells) + 1 for cells in sampled.values()), default=0)
+    last_row = min(sample_rows, bounds[2]) if bounds else 0
+    rows = []
+    for row_number in range(1, last_row + 1):
+        cells = sampled.get(row_number, {})
+        rows.append(tuple(cells.get(c) for c in range(width)))
+    return {"rows": rows, "bounds": tuple(bounds) if bounds else None, "filledRows": filled_rows}
+
+
+def iter_columns(file_path, sheet_name, columns):
+    """Yield (row_number, values) for every row element in a sheet
+
+    columns is a list of zero-based column indices; values holds one value
+    per requested column (None for blank cells), in the same order. Rows
+    missing from the XML (never written) are not yielded, so callers must
+    use row_number rather than counting.
+    """
+    wanted = {col: i for i, col in enumerate(columns)}
+    width = len(columns)
+    with zipfile.ZipFile(file_path) as archive:
+        paths = _sheet_paths(archive)
+        if sheet_name not in paths:
+            raise ValueError(f"Sheet '{sheet_name}' not found in Excel file")
+        strings = _shared_strings(archive)
+
+        done = []  # Rows completed by the current chunk
+        values = [None] * width
+        parts = []
+        slot = None
+        cell_type = "n"
+        collecting = False
+        next_row = 1
+        next_col = 0
+        column_cache = {}
+
+        def start(name, attrs):
+            nonlocal slot, cell_type, collecting, next_row, next_col
+            if name == _CELL:
+                ref = attrs.get("r")
+                if ref:
+                    letters = ref.rstrip(_DIGITS)
+                    col = column_cache.get(letters)
+                    if col is None:
+                        col = column_cache[letters] = letter_to_index(letters)
+                else:
+                    col = next_col
+                next_col = col + 1
+                slot = wanted.get(col)
+                if slot is not None:
+                    cell_type = attrs.get("t", "n")
+                    parts.clear()
+            elif slot is not None:
+                collecting = name == _VALUE or name == _TEXT
+            elif name == _ROW:
+                r = attrs.get("r")
+                if r:
+                    next_row = int(r)
+
+        def end(name):
+            nonlocal values, slot, collecting, next_row, next_col
+            if name == _CELL:
+                if slot is not None and parts:
+                    values[slot] = _cell_value(cell_type, "".join(parts), strings)
+                slot = None
+            elif name == _ROW:
+                done.append((next_row, tuple(values)))
+                values = [None] * width
+                next_row += 1
+                next_col = 0
+            else:
+                collecting = False
+
+        def chars(data):
+            if collecting:
+                parts.append(data)
+
+        parser = _new_parser()
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = chars
+        with archive.open(paths[sheet_name]) as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                yield from done
+                done.clear()
+                if not chunk:
+                    break
+
+
+def _cell_value(cell_type, text, strings):
+    if cell_type == "s":
+        return strings[int(text)]
+    if cell_type == "n":
+        return _number(text)
+    if cell_type == "b":
+        return text == "1"
+    # "inlineStr", "str" (formula result) and "e" (error) are kept as text
+    return text